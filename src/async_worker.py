@@ -0,0 +1,276 @@
+"""
+Asyncio worker: an alternative to the Celery prefork worker that runs many
+documents concurrently in one event loop.
+
+It consumes the same Redis queue the API publishes to (Celery message protocol v2),
+so it can run next to, or instead of, `celery worker`:
+
+    python -m src.async_worker --concurrency 32
+
+In-flight messages are parked in a per-consumer processing list (BLMOVE) and only
+removed once handled. Each consumer keeps a heartbeat key alive; when a consumer's
+heartbeat expires, any other worker moves its processing list back onto the queue.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import random
+import signal
+import os
+import socket
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict
+
+import redis.asyncio as aioredis
+from prometheus_client import start_http_server
+
+from .settings import settings
+from .worker_runtime import init_runtime
+
+logger = logging.getLogger("docproc")
+
+MAX_RETRIES = 5  # mirrors process_document's retry_kwargs
+PROCESS_DOCUMENT = "src.worker.process_document"
+MAX_BACKOFF_SECONDS = 600.0
+HEARTBEAT_SECONDS = 10.0
+HEARTBEAT_TTL_SECONDS = 30  # a consumer silent this long is treated as dead
+KEY_PREFIX = "docproc:async_worker:"
+CONSUMERS_KEY = KEY_PREFIX + "consumers"
+
+
+def default_consumer_id() -> str:
+    # Unique per process: several workers on one host must not share a processing list.
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def decode_message(raw: bytes | str) -> tuple[dict, list, dict]:
+    """Kombu Redis envelope -> (headers, args, kwargs)."""
+    msg = json.loads(raw)
+    body = msg["body"]
+    if (msg.get("properties") or {}).get("body_encoding") == "base64":
+        body = base64.b64decode(body)
+    args, kwargs, _embed = json.loads(body)
+    return msg.get("headers") or {}, list(args), dict(kwargs)
+
+
+def encode_retry(raw: bytes | str, retries: int) -> str:
+    msg = json.loads(raw)
+    msg["headers"] = {**(msg.get("headers") or {}), "retries": retries, "eta": None}
+    return json.dumps(msg)
+
+
+def _backoff(retries: int) -> float:
+    # Same shape as Celery's retry_backoff + retry_jitter.
+    return random.uniform(0, min(MAX_BACKOFF_SECONDS, 2.0 ** retries))
+
+
+def _handlers() -> Dict[str, Callable[..., Awaitable[Any]]]:
+    from .monitoring import _run_eval
+    from .worker import _process_async, _release_expired_claims
+
+    # Every task the API or celery beat publishes must be here, or it is dropped.
+    return {
+        PROCESS_DOCUMENT: _process_async,
+        "src.monitoring.run_sla_evaluation": lambda: _run_eval(),
+        "src.worker.release_expired_review_claims": _release_expired_claims,
+    }
+
+
+def _processing_key(consumer_id: str) -> str:
+    return f"{KEY_PREFIX}{consumer_id}:processing"
+
+
+def _heartbeat_key(consumer_id: str) -> str:
+    return f"{KEY_PREFIX}{consumer_id}:alive"
+
+
+class AsyncQueueWorker:
+    def __init__(
+        self,
+        client: aioredis.Redis,
+        queue: str = "celery",
+        concurrency: int = 16,
+        consumer_id: str | None = None,
+    ):
+        self.client = client
+        self.queue = queue
+        self.concurrency = int(concurrency)
+        self.consumer_id = consumer_id or default_consumer_id()
+        self.processing = _processing_key(self.consumer_id)
+        self.heartbeat = _heartbeat_key(self.consumer_id)
+        self.handlers = _handlers()
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._tasks: set[asyncio.Task] = set()
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    async def _beat(self) -> None:
+        await self.client.set(self.heartbeat, "1", ex=HEARTBEAT_TTL_SECONDS)
+
+    async def _requeue(self, processing: str) -> int:
+        n = 0
+        while await self.client.lmove(processing, self.queue, "RIGHT", "RIGHT"):
+            n += 1
+        if n:
+            logger.warning("Re-queued %d in-flight messages from %s", n, processing)
+        return n
+
+    async def recover(self) -> int:
+        """
+        Re-queue messages left in our own processing list by a previous run (stable
+        --consumer-id) and in the lists of consumers whose heartbeat has expired.
+        Live consumers' lists are never touched.
+        """
+        return await self._requeue(self.processing) + await self.recover_dead()
+
+    async def recover_dead(self) -> int:
+        n = 0
+        for member in await self.client.smembers(CONSUMERS_KEY):
+            other = member.decode() if isinstance(member, bytes) else member
+            if other == self.consumer_id or await self.client.exists(_heartbeat_key(other)):
+                continue
+            n += await self._requeue(_processing_key(other))
+            await self.client.srem(CONSUMERS_KEY, other)
+        return n
+
+    async def _heartbeat_loop(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await self._beat()
+                await self.recover_dead()
+            except Exception as e:
+                logger.warning("Async worker heartbeat failed: %s", e)
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run(self) -> None:
+        await self._beat()
+        await self.client.sadd(CONSUMERS_KEY, self.consumer_id)
+        await self.recover()
+        heartbeat = asyncio.create_task(self._heartbeat_loop())
+        try:
+            await self._consume()
+        finally:
+            heartbeat.cancel()
+            await asyncio.gather(heartbeat, return_exceptions=True)
+        # Clean shutdown: everything was handled, so nothing is left to recover.
+        await self.client.delete(self.heartbeat)
+        await self.client.srem(CONSUMERS_KEY, self.consumer_id)
+
+    async def _consume(self) -> None:
+        while not self._stopping.is_set():
+            await self._slots.acquire()
+            raw = None
+            try:
+                raw = await self.client.blmove(self.queue, self.processing, 1.0, "RIGHT", "LEFT")
+            finally:
+                if raw is None:
+                    self._slots.release()
+            if raw is None:
+                continue
+            task = asyncio.create_task(self._handle(raw))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _handle(self, raw: bytes) -> None:
+        released = False
+        try:
+            try:
+                headers, args, kwargs = decode_message(raw)
+            except Exception:
+                logger.exception("Dropping undecodable message")
+                await self.client.lrem(self.processing, 1, raw)
+                return
+
+            name = headers.get("task")
+            handler = self.handlers.get(name)
+            if handler is None:
+                logger.error("No handler for task %s; dropping", name)
+                await self.client.lrem(self.processing, 1, raw)
+                return
+
+            eta = headers.get("eta")
+            if eta:
+                delay = (datetime.fromisoformat(eta) - datetime.now(timezone.utc)).total_seconds()
+                if delay > 0:
+                    # Don't hold a slot while waiting out a countdown.
+                    self._slots.release()
+                    released = True
+                    await asyncio.sleep(delay)
+                    await self._slots.acquire()
+                    released = False
+
+            retries = int(headers.get("retries") or 0)
+            if name == PROCESS_DOCUMENT:
+                kwargs["final_attempt"] = retries >= MAX_RETRIES
+            try:
+                await handler(*args, **kwargs)
+            except Exception:
+                logger.exception("Task %s failed (attempt %d)", headers.get("id"), retries + 1)
+                if retries >= MAX_RETRIES:
+                    await self.client.lrem(self.processing, 1, raw)
+                    return
+                self._slots.release()
+                released = True
+                await asyncio.sleep(_backoff(retries))
+                async with self.client.pipeline(transaction=True) as pipe:
+                    pipe.lpush(self.queue, encode_retry(raw, retries + 1))
+                    pipe.lrem(self.processing, 1, raw)
+                    await pipe.execute()
+                return
+
+            await self.client.lrem(self.processing, 1, raw)
+        finally:
+            if not released:
+                self._slots.release()
+
+
+async def main(concurrency: int, queue: str, consumer_id: str | None) -> None:
+    # Pipelines share this loop's runtime: one runner, so one set of step limiters.
+    runtime = init_runtime(loop=asyncio.get_running_loop())
+
+    client = aioredis.Redis.from_url(settings.redis_url)
+    worker = AsyncQueueWorker(client, queue=queue, concurrency=concurrency, consumer_id=consumer_id)
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+
+    logger.info("Async worker consuming %s with %d in-flight documents", queue, concurrency)
+    try:
+        await worker.run()
+    finally:
+        await runtime.flush_audit()
+        await client.aclose()
+
+
+def cli() -> None:
+    parser = argparse.ArgumentParser(description="DocProc asyncio worker")
+    parser.add_argument("--concurrency", type=int, default=settings.async_worker_concurrency)
+    parser.add_argument("--queue", default="celery")
+    parser.add_argument(
+        "--consumer-id", default=None, help="defaults to host:pid:random; dead consumers are recovered by live ones"
+    )
+    parser.add_argument("--metrics-port", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.metrics_port:
+        start_http_server(args.metrics_port)
+    asyncio.run(main(args.concurrency, args.queue, args.consumer_id))
+
+
+if __name__ == "__main__":
+    cli()
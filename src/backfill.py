@@ -0,0 +1,226 @@
+"""
+Bulk backfill of archived invoices with batched LLM extraction.
+
+    python -m src.backfill /archive/invoices --batch-size 1000
+
+Each chunk of files goes through three phases:
+
+1. ingest (blob store + documents/jobs rows) and run every step before `llm_extract`
+2. one OpenAI Batch API submission for the whole chunk's OCR text
+3. the rest of the workflow (normalize, validate, write_outputs, persist, review_gate)
+
+Documents already in the result cache skip phase 2 like they skip the LLM in the worker.
+Documents the batch did not answer (failed or expired batch, error rows) run `llm_extract`
+one by one in phase 3, as the worker would.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import mimetypes
+import os
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterable, List
+
+from .db.engine import SessionLocal
+from .repositories.audit import AuditRepo
+from .repositories.documents import DocumentRepo
+from .repositories.jobs import JobRepo
+from .services.blob_store import CHUNK_SIZE, upload_key
+from .services.llm.openai_batch import OpenAIBatchExtractor
+from .services.llm.prompt import DEFAULT_PROMPT_TOKEN_BUDGET, prepare_prompt_text
+from .settings import settings
+from .worker import _complete, _fail, _load_context, _mark_processing, _repos
+from .worker_runtime import WorkerRuntime, init_runtime
+from .workflow.context import WorkflowContext
+
+logger = logging.getLogger("docproc")
+
+SUPPORTED_EXTENSIONS = (".pdf", ".png", ".jpg", ".jpeg")
+
+
+@dataclass(frozen=True)
+class _JobRef:
+    job_id: str
+    document_id: str
+    content_type: str
+    blob_key: str
+
+
+async def _iter_file(path: str) -> AsyncIterator[bytes]:
+    f = await asyncio.to_thread(open, path, "rb")
+    try:
+        while chunk := await asyncio.to_thread(f.read, CHUNK_SIZE):
+            yield chunk
+    finally:
+        f.close()
+
+
+async def _ingest(runtime: WorkerRuntime, paths: List[str]) -> List[_JobRef]:
+    refs: List[_JobRef] = []
+    received = []
+    for path in paths:
+        content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        document_id = str(uuid.uuid4())
+        blob = await runtime.blob_store.put_stream(
+            upload_key(document_id), _iter_file(path), content_type
+        )
+        if blob.size == 0:
+            await runtime.blob_store.delete(blob.key)
+            continue
+        ref = _JobRef(str(uuid.uuid4()), document_id, content_type, blob.key)
+        refs.append(ref)
+        received.append((ref, blob, os.path.basename(path)))
+
+    async with SessionLocal() as session:
+        docs, jobs, audit = DocumentRepo(session), JobRepo(session), AuditRepo(session)
+        async with session.begin():
+            for ref, blob, _ in received:
+                await docs.create(ref.document_id, content_hash=blob.sha256, status="queued")
+                await jobs.create(ref.job_id, ref.document_id)
+            await session.flush()
+            for ref, blob, filename in received:
+                await audit.append(
+                    ref.document_id,
+                    "system",
+                    "received",
+                    {
+                        "filename": filename,
+                        "content_type": ref.content_type,
+                        "size": blob.size,
+                        "source": "backfill",
+                    },
+                    job_id=ref.job_id,
+                )
+    return refs
+
+
+async def _prepare(
+    runtime: WorkerRuntime, ref: _JobRef, only: set[str]
+) -> WorkflowContext | None:
+    async with SessionLocal() as session:
+        repos = _repos(session, runtime.audit_sink)
+        await _mark_processing(repos, ref.job_id, ref.document_id, ref.content_type)
+        try:
+            ctx = await _load_context(
+                repos, runtime, ref.job_id, ref.document_id, ref.content_type, ref.blob_key
+            )
+            await runtime.runner.run(
+                ctx, injected_cfg={**runtime.services(), **repos}, only=only
+            )
+            return ctx
+        except Exception as e:
+            logger.exception("Backfill OCR failed for job %s", ref.job_id)
+            await _fail(repos, ref.job_id, ref.document_id, e)
+            return None
+
+
+async def _finish(runtime: WorkerRuntime, ctx: WorkflowContext) -> str:
+    async with SessionLocal() as session:
+        repos = _repos(session, runtime.audit_sink)
+        try:
+            await runtime.runner.run(ctx, injected_cfg={**runtime.services(), **repos})
+            status = (await _complete(repos, ctx))["status"]
+            await runtime.runner.discard_checkpoints(ctx.job_id)
+            return status
+        except Exception as e:
+            logger.exception("Backfill failed for job %s", ctx.job_id)
+            await _fail(repos, ctx.job_id, ctx.document_id, e)
+            return "failed"
+
+
+async def process_chunk(
+    runtime: WorkerRuntime,
+    batch: OpenAIBatchExtractor,
+    refs: List[_JobRef],
+    concurrency: int,
+) -> Counter:
+    runner = runtime.runner
+    graph = runner.graph
+    llm_steps = {n for n, s in graph.steps.items() if s.kind == "llm_extract"}
+    before_llm = set().union(*(graph.ancestors(n) for n in llm_steps))
+    budget = min(
+        int(runner.step_cfg[n].get("prompt_token_budget", DEFAULT_PROMPT_TOKEN_BUDGET))
+        for n in llm_steps
+    )
+    sem = asyncio.Semaphore(concurrency)
+
+    async def bounded(coro):
+        async with sem:
+            return await coro
+
+    # Phase 1: OCR (and anything else the LLM depends on)
+    prepared = await asyncio.gather(*[bounded(_prepare(runtime, r, before_llm)) for r in refs])
+    ctxs = [c for c in prepared if c is not None]
+
+    # Phase 2: one batch for every document the cache didn't already answer
+    pending = {c.job_id: c for c in ctxs if not llm_steps <= c.completed_steps}
+    results = await batch.extract_many(
+        {jid: prepare_prompt_text(c.text or "", budget) for jid, c in pending.items()}
+    )
+    for jid, result in results.items():
+        pending[jid].apply_llm_result(result)
+        pending[jid].completed_steps.update(llm_steps)
+    if len(results) < len(pending):
+        logger.warning(
+            "Backfill: %d documents without a batch result, extracting them one by one",
+            len(pending) - len(results),
+        )
+
+    # Phase 3: validate / outputs / persist / review
+    statuses = await asyncio.gather(*[bounded(_finish(runtime, c)) for c in ctxs])
+    return Counter(statuses) + Counter(failed=len(refs) - len(ctxs))
+
+
+def _collect(paths: Iterable[str]) -> List[str]:
+    out: List[str] = []
+    for p in paths:
+        if os.path.isdir(p):
+            for root, _dirs, files in os.walk(p):
+                out.extend(
+                    os.path.join(root, f)
+                    for f in sorted(files)
+                    if f.lower().endswith(SUPPORTED_EXTENSIONS)
+                )
+        else:
+            out.append(p)
+    return out
+
+
+async def backfill(paths: List[str], batch_size: int, concurrency: int, poll_seconds: float) -> dict:
+    runtime = init_runtime(loop=asyncio.get_running_loop())
+    await runtime.ensure_ready()
+    batch = OpenAIBatchExtractor(poll_seconds=poll_seconds)
+
+    totals: Counter = Counter()
+    try:
+        for i in range(0, len(paths), batch_size):
+            refs = await _ingest(runtime, paths[i : i + batch_size])
+            totals += await process_chunk(runtime, batch, refs, concurrency)
+            logger.info("Backfill progress: %d/%d files, %s", min(i + batch_size, len(paths)), len(paths), dict(totals))
+    finally:
+        await runtime.flush_audit()
+    return dict(totals)
+
+
+def cli() -> None:
+    parser = argparse.ArgumentParser(description="Backfill archived invoices with batched LLM extraction")
+    parser.add_argument("paths", nargs="+", help="files or directories")
+    parser.add_argument("--batch-size", type=int, default=1000, help="documents per OpenAI batch")
+    parser.add_argument("--concurrency", type=int, default=settings.async_worker_concurrency)
+    parser.add_argument("--poll-seconds", type=float, default=30.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    summary = asyncio.run(
+        backfill(_collect(args.paths), args.batch_size, args.concurrency, args.poll_seconds)
+    )
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    cli()
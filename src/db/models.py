@@ -8,7 +8,7 @@ class Document(Base):
     __tablename__ = "documents"
     id: Mapped[str] = mapped_column(String(64), primary_key=True)  # document_id
     content_hash: Mapped[str] = mapped_column(String(64), index=True)
-    status: Mapped[str] = mapped_column(String(32), index=True)  # queued/processing/completed/review_pending/failed
+    status: Mapped[str] = mapped_column(String(32), index=True)  # queued/processing/retrying/completed/review_pending/failed
     received_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
     extraction_json: Mapped[dict] = mapped_column(JSON, default=dict)
@@ -23,7 +23,7 @@ class Job(Base):
     __tablename__ = "jobs"
     id: Mapped[str] = mapped_column(String(64), primary_key=True)  # job_id
     document_id: Mapped[str] = mapped_column(String(64), ForeignKey("documents.id"), index=True)
-    status: Mapped[str] = mapped_column(String(32), index=True)  # queued/processing/completed/review_pending/failed
+    status: Mapped[str] = mapped_column(String(32), index=True)  # queued/processing/retrying/completed/review_pending/failed
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
     started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True, index=True)
@@ -31,6 +31,7 @@ class Job(Base):
     outputs: Mapped[dict] = mapped_column(JSON, default=dict)
     error: Mapped[str | None] = mapped_column(Text, nullable=True)
     review_item_id: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    batch_id: Mapped[str | None] = mapped_column(String(64), nullable=True, index=True)  # POST /v1/process/batch
 
     __table_args__ = (
         Index("ix_jobs_doc_status", "document_id", "status"),
@@ -53,9 +54,11 @@ class ReviewItem(Base):
     job_id: Mapped[str] = mapped_column(String(64), ForeignKey("jobs.id"), index=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
     claimed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True, index=True)
+    lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)  # claimed items only
     completed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True, index=True)
     sla_deadline: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
-    priority: Mapped[int] = mapped_column(Integer, index=True)
+    priority: Mapped[int] = mapped_column(Integer, index=True)  # bucket at insert; reads use priority_at(urgency_key)
+    urgency_key: Mapped[datetime] = mapped_column(DateTime(timezone=True))  # sla_deadline minus severity/value boost
     status: Mapped[str] = mapped_column(String(16), index=True)  # pending/claimed/completed/rejected
     assigned_to: Mapped[str | None] = mapped_column(String(64), nullable=True)
     reason: Mapped[str] = mapped_column(Text)
@@ -63,5 +66,7 @@ class ReviewItem(Base):
     locked_fields: Mapped[dict] = mapped_column(JSON, default=dict)
 
     __table_args__ = (
-        Index("ix_review_pending_priority_deadline", "status", "priority", "sla_deadline"),
+        # Queue order (urgency_key, id): keyset pages and SKIP LOCKED claims are index range scans.
+        Index("ix_review_items_queue_order", "status", "urgency_key", "id"),
+        Index("ix_review_items_lease", "status", "lease_expires_at"),
     )
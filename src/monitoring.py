@@ -195,9 +195,10 @@ from celery import shared_task  # noqa: E402
 
 @shared_task(name="src.monitoring.run_sla_evaluation")
 def run_sla_evaluation() -> dict:
-    import asyncio
+    # Share the worker's loop so pooled DB connections stay on one loop.
+    from .worker_runtime import get_runtime
 
-    return asyncio.run(_run_eval())
+    return get_runtime().run(_run_eval())
 
 
 async def _run_eval() -> dict:
@@ -16,3 +16,59 @@ REVIEW_QUEUE_DEPTH = Gauge("review_queue_depth", "Pending human review items")
 SLA_BREACHES = Counter("sla_breaches_total", "Total SLA breaches detected", ["sla"])
 SLA_CURRENT_VALUE = Gauge("sla_current_value", "Current computed SLA value", ["sla"])
 SLA_IS_BREACHING = Gauge("sla_is_breaching", "Whether the SLA is currently breaching (0/1)", ["sla"])
+
+# Workflow steps (runner)
+STEP_SECONDS = Histogram(
+    "workflow_step_seconds",
+    "Step run time including retries and limiter waits",
+    ["step", "outcome"],  # success/failure/cancelled
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 2, 5, 10, 20, 30, 60),
+)
+STEP_WAIT_SECONDS = Histogram(
+    "workflow_step_wait_seconds",
+    "Time a step attempt waited for a limiter",
+    ["step", "limiter"],  # rate_limit/concurrency
+    buckets=(0, 0.01, 0.05, 0.1, 0.5, 1, 2, 5, 10, 30),
+)
+STEP_RETRIES = Histogram(
+    "workflow_step_retries",
+    "Retries per step run",
+    ["step", "outcome"],
+    buckets=(0, 1, 2, 3, 5),
+)
+
+# Content-hash result cache (skips OCR + LLM for repeat uploads)
+RESULT_CACHE_LOOKUPS = Counter(
+    "result_cache_lookups_total", "Result cache lookups", ["result"]  # hit/miss/bypass/error
+)
+
+# OCR strategy usage (local text layer vs Textract)
+OCR_PAGES = Counter(
+    "ocr_pages_total", "Pages by the OCR strategy that produced their text", ["strategy"]  # text_layer/textract_sync/textract_async
+)
+OCR_DOCUMENTS = Counter(
+    "ocr_documents_total", "Documents by OCR strategy", ["strategy"]  # text_layer/mixed/textract
+)
+
+# Adaptive per-step concurrency (workflow.yaml adaptive_concurrency)
+ADAPTIVE_CONCURRENCY_LIMIT = Gauge(
+    "adaptive_concurrency_limit", "Current adaptive in-flight limit per step", ["step"]
+)
+ADAPTIVE_CONCURRENCY_IN_FLIGHT = Gauge(
+    "adaptive_concurrency_in_flight", "Calls in flight under the adaptive limit per step", ["step"]
+)
+
+# Hedged step attempts (workflow.yaml hedge)
+WORKFLOW_HEDGES = Counter(
+    "workflow_hedges_total", "Hedged step attempts", ["step", "result"]  # launched/won/empty/over_budget
+)
+
+# LLM extraction
+LLM_REQUESTS_COALESCED = Counter(
+    "llm_requests_coalesced_total", "LLM extractions served by an identical in-flight request"
+)
+LLM_PROMPT_TOKENS = Histogram(
+    "llm_prompt_tokens",
+    "OCR text tokens sent per LLM extraction (after compaction)",
+    buckets=(250, 500, 1000, 2000, 4000, 6000, 8000, 16000),
+)
@@ -0,0 +1,218 @@
+"""
+Lightweight spans in the OpenTelemetry data model, without the SDK dependency.
+
+    with tracer.span("step.ocr", step="ocr") as span:
+        ...
+        span.set(retries=1)
+
+Spans nest through a contextvar (asyncio tasks inherit the parent) and are exported
+in batches from a background thread: TRACING_EXPORTER=file writes OTLP-JSON spans as
+JSON lines, TRACING_EXPORTER=otlp posts OTLP/HTTP JSON to a collector (e.g. :4318).
+"""
+from __future__ import annotations
+
+import atexit
+import contextlib
+import json
+import logging
+import os
+import queue
+import secrets
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Protocol
+
+import httpx
+
+from ..settings import settings
+
+logger = logging.getLogger("docproc")
+
+SERVICE_NAME = "docproc"
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int
+    end_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,  # internal
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attr(k, v) for k, v in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            out["parentSpanId"] = self.parent_id
+        return out
+
+
+class _NoopSpan:
+    def set(self, **attributes: Any) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+_current: ContextVar[Optional[Span]] = ContextVar("docproc_span", default=None)
+
+
+def _otlp_attr(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        v = {"boolValue": value}
+    elif isinstance(value, int):
+        v = {"intValue": str(value)}
+    elif isinstance(value, float):
+        v = {"doubleValue": value}
+    else:
+        v = {"stringValue": str(value)}
+    return {"key": key, "value": v}
+
+
+def _resource_spans(spans: List[Span]) -> Dict[str, Any]:
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": [_otlp_attr("service.name", SERVICE_NAME)]},
+                "scopeSpans": [{"scope": {"name": SERVICE_NAME}, "spans": [s.to_otlp() for s in spans]}],
+            }
+        ]
+    }
+
+
+class SpanExporter(Protocol):
+    def export(self, spans: List[Span]) -> None: ...
+
+
+class FileSpanExporter:
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, spans: List[Span]) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            for s in spans:
+                f.write(json.dumps(s.to_otlp()) + "\n")
+
+
+class OTLPHttpSpanExporter:
+    def __init__(self, endpoint: str, timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.client = httpx.Client(timeout=timeout)
+
+    def export(self, spans: List[Span]) -> None:
+        self.client.post(self.endpoint, json=_resource_spans(spans)).raise_for_status()
+
+
+class Tracer:
+    def __init__(
+        self,
+        exporter: SpanExporter | None = None,
+        batch_size: int = 256,
+        flush_seconds: float = 2.0,
+    ):
+        self.exporter = exporter
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._queue: "queue.Queue[Span]" = queue.Queue(maxsize=10_000)
+        self._thread_pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span | _NoopSpan]:
+        if self.exporter is None:
+            yield _NOOP
+            return
+        parent = _current.get()
+        s = Span(
+            name=name,
+            trace_id=parent.trace_id if parent else secrets.token_hex(16),
+            span_id=secrets.token_hex(8),
+            parent_id=parent.span_id if parent else None,
+            start_ns=time.time_ns(),
+            attributes=dict(attributes),
+        )
+        token = _current.set(s)
+        try:
+            yield s
+        except BaseException as e:
+            s.error = type(e).__name__
+            raise
+        finally:
+            s.end_ns = time.time_ns()
+            _current.reset(token)
+            self._enqueue(s)
+
+    def _enqueue(self, s: Span) -> None:
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(s)
+        except queue.Full:
+            pass  # never block the pipeline on tracing
+
+    def _ensure_thread(self) -> None:
+        # One flusher per process (prefork children start their own).
+        if self._thread_pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread_pid != os.getpid():
+                threading.Thread(target=self._loop, name="span-exporter", daemon=True).start()
+                self._thread_pid = os.getpid()
+
+    def _loop(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_seconds
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            self._export(batch)
+
+    def flush(self) -> None:
+        batch: List[Span] = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            self._export(batch)
+
+    def _export(self, batch: List[Span]) -> None:
+        try:
+            self.exporter.export(batch)
+        except Exception as e:
+            logger.warning("Span export failed (%d spans dropped): %s", len(batch), e)
+
+
+def build_tracer() -> Tracer:
+    backend = (settings.tracing_exporter or "off").lower()
+    if backend == "file":
+        return Tracer(FileSpanExporter(settings.tracing_file_path))
+    if backend == "otlp":
+        return Tracer(OTLPHttpSpanExporter(settings.tracing_otlp_endpoint))
+    return Tracer(None)
+
+
+tracer = build_tracer()
+atexit.register(tracer.flush)
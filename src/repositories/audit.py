@@ -1,8 +1,21 @@
 from __future__ import annotations
+from typing import Iterable
+from sqlalchemy import event, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from ..db.models import AuditLog
 from ..common.time import utcnow
 
+def audit_event(document_id: str, actor: str, action: str, details: dict, job_id: str | None = None) -> dict:
+    return {
+        "document_id": document_id,
+        "job_id": job_id,
+        "at": utcnow(),
+        "actor": actor,
+        "action": action,
+        "details": details or {},
+    }
+
+
 class AuditRepo:
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -16,3 +29,33 @@ class AuditRepo:
             action=action,
             details=details or {},
         ))
+
+    async def append_many(self, events: Iterable[dict]) -> None:
+        """Bulk insert of audit_event() dicts in one executemany."""
+        rows = list(events)
+        if rows:
+            await self.session.execute(insert(AuditLog), rows)
+
+
+class BufferedAuditRepo:
+    """
+    AuditRepo that keeps events out of the session's transaction: they are handed to
+    a BufferedAuditSink when the session commits and dropped if it rolls back.
+    """
+
+    def __init__(self, session: AsyncSession, sink):
+        self.session = session
+        self.sink = sink
+        self._pending: list[dict] = []
+        event.listen(session.sync_session, "after_commit", self._on_commit)
+        event.listen(session.sync_session, "after_soft_rollback", self._on_rollback)
+
+    async def append(self, document_id: str, actor: str, action: str, details: dict, job_id: str | None = None) -> None:
+        self._pending.append(audit_event(document_id, actor, action, details, job_id=job_id))
+
+    def _on_commit(self, _session) -> None:
+        events, self._pending = self._pending, []
+        self.sink.add(events)
+
+    def _on_rollback(self, _session, _previous_transaction) -> None:
+        self._pending = []
@@ -1,4 +1,6 @@
 from __future__ import annotations
+from typing import Iterable
+from sqlalchemy import insert, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from ..db.models import Document
 from ..common.time import utcnow
@@ -21,22 +23,48 @@ class DocumentRepo:
         self.session.add(doc)
         return doc
 
+    async def create_many(self, items: Iterable[tuple[str, str]], status: str = "queued") -> None:
+        """Bulk insert of (document_id, content_hash) pairs in one executemany."""
+        now = utcnow()
+        rows = [
+            {
+                "id": document_id,
+                "content_hash": content_hash,
+                "status": status,
+                "received_at": now,
+                "updated_at": now,
+                "extraction_json": {},
+                "locked_fields": {},
+            }
+            for document_id, content_hash in items
+        ]
+        if rows:
+            await self.session.execute(insert(Document), rows)
+
     async def get(self, document_id: str) -> Document | None:
         return await self.session.get(Document, document_id)
 
-    async def set_status(self, document_id: str, status: str) -> None:
-        doc = await self.session.get(Document, document_id)
-        if not doc:
+    async def transition(
+        self, document_id: str, status: str | None = None, *, extraction: dict | None = None
+    ) -> None:
+        """Status and/or extraction change in one UPDATE ... RETURNING; KeyError if missing."""
+        values: dict = {"updated_at": utcnow()}
+        if status is not None:
+            values["status"] = status
+        if extraction is not None:
+            values["extraction_json"] = extraction
+
+        result = await self.session.execute(
+            update(Document).where(Document.id == document_id).values(**values).returning(Document.id)
+        )
+        if result.one_or_none() is None:
             raise KeyError("document_not_found")
-        doc.status = status
-        doc.updated_at = utcnow()
+
+    async def set_status(self, document_id: str, status: str) -> None:
+        await self.transition(document_id, status)
 
     async def set_extraction(self, document_id: str, extraction: dict) -> None:
-        doc = await self.session.get(Document, document_id)
-        if not doc:
-            raise KeyError("document_not_found")
-        doc.extraction_json = extraction
-        doc.updated_at = utcnow()
+        await self.transition(document_id, extraction=extraction)
 
     async def merge_locked_fields(self, document_id: str, locked: dict) -> None:
         doc = await self.session.get(Document, document_id)
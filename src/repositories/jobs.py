@@ -1,8 +1,12 @@
 from __future__ import annotations
+from typing import Iterable
+from sqlalchemy import Row, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from ..db.models import Job
+from ..db.models import Document, Job
 from ..common.time import utcnow
 
+_UNSET = object()
+
 class JobRepo:
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -24,43 +28,97 @@ class JobRepo:
         self.session.add(job)
         return job
 
+    async def create_many(self, items: Iterable[tuple[str, str]], batch_id: str | None = None) -> None:
+        """Bulk insert of queued (job_id, document_id) pairs in one executemany."""
+        now = utcnow()
+        rows = [
+            {
+                "id": job_id,
+                "document_id": document_id,
+                "batch_id": batch_id,
+                "status": "queued",
+                "created_at": now,
+                "updated_at": now,
+                "outputs": {},
+            }
+            for job_id, document_id in items
+        ]
+        if rows:
+            await self.session.execute(insert(Job), rows)
+
     async def get(self, job_id: str) -> Job | None:
         return await self.session.get(Job, job_id)
 
-    async def mark_started(self, job_id: str) -> None:
-        job = await self.session.get(Job, job_id)
-        if not job:
-            raise KeyError("job_not_found")
-        job.status = "processing"
-        job.started_at = utcnow()
-        job.updated_at = utcnow()
+    async def statuses(self, job_ids: Iterable[str], with_extraction: bool = False) -> list[Row]:
+        """
+        Status rows for many jobs in one query (document joined only when its
+        extraction is wanted). Rows: id, document_id, status, error, outputs,
+        review_item_id, updated_at[, extraction].
+        """
+        cols = [Job.id, Job.document_id, Job.status, Job.error, Job.outputs, Job.review_item_id, Job.updated_at]
+        stmt = select(*cols).where(Job.id.in_(list(job_ids)))
+        if with_extraction:
+            stmt = stmt.add_columns(Document.extraction_json.label("extraction")).outerjoin(
+                Document, Document.id == Job.document_id
+            )
+        return list((await self.session.execute(stmt)).all())
+
+    async def ids_for_batch(self, batch_id: str) -> list[str]:
+        result = await self.session.execute(select(Job.id).where(Job.batch_id == batch_id).order_by(Job.created_at))
+        return list(result.scalars().all())
+
+    async def transition(
+        self,
+        job_id: str,
+        status: str | None = None,
+        *,
+        started: bool = False,
+        completed: bool = False,
+        outputs: dict | None = None,
+        error: str | None | object = _UNSET,
+        review_item_id: str | None = None,
+    ) -> Row:
+        """
+        Apply a job state change in one UPDATE ... RETURNING (no prior SELECT).
+        Returns (id, status, outputs, review_item_id); raises KeyError if the job doesn't exist.
+        """
+        now = utcnow()
+        values: dict = {"updated_at": now}
+        if status is not None:
+            values["status"] = status
+        if started:
+            values["started_at"] = now
+        if completed:
+            values["completed_at"] = now
+        if outputs is not None:
+            values["outputs"] = outputs
+        if error is not _UNSET:
+            values["error"] = error
+        if review_item_id is not None:
+            values["review_item_id"] = review_item_id
 
-    async def mark_completed(self, job_id: str, status: str) -> None:
-        job = await self.session.get(Job, job_id)
-        if not job:
+        result = await self.session.execute(
+            update(Job)
+            .where(Job.id == job_id)
+            .values(**values)
+            .returning(Job.id, Job.status, Job.outputs, Job.review_item_id)
+        )
+        row = result.one_or_none()
+        if row is None:
             raise KeyError("job_not_found")
-        job.status = status
-        job.completed_at = utcnow()
-        job.updated_at = utcnow()
+        return row
+
+    async def mark_started(self, job_id: str) -> None:
+        await self.transition(job_id, "processing", started=True)
+
+    async def mark_completed(self, job_id: str, status: str) -> Row:
+        return await self.transition(job_id, status, completed=True)
 
     async def set_status(self, job_id: str, status: str, error: str | None = None) -> None:
-        job = await self.session.get(Job, job_id)
-        if not job:
-            raise KeyError("job_not_found")
-        job.status = status
-        job.error = error
-        job.updated_at = utcnow()
+        await self.transition(job_id, status, error=error)
 
     async def set_outputs(self, job_id: str, outputs: dict) -> None:
-        job = await self.session.get(Job, job_id)
-        if not job:
-            raise KeyError("job_not_found")
-        job.outputs = outputs
-        job.updated_at = utcnow()
+        await self.transition(job_id, outputs=outputs)
 
     async def set_review_item(self, job_id: str, review_item_id: str) -> None:
-        job = await self.session.get(Job, job_id)
-        if not job:
-            raise KeyError("job_not_found")
-        job.review_item_id = review_item_id
-        job.updated_at = utcnow()
+        await self.transition(job_id, review_item_id=review_item_id)
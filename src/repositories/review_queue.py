@@ -1,27 +1,77 @@
 from __future__ import annotations
-from datetime import timedelta
+import base64
+import json
+import math
+from datetime import datetime, timedelta
+from typing import Any, Mapping
 import uuid
-from sqlalchemy import select, text, func
+from sqlalchemy import Row, select, text, func, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..db.models import ReviewItem
 from ..common.time import utcnow
 
 
+def urgency_boost_minutes(reason: str, amount: Any, cfg: Mapping[str, Any] | None) -> float:
+    """How much closer than its SLA deadline an item is treated (review_gate `urgency` config)."""
+    cfg = cfg or {}
+    boost = float((cfg.get("reason_boost_minutes") or {}).get(reason, 0))
+    try:
+        amount = float(amount)
+    except (TypeError, ValueError):
+        amount = 0.0
+    floor = float(cfg.get("value_floor", 100))
+    if amount > floor > 0:
+        value_boost = float(cfg.get("value_boost_minutes_per_10x", 0)) * math.log10(amount / floor)
+        boost += min(value_boost, float(cfg.get("max_value_boost_minutes", 120)))
+    return boost
+
+
+def priority_at(urgency_key: datetime, now: datetime | None = None) -> int:
+    """Display priority from the time left until the item's effective deadline."""
+    mins = max(0, int((urgency_key - (now or utcnow())).total_seconds() / 60))
+    if mins <= 30:
+        return 100
+    if mins <= 60:
+        return 80
+    if mins <= 120:
+        return 60
+    return 40
+
+
+SUMMARY_COLUMNS = (
+    ReviewItem.id,
+    ReviewItem.document_id,
+    ReviewItem.job_id,
+    ReviewItem.created_at,
+    ReviewItem.sla_deadline,
+    ReviewItem.urgency_key,
+    ReviewItem.status,
+    ReviewItem.assigned_to,
+    ReviewItem.reason,
+)
+DETAIL_COLUMNS = (ReviewItem.extraction_json, ReviewItem.locked_fields)
+
+
+def encode_cursor(row) -> str:
+    """Opaque cursor for the row after which the next page starts."""
+    key = [row.urgency_key.isoformat(), row.id]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """(urgency_key, id); ValueError if the cursor is malformed."""
+    try:
+        urgency_key, rid = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(urgency_key), str(rid)
+    except (TypeError, ValueError, json.JSONDecodeError) as e:
+        raise ValueError("invalid_cursor") from e
+
+
 class ReviewQueueRepo:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    def _priority(self, deadline) -> int:
-        mins = max(0, int((deadline - utcnow()).total_seconds() / 60))
-        if mins <= 30:
-            return 100
-        if mins <= 60:
-            return 80
-        if mins <= 120:
-            return 60
-        return 40
-
     async def create(
         self,
         document_id: str,
@@ -30,9 +80,11 @@ class ReviewQueueRepo:
         extraction_json: dict,
         locked_fields: dict,
         sla_minutes: int = 240,
+        boost_minutes: float = 0.0,
     ) -> ReviewItem:
         rid = str(uuid.uuid4())
         deadline = utcnow() + timedelta(minutes=sla_minutes)
+        urgency_key = deadline - timedelta(minutes=boost_minutes)
         item = ReviewItem(
             id=rid,
             document_id=document_id,
@@ -41,7 +93,8 @@ class ReviewQueueRepo:
             claimed_at=None,
             completed_at=None,
             sla_deadline=deadline,
-            priority=self._priority(deadline),
+            priority=priority_at(urgency_key),
+            urgency_key=urgency_key,
             status="pending",
             assigned_to=None,
             reason=reason,
@@ -52,58 +105,103 @@ class ReviewQueueRepo:
         return item
 
     async def list_pending(
-        self, limit: int, offset: int, user: str | None = None
-    ) -> list[ReviewItem]:
-        """List pending items, or if user provided, include their claimed items too."""
+        self,
+        limit: int,
+        after: tuple[datetime, str] | None = None,
+        user: str | None = None,
+        detail: bool = False,
+    ) -> list[Row]:
+        """
+        One keyset page of pending items (plus the user's claimed ones if given), in
+        queue order. `after` is the (urgency_key, id) of the last row seen.
+        Rows carry SUMMARY_COLUMNS, and the JSON blobs too when `detail` is set.
+        """
+        cols = SUMMARY_COLUMNS + DETAIL_COLUMNS if detail else SUMMARY_COLUMNS
         if user:
             # Show pending + claimed by this user
-            q = (
-                select(ReviewItem)
-                .where(
-                    (ReviewItem.status == "pending")
-                    | (
-                        (ReviewItem.status == "claimed")
-                        & (ReviewItem.assigned_to == user)
-                    )
-                )
-                .order_by(ReviewItem.priority.desc(), ReviewItem.sla_deadline.asc())
-                .limit(limit)
-                .offset(offset)
+            visible = (ReviewItem.status == "pending") | (
+                (ReviewItem.status == "claimed") & (ReviewItem.assigned_to == user)
             )
         else:
-            # Only pending
-            q = (
-                select(ReviewItem)
-                .where(ReviewItem.status == "pending")
-                .order_by(ReviewItem.priority.desc(), ReviewItem.sla_deadline.asc())
-                .limit(limit)
-                .offset(offset)
-            )
+            visible = ReviewItem.status == "pending"
+
+        q = select(*cols).where(visible)
+        if after is not None:
+            q = q.where(tuple_(ReviewItem.urgency_key, ReviewItem.id) > tuple_(*after))
+        q = q.order_by(ReviewItem.urgency_key, ReviewItem.id).limit(limit)
         res = await self.session.execute(q)
-        return list(res.scalars().all())
+        return list(res.all())
 
-    async def claim_next(self, user: str) -> ReviewItem | None:
+    async def claim_batch(self, user: str, n: int, lease_seconds: float) -> list[ReviewItem]:
+        """
+        Claim up to `n` pending items for `user` in one UPDATE ... RETURNING, in queue
+        order. Claims lease for `lease_seconds`; release_expired() puts abandoned ones back.
+        """
         sql = text(
             """
-        WITH next_item AS (
+        WITH next_items AS (
           SELECT id
           FROM review_items
           WHERE status = 'pending'
-          ORDER BY priority DESC, sla_deadline ASC
+          ORDER BY urgency_key, id
           FOR UPDATE SKIP LOCKED
-          LIMIT 1
+          LIMIT :n
         )
         UPDATE review_items
-        SET status='claimed', assigned_to=:user, claimed_at=NOW()
-        WHERE id IN (SELECT id FROM next_item)
+        SET status='claimed', assigned_to=:user, claimed_at=NOW(),
+            lease_expires_at=NOW() + make_interval(secs => :lease_seconds)
+        WHERE id IN (SELECT id FROM next_items)
+        RETURNING *;
+        """
+        )
+        res = await self.session.execute(
+            select(ReviewItem).from_statement(sql),
+            {"user": user, "n": int(n), "lease_seconds": float(lease_seconds)},
+        )
+        items = list(res.scalars().all())
+        # RETURNING order is unspecified.
+        return sorted(items, key=lambda i: (i.urgency_key, i.id))
+
+    async def claim_next(self, user: str, lease_seconds: float) -> ReviewItem | None:
+        items = await self.claim_batch(user, 1, lease_seconds)
+        return items[0] if items else None
+
+    async def renew_leases(self, user: str, lease_seconds: float) -> int:
+        """Extend every active claim of `user`; returns how many were renewed."""
+        sql = text(
+            """
+        UPDATE review_items
+        SET lease_expires_at=NOW() + make_interval(secs => :lease_seconds)
+        WHERE status = 'claimed' AND assigned_to = :user
         RETURNING id;
         """
         )
-        res = await self.session.execute(sql, {"user": user})
-        row = res.mappings().first()
-        if not row:
-            return None
-        return await self.session.get(ReviewItem, row["id"])
+        res = await self.session.execute(sql, {"user": user, "lease_seconds": float(lease_seconds)})
+        return len(res.all())
+
+    async def release_expired(self, lease_seconds: float) -> list[Row]:
+        """
+        Return claims whose lease ran out to the queue; rows are (id, document_id, job_id, assigned_to).
+        Claims without a lease (made before leases existed) expire `lease_seconds` after claimed_at.
+        """
+        sql = text(
+            """
+        WITH expired AS (
+          SELECT id, assigned_to
+          FROM review_items
+          WHERE status = 'claimed'
+            AND COALESCE(lease_expires_at, claimed_at + make_interval(secs => :lease_seconds)) < NOW()
+          FOR UPDATE SKIP LOCKED
+        )
+        UPDATE review_items
+        SET status='pending', assigned_to=NULL, claimed_at=NULL, lease_expires_at=NULL
+        FROM expired
+        WHERE review_items.id = expired.id
+        RETURNING review_items.id, review_items.document_id, review_items.job_id, expired.assigned_to;
+        """
+        )
+        res = await self.session.execute(sql, {"lease_seconds": float(lease_seconds)})
+        return list(res.all())
 
     async def get(self, review_id: str) -> ReviewItem | None:
         return await self.session.get(ReviewItem, review_id)
@@ -115,11 +213,25 @@ class ReviewQueueRepo:
         user: str,
         corrections: dict,
         reject_reason: str | None,
+        lease_seconds: float,
     ) -> ReviewItem:
-        item = await self.session.get(ReviewItem, review_id)
+        """
+        Complete an item `user` holds a live claim on. KeyError if it doesn't exist,
+        ValueError("claim_not_held") if it isn't claimed by `user` or the lease ran out
+        (it may have been released and claimed by someone else meanwhile).
+        """
+        item = await self.session.get(ReviewItem, review_id, with_for_update=True)
         if not item:
             raise KeyError("review_not_found")
+        if item.status != "claimed" or item.assigned_to != user:
+            raise ValueError("claim_not_held")
+        lease_end = item.lease_expires_at
+        if lease_end is None and item.claimed_at is not None:
+            lease_end = item.claimed_at + timedelta(seconds=lease_seconds)
+        if lease_end is None or lease_end < utcnow():
+            raise ValueError("claim_not_held")
 
+        item.lease_expires_at = None
         if decision in ("approve", "correct"):
             item.status = "completed"
             item.assigned_to = user
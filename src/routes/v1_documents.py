@@ -1,19 +1,30 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+
+from ..services.blob_store import build_blob_store, upload_key
 
 router = APIRouter(tags=["documents"])
+blob_store = build_blob_store()
 
 
 @router.get("/documents/{document_id}/preview")
 async def document_preview(document_id: str):
     """
     Document preview for the review dashboard.
-    Original file bytes are not persisted by default; this endpoint returns 404
-    so the UI can show a clear message. To enable preview, persist uploads
-    (e.g. to S3 or disk) and serve them here.
+    Streams the original upload from the blob store; 404 if it isn't there
+    (e.g. uploaded before blobs were persisted) so the UI can show a clear message.
     """
-    raise HTTPException(
-        status_code=404,
-        detail="Document preview not stored. Enable file persistence to serve previews.",
+    key = upload_key(document_id)
+    blob = await blob_store.stat(key)
+    if not blob:
+        raise HTTPException(
+            status_code=404,
+            detail="Document preview not stored.",
+        )
+    return StreamingResponse(
+        blob_store.iter_chunks(key),
+        media_type=blob.content_type,
+        headers={"Content-Length": str(blob.size)},
     )
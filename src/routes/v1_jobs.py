@@ -1,26 +1,166 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import contextlib
+import hashlib
+import json
+from typing import AsyncIterator, Dict, List
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..db.engine import get_session
+from ..db.engine import SessionLocal, get_session
 from ..repositories.jobs import JobRepo
-from ..repositories.documents import DocumentRepo
 from ..schemas.responses import JobStatusResponse
+from ..services.job_events import TERMINAL_STATUSES, build_job_event_hub
+from ..settings import settings
 
 router = APIRouter(tags=["jobs"])
+event_hub = build_job_event_hub()
 
+STATUS_FIELDS = ("document_id", "status", "error", "outputs", "review_item_id", "updated_at", "extraction")
+DEFAULT_FIELDS = STATUS_FIELDS[:-1]  # extraction only on request
 
-@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
-async def get_job(job_id: str, session: AsyncSession = Depends(get_session)):
+
+def _parse_ids(ids: str | None) -> List[str]:
+    return list(dict.fromkeys(i.strip() for i in (ids or "").split(",") if i.strip()))
+
+
+def _parse_fields(fields: str | None) -> List[str]:
+    if not fields:
+        return list(DEFAULT_FIELDS)
+    wanted = _parse_ids(fields)
+    unknown = [f for f in wanted if f not in STATUS_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"unknown_fields:{','.join(unknown)}")
+    return wanted
+
+
+def _project(row, fields: List[str]) -> dict:
+    data = row._mapping
+    out = {"job_id": data["id"]}
+    for f in fields:
+        value = data[f]
+        out[f] = value.isoformat() if f == "updated_at" and value is not None else value
+    return out
+
+
+async def _resolve_ids(jobs: JobRepo, ids: str | None, batch_id: str | None) -> List[str]:
+    job_ids = _parse_ids(ids)
+    if batch_id:
+        job_ids += [i for i in await jobs.ids_for_batch(batch_id) if i not in job_ids]
+    if not job_ids:
+        raise HTTPException(status_code=400, detail="ids_or_batch_id_required")
+    if len(job_ids) > settings.job_status_max_ids:
+        raise HTTPException(status_code=413, detail="too_many_ids")
+    return job_ids
+
+
+@router.get("/jobs")
+async def get_jobs(
+    request: Request,
+    ids: str | None = None,
+    batch_id: str | None = None,
+    fields: str | None = None,
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Status of many jobs in one query: `ids` (comma separated) and/or `batch_id`,
+    projected to `fields`. Repeat polls with If-None-Match get a 304 until
+    something changes.
+    """
     jobs = JobRepo(session)
-    docs = DocumentRepo(session)
+    job_ids = await _resolve_ids(jobs, ids, batch_id)
+    wanted = _parse_fields(fields)
+    rows = {r.id: r for r in await jobs.statuses(job_ids, with_extraction="extraction" in wanted)}
 
-    job = await jobs.get(job_id)
-    if not job:
-        raise HTTPException(status_code=404, detail="job_not_found")
+    body = {
+        "jobs": [_project(rows[i], wanted) for i in job_ids if i in rows],
+        "missing": [i for i in job_ids if i not in rows],
+    }
+    raw = json.dumps(body, sort_keys=True, separators=(",", ":"), default=str)
+    etag = '"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+    if etag in [t.strip() for t in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=raw, media_type="application/json", headers={"ETag": etag})
+
+
+def _sse(event: dict) -> str:
+    return f"event: status\ndata: {json.dumps(event, default=str)}\n\n"
 
-    doc = await docs.get(job.document_id)
+
+@contextlib.asynccontextmanager
+async def _subscription(job_ids: List[str]) -> AsyncIterator[asyncio.Queue]:
+    if event_hub is None:
+        yield asyncio.Queue()  # resync-only
+        return
+    async with event_hub.subscribe(job_ids) as queue:
+        yield queue
+
+
+async def _current(job_ids) -> List[dict]:
+    async with SessionLocal() as session:
+        rows = await JobRepo(session).statuses(job_ids)
+    return [_project(r, ["document_id", "status", "error", "review_item_id"]) for r in rows]
+
+
+async def _status_stream(job_ids: List[str]) -> AsyncIterator[str]:
+    sent: Dict[str, str] = {}
+    pending = set(job_ids)
+
+    def changed(event: dict) -> bool:
+        if event.get("job_id") not in pending or sent.get(event["job_id"]) == event.get("status"):
+            return False
+        sent[event["job_id"]] = event["status"]
+        if event["status"] in TERMINAL_STATUSES:
+            pending.discard(event["job_id"])
+        return True
+
+    # Subscribe before reading the snapshot so no transition falls in between.
+    async with _subscription(job_ids) as queue:
+        snapshot = await _current(job_ids)
+        pending.intersection_update(e["job_id"] for e in snapshot)  # unknown ids never finish
+        for event in snapshot:
+            if changed(event):
+                yield _sse(event)
+        while pending:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=settings.job_events_resync_seconds)
+            except asyncio.TimeoutError:
+                # Pub/sub is at-most-once: recheck what's still open, and keep the connection alive.
+                yield ": keep-alive\n\n"
+                for event in await _current(list(pending)):
+                    if changed(event):
+                        yield _sse(event)
+                continue
+            if changed(event):
+                yield _sse(event)
+    yield "event: done\ndata: {}\n\n"
+
+
+@router.get("/jobs/events")
+async def job_events_stream(
+    ids: str | None = None,
+    batch_id: str | None = None,
+    session: AsyncSession = Depends(get_session),
+):
+    """Server-sent events with each job's status transitions; ends once all are final."""
+    job_ids = await _resolve_ids(JobRepo(session), ids, batch_id)
+    await session.close()  # the stream reads with short-lived sessions of its own
+    return StreamingResponse(
+        _status_stream(job_ids),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str, session: AsyncSession = Depends(get_session)):
+    rows = await JobRepo(session).statuses([job_id], with_extraction=True)
+    if not rows:
+        raise HTTPException(status_code=404, detail="job_not_found")
+    job = rows[0]
 
     return JobStatusResponse(
         job_id=job.id,
@@ -29,5 +169,5 @@ async def get_job(job_id: str, session: AsyncSession = Depends(get_session)):
         error=job.error,
         outputs=job.outputs or {},
         review_item_id=job.review_item_id,
-        extraction=(doc.extraction_json if doc else None),
+        extraction=job.extraction,
     )
@@ -1,13 +1,19 @@
 from __future__ import annotations
 
-import base64
+import asyncio
+import mimetypes
+import os
 import uuid
-from fastapi import APIRouter, File, UploadFile, HTTPException
+import zipfile
+from dataclasses import dataclass
+from typing import AsyncIterator, List
+from fastapi import APIRouter, File, UploadFile, HTTPException, Request
 
 from src.db.engine import SessionLocal
 from src.repositories.documents import DocumentRepo
 from src.repositories.jobs import JobRepo
-from src.repositories.audit import AuditRepo
+from src.repositories.audit import AuditRepo, audit_event
+from src.services.blob_store import CHUNK_SIZE, BlobRef, build_blob_store, upload_key
 from src.settings import settings
 from celery import Celery
 
@@ -15,55 +21,241 @@ router = APIRouter(tags=["process"])
 celery_client = Celery(
     "docproc_client", broker=settings.redis_url, backend=settings.redis_url
 )
+blob_store = build_blob_store()
+
+ZIP_CONTENT_TYPES = ("application/zip", "application/x-zip-compressed")
+
+
+async def _iter_upload(file: UploadFile) -> AsyncIterator[bytes]:
+    while chunk := await file.read(CHUNK_SIZE):
+        yield chunk
 
 
 @router.post("/process")
-async def process(file: UploadFile = File(...)) -> dict:
+async def process(file: UploadFile = File(...), bypass_cache: bool = False) -> dict:
     if not file:
         raise HTTPException(status_code=400, detail="No file uploaded")
 
     content_type = file.content_type or "application/octet-stream"
-    file_bytes = await file.read()
-    if not file_bytes:
-        raise HTTPException(status_code=400, detail="Empty file")
 
     document_id = str(uuid.uuid4())
     job_id = str(uuid.uuid4())
 
-    async with SessionLocal() as session:
-        docs = DocumentRepo(session)
-        jobs = JobRepo(session)
-        audit = AuditRepo(session)
+    # Stream to the blob store; the task only carries the key.
+    blob = await blob_store.put_stream(
+        upload_key(document_id), _iter_upload(file), content_type
+    )
+    if blob.size == 0:
+        await blob_store.delete(blob.key)
+        raise HTTPException(status_code=400, detail="Empty file")
+
+    try:
+        async with SessionLocal() as session:
+            docs = DocumentRepo(session)
+            jobs = JobRepo(session)
+            audit = AuditRepo(session)
 
-        async with session.begin():
-            await docs.create(
-                document_id=document_id,
-                status="queued",
-            )
+            async with session.begin():
+                await docs.create(
+                    document_id=document_id,
+                    content_hash=blob.sha256,
+                    status="queued",
+                )
 
-            await jobs.create(
-                job_id=job_id,
-                document_id=document_id,
-            )
+                await jobs.create(
+                    job_id=job_id,
+                    document_id=document_id,
+                )
 
-            await session.flush()
+                await session.flush()
 
-            await audit.append(
-                document_id,
-                "system",
-                "received",
-                {"filename": file.filename, "content_type": content_type},
-                job_id=job_id,
-            )
+                await audit.append(
+                    document_id,
+                    "system",
+                    "received",
+                    {
+                        "filename": file.filename,
+                        "content_type": content_type,
+                        "size": blob.size,
+                    },
+                    job_id=job_id,
+                )
+    except BaseException:
+        # Nothing references the blob unless the rows committed.
+        await asyncio.gather(blob_store.delete(blob.key), return_exceptions=True)
+        raise
 
     celery_client.send_task(
         "src.worker.process_document",
-        args=[
-            job_id,
-            document_id,
-            content_type,
-            base64.b64encode(file_bytes).decode("utf-8"),
-        ],
+        args=[job_id, document_id, content_type, blob.key],
+        kwargs={"bypass_cache": bypass_cache},
     )
 
     return {"job_id": job_id, "document_id": document_id, "status": "queued"}
+
+
+@dataclass
+class _Received:
+    filename: str
+    document_id: str
+    job_id: str
+    content_type: str
+    blob: BlobRef
+
+
+def _is_zip(file: UploadFile) -> bool:
+    return file.content_type in ZIP_CONTENT_TYPES or (file.filename or "").lower().endswith(".zip")
+
+
+def _too_many() -> HTTPException:
+    return HTTPException(status_code=413, detail="too_many_documents")
+
+
+def _zip_too_large() -> HTTPException:
+    return HTTPException(status_code=413, detail="zip_too_large")
+
+
+async def _iter_zip_member(
+    zf: zipfile.ZipFile, info: zipfile.ZipInfo, limit: int
+) -> AsyncIterator[bytes]:
+    # The header's file_size is checked up front but can lie; count what inflates.
+    f = await asyncio.to_thread(zf.open, info)
+    read = 0
+    try:
+        while chunk := await asyncio.to_thread(f.read, CHUNK_SIZE):
+            read += len(chunk)
+            if read > limit:
+                raise _zip_too_large()
+            yield chunk
+    finally:
+        f.close()
+
+
+async def _store(filename: str, content_type: str, chunks: AsyncIterator[bytes]) -> _Received | None:
+    document_id = str(uuid.uuid4())
+    blob = await blob_store.put_stream(upload_key(document_id), chunks, content_type)
+    if blob.size == 0:
+        await blob_store.delete(blob.key)
+        return None
+    return _Received(filename, document_id, str(uuid.uuid4()), content_type, blob)
+
+
+async def _store_zip(file: UploadFile, received: list, skipped: list, budget: int) -> int:
+    """
+    Expand one zip part into `received`. At most `budget` uncompressed bytes are
+    stored in total; returns how many were. Raises 413 past any batch limit.
+    """
+    # Starlette has already spooled the part to a temp file; members are streamed
+    # out of it one at a time (ZipFile reads share one file handle).
+    try:
+        zf = await asyncio.to_thread(zipfile.ZipFile, file.file)
+    except zipfile.BadZipFile:
+        skipped.append({"filename": file.filename, "reason": "bad_zip"})
+        return 0
+    used = 0
+    with zf:
+        for info in zf.infolist():
+            name = info.filename
+            if info.is_dir() or name.startswith("__MACOSX/") or os.path.basename(name).startswith("."):
+                continue
+            if len(received) >= settings.batch_max_documents:
+                raise _too_many()
+            limit = min(settings.batch_max_zip_member_bytes, budget - used)
+            if info.file_size > limit:
+                raise _zip_too_large()
+            content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+            item = await _store(name, content_type, _iter_zip_member(zf, info, limit))
+            if item is None:
+                skipped.append({"filename": name, "reason": "empty"})
+            else:
+                received.append(item)
+                used += item.blob.size
+    return used
+
+
+def _publish(received: List[_Received], bypass_cache: bool) -> None:
+    # One broker connection/channel for the whole batch instead of one per task.
+    with celery_client.producer_or_acquire() as producer:
+        for r in received:
+            celery_client.send_task(
+                "src.worker.process_document",
+                args=[r.job_id, r.document_id, r.content_type, r.blob.key],
+                kwargs={"bypass_cache": bypass_cache},
+                producer=producer,
+            )
+
+
+@router.post("/process/batch")
+async def process_batch(request: Request, bypass_cache: bool = False) -> dict:
+    """
+    Many documents in one request: any number of multipart `files` parts, where
+    .zip parts are expanded. Rows for the whole batch are inserted in one
+    transaction and all tasks are published over one broker connection.
+    """
+    # Parsed here rather than with File(...): Starlette caps forms at 1000 files by default.
+    async with request.form(max_files=settings.batch_max_documents) as form:
+        files = [f for f in form.getlist("files") if not isinstance(f, str)]
+        return await _process_batch(files, bypass_cache)
+
+
+async def _process_batch(files: List[UploadFile], bypass_cache: bool) -> dict:
+    batch_id = str(uuid.uuid4())
+    received: List[_Received] = []
+    skipped: List[dict] = []
+    zip_budget = settings.batch_max_zip_total_bytes
+
+    try:
+        for file in files:
+            if _is_zip(file):
+                zip_budget -= await _store_zip(file, received, skipped, zip_budget)
+                continue
+            if len(received) >= settings.batch_max_documents:
+                raise _too_many()
+            content_type = file.content_type or "application/octet-stream"
+            item = await _store(file.filename or "", content_type, _iter_upload(file))
+            if item is None:
+                skipped.append({"filename": file.filename, "reason": "empty"})
+            else:
+                received.append(item)
+
+        if not received:
+            raise HTTPException(status_code=400, detail="No documents in batch")
+
+        async with SessionLocal() as session:
+            async with session.begin():
+                await DocumentRepo(session).create_many((r.document_id, r.blob.sha256) for r in received)
+                await JobRepo(session).create_many(
+                    ((r.job_id, r.document_id) for r in received), batch_id=batch_id
+                )
+                await AuditRepo(session).append_many(
+                    audit_event(
+                        r.document_id,
+                        "system",
+                        "received",
+                        {
+                            "filename": r.filename,
+                            "content_type": r.content_type,
+                            "size": r.blob.size,
+                            "batch_id": batch_id,
+                        },
+                        job_id=r.job_id,
+                    )
+                    for r in received
+                )
+    except BaseException:
+        # Nothing references these blobs unless the rows committed.
+        await asyncio.gather(
+            *(blob_store.delete(r.blob.key) for r in received), return_exceptions=True
+        )
+        raise
+
+    await asyncio.to_thread(_publish, received, bypass_cache)
+
+    return {
+        "batch_id": batch_id,
+        "documents": [
+            {"filename": r.filename, "document_id": r.document_id, "job_id": r.job_id, "status": "queued"}
+            for r in received
+        ],
+        "skipped": skipped,
+    }
@@ -4,12 +4,14 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..db.engine import get_session
-from ..repositories.review_queue import ReviewQueueRepo
+from ..repositories.review_queue import ReviewQueueRepo, decode_cursor, encode_cursor, priority_at
 from ..repositories.documents import DocumentRepo
 from ..repositories.audit import AuditRepo
 from ..observability.metrics import REVIEW_QUEUE_DEPTH
+from ..common.time import utcnow
 from ..schemas.requests import SubmitReviewRequest
-from ..schemas.responses import ClaimResponse, ReviewStatsResponse
+from ..schemas.responses import ClaimBatchResponse, ClaimResponse, ReviewStatsResponse
+from ..settings import settings
 
 router = APIRouter(tags=["review"])
 
@@ -21,63 +23,118 @@ async def queue_stats(session: AsyncSession = Depends(get_session)):
     return await repo.stats_for_dashboard()
 
 
+MAX_PAGE_SIZE = 200
+
+
+def _queue_item(row, now) -> dict:
+    data = row._mapping
+    item = {
+        "id": data["id"],
+        "document_id": data["document_id"],
+        "job_id": data["job_id"],
+        "created_at": data["created_at"],
+        "sla_deadline": data["sla_deadline"],
+        "priority": priority_at(data["urgency_key"], now),
+        "status": data["status"],
+        "assigned_to": data["assigned_to"],
+        "reason": data["reason"],
+    }
+    if "extraction_json" in data:
+        item["extraction"] = data["extraction_json"]
+        item["locked_fields"] = data["locked_fields"]
+    return item
+
+
 @router.get("/queue")
 async def list_queue(
     limit: int = 50,
-    offset: int = 0,
+    cursor: str | None = None,
     user: str | None = None,
+    view: str = "summary",
     session: AsyncSession = Depends(get_session),
 ):
-    """List queue items. If user provided, includes their claimed items."""
+    """
+    List queue items in queue order. If user provided, includes their claimed items.
+    Pages are keyset based: pass `next_cursor` back as `cursor`. `view=summary`
+    leaves out extraction/locked_fields (see GET /queue/{id}); `view=full` keeps them.
+    """
+    if view not in ("summary", "full"):
+        raise HTTPException(status_code=400, detail="invalid_view")
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="invalid_cursor")
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
     repo = ReviewQueueRepo(session)
-    items = await repo.list_pending(limit=limit, offset=offset, user=user)
-    REVIEW_QUEUE_DEPTH.set(len([i for i in items if i.status == "pending"]))
+    rows = await repo.list_pending(limit=limit, after=after, user=user, detail=view == "full")
+    REVIEW_QUEUE_DEPTH.set(len([r for r in rows if r.status == "pending"]))
 
+    now = utcnow()
     return {
-        "items": [
-            {
-                "id": i.id,
-                "document_id": i.document_id,
-                "job_id": i.job_id,
-                "created_at": i.created_at,
-                "sla_deadline": i.sla_deadline,
-                "priority": i.priority,
-                "status": i.status,
-                "assigned_to": i.assigned_to,
-                "reason": i.reason,
-                "extraction": i.extraction_json,
-                "locked_fields": i.locked_fields,
-            }
-            for i in items
-        ]
+        "items": [_queue_item(r, now) for r in rows],
+        "next_cursor": encode_cursor(rows[-1]) if len(rows) == limit else None,
     }
 
 
+def _review_item(item) -> dict:
+    return {
+        "id": item.id,
+        "document_id": item.document_id,
+        "job_id": item.job_id,
+        "created_at": item.created_at,
+        "sla_deadline": item.sla_deadline,
+        "priority": priority_at(item.urgency_key),
+        "status": item.status,
+        "assigned_to": item.assigned_to,
+        "lease_expires_at": item.lease_expires_at,
+        "reason": item.reason,
+        "extraction": item.extraction_json,
+        "locked_fields": item.locked_fields,
+    }
+
+
+@router.get("/queue/{review_id}")
+async def get_queue_item(review_id: str, session: AsyncSession = Depends(get_session)):
+    """One review item with its extraction and locked fields."""
+    item = await ReviewQueueRepo(session).get(review_id)
+    if not item:
+        raise HTTPException(status_code=404, detail="review_not_found")
+    return _review_item(item)
+
+
 @router.post("/queue/claim", response_model=ClaimResponse)
 async def claim_next(
     user: str = "reviewer_1", session: AsyncSession = Depends(get_session)
 ):
     repo = ReviewQueueRepo(session)
-    item = await repo.claim_next(user=user)
+    item = await repo.claim_next(user=user, lease_seconds=settings.review_claim_lease_seconds)
     await session.commit()
 
     if not item:
         return ClaimResponse(review_item=None)
 
-    return ClaimResponse(
-        review_item={
-            "id": item.id,
-            "document_id": item.document_id,
-            "job_id": item.job_id,
-            "sla_deadline": item.sla_deadline,
-            "priority": item.priority,
-            "status": item.status,
-            "assigned_to": item.assigned_to,
-            "extraction": item.extraction_json,
-            "locked_fields": item.locked_fields,
-            "reason": item.reason,
-        }
-    )
+    return ClaimResponse(review_item=_review_item(item))
+
+
+@router.post("/queue/claim/batch", response_model=ClaimBatchResponse)
+async def claim_batch(
+    user: str = "reviewer_1", n: int = 5, session: AsyncSession = Depends(get_session)
+):
+    """Claim up to `n` items at once (prefetch); each is leased until `lease_expires_at`."""
+    n = max(1, min(n, settings.review_claim_max_batch))
+    repo = ReviewQueueRepo(session)
+    items = await repo.claim_batch(user, n, lease_seconds=settings.review_claim_lease_seconds)
+    await session.commit()
+    return ClaimBatchResponse(review_items=[_review_item(i) for i in items])
+
+
+@router.post("/queue/claims/renew")
+async def renew_claims(user: str = "reviewer_1", session: AsyncSession = Depends(get_session)):
+    """Heartbeat: extend the lease on all of the user's claimed items."""
+    renewed = await ReviewQueueRepo(session).renew_leases(user, settings.review_claim_lease_seconds)
+    await session.commit()
+    return {"renewed": renewed}
 
 
 @router.post("/queue/{review_id}/submit")
@@ -90,13 +147,19 @@ async def submit(
     docs = DocumentRepo(session)
     audit = AuditRepo(session)
 
-    item = await queue_repo.submit(
-        review_id=review_id,
-        decision=payload.decision,
-        user=payload.user,
-        corrections=payload.corrections,
-        reject_reason=payload.reject_reason,
-    )
+    try:
+        item = await queue_repo.submit(
+            review_id=review_id,
+            decision=payload.decision,
+            user=payload.user,
+            corrections=payload.corrections,
+            reject_reason=payload.reject_reason,
+            lease_seconds=settings.review_claim_lease_seconds,
+        )
+    except KeyError:
+        raise HTTPException(status_code=404, detail="review_not_found")
+    except ValueError:
+        raise HTTPException(status_code=409, detail="claim_not_held")
 
     if payload.decision in ("approve", "correct") and payload.corrections:
         await docs.merge_locked_fields(item.document_id, payload.corrections)
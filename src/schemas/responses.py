@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Any, Optional
+from typing import Any, List, Optional
 from pydantic import BaseModel
 
 
@@ -24,6 +24,10 @@ class ClaimResponse(BaseModel):
     review_item: Optional[dict] = None
 
 
+class ClaimBatchResponse(BaseModel):
+    review_items: List[dict]
+
+
 class ReviewStatsResponse(BaseModel):
     queue_depth: int
     reviewed_today: int
@@ -0,0 +1,231 @@
+"""
+Write-behind audit log.
+
+Committed audit events are appended to a local spool file and buffered in memory,
+then written to audit_logs with one multi-row INSERT once `max_events` are pending
+or `flush_seconds` after the first one. The spool segment is deleted only after its
+events are in the database, so a crashed worker's events are replayed by the next
+worker that starts (delivery is at-least-once).
+
+Each process writes its own segments and holds an exclusive flock on them while
+they are live; an unlocked segment belongs to a dead process and is safe to replay.
+"""
+from __future__ import annotations
+
+import asyncio
+import fcntl
+import glob
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from ..db.engine import SessionLocal
+from ..db.models import AuditLog
+from ..settings import settings
+
+logger = logging.getLogger("docproc")
+
+INSERT_CHUNK = 1000  # rows per INSERT statement (6 bind params each)
+
+
+def _encode(event: Dict[str, Any]) -> str:
+    return json.dumps({**event, "at": event["at"].isoformat()}, default=str)
+
+
+def _decode(line: str) -> Dict[str, Any]:
+    event = json.loads(line)
+    event["at"] = datetime.fromisoformat(event["at"])
+    return event
+
+
+class _Segment:
+    def __init__(self, path: str, fsync: bool):
+        self.path = path
+        self.fsync = fsync
+        self.fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+
+    def write(self, events: List[Dict[str, Any]]) -> None:
+        os.write(self.fd, "".join(_encode(e) + "\n" for e in events).encode("utf-8"))
+        if self.fsync:
+            os.fsync(self.fd)
+
+    def remove(self) -> None:
+        os.unlink(self.path)
+        os.close(self.fd)
+
+
+class BufferedAuditSink:
+    def __init__(
+        self,
+        spool_dir: str,
+        max_events: int = 500,
+        flush_seconds: float = 1.0,
+        fsync: bool = False,
+        session_factory: Callable[[], Any] = SessionLocal,
+    ):
+        self.spool_dir = spool_dir
+        self.max_events = int(max_events)
+        self.flush_seconds = float(flush_seconds)
+        self.fsync = fsync
+        self.session_factory = session_factory
+        self._buffer: List[Dict[str, Any]] = []
+        self._first_at: float | None = None  # monotonic time the oldest buffered event arrived
+        self._segment: _Segment | None = None
+        self._sealed: List[_Segment] = []  # written out, waiting for their rows to land
+        self._seq = 0
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set = set()
+        self._lock: asyncio.Lock | None = None
+
+    def add(self, events: List[Dict[str, Any]]) -> None:
+        """Spool and buffer events; called once the transaction that produced them commits."""
+        if not events:
+            return
+        try:
+            if self._segment is None:
+                os.makedirs(self.spool_dir, exist_ok=True)
+                self._seq += 1
+                path = os.path.join(self.spool_dir, f"audit-{os.getpid()}-{self._seq}.jsonl")
+                self._segment = _Segment(path, self.fsync)
+            self._segment.write(events)
+        except OSError as e:
+            # The transaction already committed; keep the events in memory at least.
+            logger.error("Audit spool write failed (%d events not crash-safe): %s", len(events), e)
+        if not self._buffer:
+            self._first_at = time.monotonic()
+        self._buffer.extend(events)
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # flushed by the next flush() call
+        if len(self._buffer) >= self.max_events:
+            self._spawn_flush(loop)
+        elif self._timer is None:
+            self._timer = loop.call_later(self.flush_seconds, self._spawn_flush, loop)
+
+    def _spawn_flush(self, loop: asyncio.AbstractEventLoop) -> None:
+        task = loop.create_task(self.flush())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def due(self) -> bool:
+        if not self._buffer:
+            return False
+        if len(self._buffer) >= self.max_events:
+            return True
+        return time.monotonic() - self._first_at >= self.flush_seconds
+
+    async def flush_if_due(self) -> int:
+        """Flush only once a threshold is reached; for callers whose loop isn't always running."""
+        return await self.flush() if self.due() else 0
+
+    async def flush(self) -> int:
+        """Insert everything buffered so far. Errors are logged and the rows kept for the next try."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._buffer:
+                return 0
+            rows, self._buffer = self._buffer, []
+            first_at, self._first_at = self._first_at, None
+            if self._segment is not None:
+                self._sealed.append(self._segment)
+                self._segment = None
+            try:
+                await self._insert(rows)
+            except Exception as e:
+                logger.warning("Audit flush of %d events failed, will retry: %s", len(rows), e)
+                self._buffer = rows + self._buffer
+                self._first_at = first_at
+                return 0
+            # Every sealed segment's events were in `rows` (failed batches are retried whole).
+            for segment in self._sealed:
+                segment.remove()
+            self._sealed = []
+            return len(rows)
+
+    async def recover(self) -> int:
+        """Replay spool segments left behind by dead processes."""
+        own = {s.path for s in self._sealed} | ({self._segment.path} if self._segment else set())
+        replayed = 0
+        for path in sorted(glob.glob(os.path.join(self.spool_dir, "audit-*.jsonl"))):
+            if path in own:
+                continue
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except FileNotFoundError:
+                continue
+            try:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue  # live segment of another process
+                try:
+                    if os.fstat(fd).st_ino != os.stat(path).st_ino:
+                        continue  # replayed and removed by someone else meanwhile
+                except FileNotFoundError:
+                    continue
+                with os.fdopen(os.dup(fd), "r", encoding="utf-8") as f:
+                    rows = []
+                    for line in f:
+                        try:
+                            rows.append(_decode(line))
+                        except (ValueError, KeyError):
+                            pass  # torn last line from a crash mid-write
+                try:
+                    await self._insert(rows)
+                except Exception as e:
+                    logger.warning("Audit spool replay of %s failed: %s", path, e)
+                    continue
+                os.unlink(path)
+                replayed += len(rows)
+            finally:
+                os.close(fd)
+        if replayed:
+            logger.info("Replayed %d spooled audit events", replayed)
+        return replayed
+
+    async def close(self) -> None:
+        await self.flush()
+
+    async def _insert(self, rows: List[Dict[str, Any]]) -> None:
+        for i in range(0, len(rows), INSERT_CHUNK):
+            chunk = rows[i : i + INSERT_CHUNK]
+            try:
+                async with self.session_factory() as session:
+                    await session.execute(insert(AuditLog).values(chunk))
+                    await session.commit()
+            except IntegrityError:
+                # e.g. the document was deleted meanwhile; don't let one row block the rest.
+                await self._insert_each(chunk)
+
+    async def _insert_each(self, rows: List[Dict[str, Any]]) -> None:
+        for row in rows:
+            try:
+                async with self.session_factory() as session:
+                    await session.execute(insert(AuditLog).values([row]))
+                    await session.commit()
+            except IntegrityError as e:
+                logger.error("Dropping audit event %s for %s: %s", row["action"], row["document_id"], e)
+
+
+def build_audit_sink() -> BufferedAuditSink | None:
+    if (settings.audit_sink or "direct").lower() != "buffered":
+        return None
+    return BufferedAuditSink(
+        settings.audit_spool_dir,
+        max_events=settings.audit_flush_max_events,
+        flush_seconds=settings.audit_flush_seconds,
+        fsync=settings.audit_spool_fsync,
+    )
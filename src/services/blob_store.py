@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import AsyncIterator, Protocol
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+from ..settings import settings
+
+CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class BlobRef:
+    key: str
+    size: int
+    sha256: str
+    content_type: str
+
+
+class BlobStore(Protocol):
+    async def put_stream(
+        self, key: str, chunks: AsyncIterator[bytes], content_type: str
+    ) -> BlobRef: ...
+
+    async def read(self, key: str) -> bytes: ...
+
+    def iter_chunks(self, key: str, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]: ...
+
+    async def stat(self, key: str) -> BlobRef | None: ...
+
+    async def delete(self, key: str) -> None: ...
+
+
+def upload_key(document_id: str) -> str:
+    return f"uploads/{document_id}"
+
+
+class LocalBlobStore:
+    """Blobs on local disk; content type + hash live in a `<file>.meta.json` sidecar."""
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError(f"invalid_blob_key:{key}")
+        return path
+
+    async def put_stream(
+        self, key: str, chunks: AsyncIterator[bytes], content_type: str
+    ) -> BlobRef:
+        path = self._path(key)
+        await asyncio.to_thread(os.makedirs, os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp.{os.getpid()}"
+        h = hashlib.sha256()
+        size = 0
+
+        f = await asyncio.to_thread(open, tmp, "wb")
+        try:
+            async for chunk in chunks:
+                h.update(chunk)
+                size += len(chunk)
+                await asyncio.to_thread(f.write, chunk)
+            await asyncio.to_thread(f.flush)
+            await asyncio.to_thread(os.fsync, f.fileno())
+        except BaseException:
+            f.close()
+            await asyncio.to_thread(os.remove, tmp)
+            raise
+        f.close()
+
+        ref = BlobRef(key=key, size=size, sha256=h.hexdigest(), content_type=content_type)
+        meta = json.dumps({"size": size, "sha256": ref.sha256, "content_type": content_type})
+
+        def _commit():
+            with open(f"{path}.meta.json", "w", encoding="utf-8") as m:
+                m.write(meta)
+            os.replace(tmp, path)
+
+        await asyncio.to_thread(_commit)
+        return ref
+
+    async def read(self, key: str) -> bytes:
+        def _read() -> bytes:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+
+        return await asyncio.to_thread(_read)
+
+    async def iter_chunks(self, key: str, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+        f = await asyncio.to_thread(open, self._path(key), "rb")
+        try:
+            while chunk := await asyncio.to_thread(f.read, chunk_size):
+                yield chunk
+        finally:
+            f.close()
+
+    async def stat(self, key: str) -> BlobRef | None:
+        path = self._path(key)
+
+        def _stat() -> BlobRef | None:
+            if not os.path.exists(path):
+                return None
+            try:
+                with open(f"{path}.meta.json", "r", encoding="utf-8") as m:
+                    meta = json.load(m)
+            except FileNotFoundError:
+                meta = {}
+            return BlobRef(
+                key=key,
+                size=int(meta.get("size", os.path.getsize(path))),
+                sha256=meta.get("sha256", ""),
+                content_type=meta.get("content_type", "application/octet-stream"),
+            )
+
+        return await asyncio.to_thread(_stat)
+
+    async def delete(self, key: str) -> None:
+        path = self._path(key)
+
+        def _delete():
+            for p in (path, f"{path}.meta.json"):
+                try:
+                    os.remove(p)
+                except FileNotFoundError:
+                    pass
+
+        await asyncio.to_thread(_delete)
+
+
+class S3BlobStore:
+    """S3 or any S3-compatible endpoint (MinIO, LocalStack) via `endpoint_url`."""
+
+    # Uploads up to this size are buffered in memory, larger ones spill to disk.
+    SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+    def __init__(self, bucket: str, endpoint_url: str | None = None, client=None):
+        self.bucket = bucket
+        self.client = client or boto3.client(
+            "s3",
+            region_name=settings.aws_region,
+            endpoint_url=endpoint_url,
+            config=Config(retries={"max_attempts": 10, "mode": "standard"}),
+        )
+
+    async def put_stream(
+        self, key: str, chunks: AsyncIterator[bytes], content_type: str
+    ) -> BlobRef:
+        h = hashlib.sha256()
+        size = 0
+        with tempfile.SpooledTemporaryFile(max_size=self.SPOOL_MAX_BYTES) as spool:
+            async for chunk in chunks:
+                h.update(chunk)
+                size += len(chunk)
+                await asyncio.to_thread(spool.write, chunk)
+            spool.seek(0)
+            # upload_fileobj switches to multipart for large bodies.
+            await asyncio.to_thread(
+                self.client.upload_fileobj,
+                spool,
+                self.bucket,
+                key,
+                ExtraArgs={"ContentType": content_type, "Metadata": {"sha256": h.hexdigest()}},
+            )
+        return BlobRef(key=key, size=size, sha256=h.hexdigest(), content_type=content_type)
+
+    async def read(self, key: str) -> bytes:
+        def _read() -> bytes:
+            return self.client.get_object(Bucket=self.bucket, Key=key)["Body"].read()
+
+        return await asyncio.to_thread(_read)
+
+    async def iter_chunks(self, key: str, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+        obj = await asyncio.to_thread(self.client.get_object, Bucket=self.bucket, Key=key)
+        body = obj["Body"]
+        try:
+            while chunk := await asyncio.to_thread(body.read, chunk_size):
+                yield chunk
+        finally:
+            body.close()
+
+    async def stat(self, key: str) -> BlobRef | None:
+        try:
+            head = await asyncio.to_thread(self.client.head_object, Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return BlobRef(
+            key=key,
+            size=int(head.get("ContentLength", 0)),
+            sha256=(head.get("Metadata") or {}).get("sha256", ""),
+            content_type=head.get("ContentType", "application/octet-stream"),
+        )
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self.client.delete_object, Bucket=self.bucket, Key=key)
+
+
+def build_blob_store() -> BlobStore:
+    backend = (settings.blob_store_backend or "local").lower()
+    if backend == "s3":
+        return S3BlobStore(
+            settings.blob_store_s3_bucket or settings.aws_textract_s3_bucket,
+            endpoint_url=settings.blob_store_s3_endpoint_url,
+        )
+    if backend == "local":
+        return LocalBlobStore(settings.blob_store_root)
+    raise ValueError(f"unknown_blob_store_backend:{backend}")
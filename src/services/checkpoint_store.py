@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, Iterable, Protocol
+
+import redis
+
+from ..settings import settings
+
+logger = logging.getLogger("docproc")
+
+
+class CheckpointStore(Protocol):
+    """
+    Per-job step checkpoints: {step_name: {"seq": n, "delta": fields}}, where `delta` holds
+    the context fields that changed since the previous checkpoint (so the OCR text is
+    written once, not again with every later step).
+    """
+
+    async def load(self, job_id: str) -> Dict[str, Dict[str, Any]]: ...
+
+    async def save(self, job_id: str, steps: Iterable[str], snapshot: Dict[str, Any]) -> None: ...
+
+    async def clear(self, job_id: str) -> None: ...
+
+
+class InMemoryCheckpointStore:
+    """Per-process store; only survives retries within the same worker process."""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = float(ttl_seconds)
+        self._items: Dict[str, tuple[float, Dict[str, str]]] = {}
+
+    async def load(self, job_id: str) -> Dict[str, Dict[str, Any]]:
+        item = self._items.get(job_id)
+        if item is None:
+            return {}
+        expires_at, steps = item
+        if expires_at <= time.monotonic():
+            del self._items[job_id]
+            return {}
+        return {step: json.loads(data) for step, data in steps.items()}
+
+    async def save(self, job_id: str, steps: Iterable[str], snapshot: Dict[str, Any]) -> None:
+        data = json.dumps(snapshot, default=str)
+        _, existing = self._items.get(job_id, (0.0, {}))
+        existing.update({step: data for step in steps})
+        self._items[job_id] = (time.monotonic() + self.ttl_seconds, existing)
+
+    async def clear(self, job_id: str) -> None:
+        self._items.pop(job_id, None)
+
+
+class RedisCheckpointStore:
+    """One hash per job (field = step name), expiring `ttl_seconds` after the last write."""
+
+    def __init__(self, url: str, ttl_seconds: int, prefix: str = "docproc:checkpoint:"):
+        self.client = redis.Redis.from_url(url)
+        self.ttl_seconds = int(ttl_seconds)
+        self.prefix = prefix
+
+    async def load(self, job_id: str) -> Dict[str, Dict[str, Any]]:
+        raw = await asyncio.to_thread(self.client.hgetall, self.prefix + job_id)
+        return {k.decode("utf-8"): json.loads(v) for k, v in (raw or {}).items()}
+
+    async def save(self, job_id: str, steps: Iterable[str], snapshot: Dict[str, Any]) -> None:
+        data = json.dumps(snapshot, default=str)
+        key = self.prefix + job_id
+
+        def _write():
+            pipe = self.client.pipeline()
+            pipe.hset(key, mapping={step: data for step in steps})
+            pipe.expire(key, self.ttl_seconds)
+            pipe.execute()
+
+        await asyncio.to_thread(_write)
+
+    async def clear(self, job_id: str) -> None:
+        await asyncio.to_thread(self.client.delete, self.prefix + job_id)
+
+
+def build_checkpoint_store() -> CheckpointStore | None:
+    backend = (settings.checkpoint_backend or "off").lower()
+    if backend == "redis":
+        return RedisCheckpointStore(settings.redis_url, settings.checkpoint_ttl_seconds)
+    if backend == "memory":
+        return InMemoryCheckpointStore(settings.checkpoint_ttl_seconds)
+    return None
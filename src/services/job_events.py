@@ -0,0 +1,138 @@
+"""
+Job status transitions over Redis pub/sub.
+
+Workers publish one small JSON message per committed transition; each API process
+holds a single subscription (JobEventHub) and fans messages out to the SSE streams
+watching those jobs. Events are best-effort: a client that misses one still gets
+the current state from the snapshot sent when its stream opens.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+import weakref
+from typing import Any, AsyncIterator, Dict, Iterable, Set
+
+import redis.asyncio as aioredis
+
+from ..common.time import utcnow
+from ..settings import settings
+
+logger = logging.getLogger("docproc")
+
+CHANNEL = "docproc:job-events"
+# "retrying" (a failed attempt that will run again) is not final; "failed" is only set
+# once the task's retries are exhausted.
+TERMINAL_STATUSES = frozenset({"completed", "review_pending", "failed"})
+
+
+class JobEventPublisher:
+    def __init__(self, url: str | None, channel: str = CHANNEL):
+        self.url = url
+        self.channel = channel
+        # redis.asyncio connections belong to the loop that opened them.
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aioredis.Redis]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _client(self) -> aioredis.Redis:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = self._clients[loop] = aioredis.Redis.from_url(
+                self.url, socket_connect_timeout=1, socket_timeout=1
+            )
+        return client
+
+    async def publish(self, job_id: str, document_id: str, status: str, **extra: Any) -> None:
+        """Call after the transition is committed, so readers never see it early."""
+        if self.url is None:
+            return
+        message = {"job_id": job_id, "document_id": document_id, "status": status, "at": utcnow().isoformat(), **extra}
+        try:
+            await self._client().publish(self.channel, json.dumps(message, default=str))
+        except Exception as e:
+            logger.warning("Job event publish failed for %s: %s", job_id, e)
+
+
+class JobEventHub:
+    """One pub/sub connection per API process, shared by all SSE streams."""
+
+    def __init__(self, url: str, channel: str = CHANNEL):
+        self.url = url
+        self.channel = channel
+        self._watchers: Dict[str, Set[asyncio.Queue]] = {}
+        self._task: asyncio.Task | None = None
+        self._ready: asyncio.Event | None = None
+
+    @contextlib.asynccontextmanager
+    async def subscribe(self, job_ids: Iterable[str]) -> AsyncIterator[asyncio.Queue]:
+        """Queue of event dicts for `job_ids`; subscribed before this returns."""
+        ids = set(job_ids)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1000)
+        for job_id in ids:
+            self._watchers.setdefault(job_id, set()).add(queue)
+        try:
+            await self._ensure_listening()
+            yield queue
+        finally:
+            for job_id in ids:
+                watchers = self._watchers.get(job_id)
+                if watchers is not None:
+                    watchers.discard(queue)
+                    if not watchers:
+                        del self._watchers[job_id]
+
+    async def _ensure_listening(self) -> None:
+        if self._task is None or self._task.done():
+            self._ready = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._listen())
+        await self._ready.wait()
+
+    async def _listen(self) -> None:
+        while True:
+            client = aioredis.Redis.from_url(self.url)
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                self._ready.set()
+                async for message in pubsub.listen():
+                    self._dispatch(message.get("data"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Job event subscription lost (%s); reconnecting", e)
+                self._ready.set()  # streams fall back to their snapshot + keep-alives
+                await asyncio.sleep(1.0)
+            finally:
+                await pubsub.aclose()
+                await client.aclose()
+
+    def _dispatch(self, data: Any) -> None:
+        try:
+            event = json.loads(data)
+        except (TypeError, ValueError):
+            return
+        for queue in self._watchers.get(event.get("job_id"), ()):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                pass  # slow client; it still sees the final state on reconnect
+
+
+def build_job_event_publisher() -> JobEventPublisher:
+    if (settings.job_events_backend or "off").lower() == "redis":
+        return JobEventPublisher(settings.redis_url)
+    return JobEventPublisher(None)
+
+
+def build_job_event_hub() -> JobEventHub | None:
+    if (settings.job_events_backend or "off").lower() == "redis":
+        return JobEventHub(settings.redis_url)
+    return None
+
+
+job_events = build_job_event_publisher()
+
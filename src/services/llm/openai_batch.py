@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from typing import Any, Dict, Iterable, Tuple
+
+from openai import AsyncOpenAI
+
+from ...settings import settings
+from .openai_extractor import _completion_request, _parse_completion
+
+logger = logging.getLogger("docproc")
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+def build_batch_file(items: Iterable[Tuple[str, str]]) -> bytes:
+    """JSONL input for the Batch API: one chat completion per (custom_id, ocr_text)."""
+    lines = [
+        json.dumps(
+            {
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": _completion_request(text),
+            }
+        )
+        for custom_id, text in items
+    ]
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def parse_batch_output(output: str, texts: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+    """Batch output JSONL -> {custom_id: extraction}. Failed lines are left out."""
+    results: Dict[str, Dict[str, Any]] = {}
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        row = json.loads(line)
+        custom_id = row.get("custom_id")
+        if custom_id not in texts:
+            continue
+        response = row.get("response") or {}
+        if row.get("error") or response.get("status_code") != 200:
+            continue
+        try:
+            content = response["body"]["choices"][0]["message"]["content"] or "{}"
+        except (KeyError, IndexError, TypeError):
+            continue
+        results[custom_id] = _parse_completion(content, texts[custom_id])
+    return results
+
+
+class OpenAIBatchExtractor:
+    """
+    Offline extraction through the OpenAI Batch API (cheaper, higher throughput,
+    minutes-to-hours latency). For backfills and bulk imports, not interactive traffic.
+    Point OPENAI_BASE_URL at a local mock server to run it without OpenAI.
+    """
+
+    def __init__(
+        self,
+        client: AsyncOpenAI | None = None,
+        poll_seconds: float = 30.0,
+        completion_window: str = "24h",
+    ):
+        if client is None and settings.openai_api_key:
+            client = AsyncOpenAI(
+                api_key=settings.openai_api_key, base_url=settings.openai_base_url
+            )
+        self.client = client
+        self.poll_seconds = poll_seconds
+        self.completion_window = completion_window
+
+    async def extract_many(self, items: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """
+        {custom_id: ocr_text} -> {custom_id: {"fields", "confidence"}}. Ids the batch did
+        not answer (failed/expired/cancelled batch, error rows) are left out.
+        """
+        if not items or not self.client:
+            return {}
+
+        batch_id = await self.submit(items)
+        batch = await self.wait(batch_id)
+
+        results: Dict[str, Dict[str, Any]] = {}
+        if batch.status == "completed" and batch.output_file_id:
+            content = await self.client.files.content(batch.output_file_id)
+            results = parse_batch_output(content.text, items)
+        else:
+            logger.warning("OpenAI batch %s ended as %s", batch_id, batch.status)
+
+        missing = [cid for cid in items if cid not in results]
+        if missing:
+            logger.warning("OpenAI batch %s: %d items without a result", batch_id, len(missing))
+        return results
+
+    async def submit(self, items: Dict[str, str]) -> str:
+        f = await self.client.files.create(
+            file=("extraction_batch.jsonl", build_batch_file(items.items())),
+            purpose="batch",
+        )
+        batch = await self.client.batches.create(
+            input_file_id=f.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=self.completion_window,
+        )
+        logger.info("Submitted OpenAI batch %s with %d documents", batch.id, len(items))
+        return batch.id
+
+    async def wait(self, batch_id: str):
+        while True:
+            batch = await self.client.batches.retrieve(batch_id)
+            if batch.status in TERMINAL_STATUSES:
+                return batch
+            await asyncio.sleep(self.poll_seconds)
@@ -1,12 +1,20 @@
 from __future__ import annotations
 
+import asyncio
+import copy
 import json
+
+import httpx
 from pydantic import BaseModel, Field, ValidationError
-from typing import Dict, Any
+from typing import Any, Dict
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 from ...settings import settings
+from ...common.crypto import sha256_bytes
+from ...observability.metrics import LLM_REQUESTS_COALESCED
+from ...workflow.adaptive import is_overload_error
 from ..confidence import compute_all_confidence
+from .prompt import DEFAULT_PROMPT_TOKEN_BUDGET, cap_tokens
 
 
 class InvoiceFields(BaseModel):
@@ -19,148 +27,220 @@ class InvoiceFields(BaseModel):
     line_items: list[dict] | None = None
 
 
+SYSTEM_PROMPT = (
+    "You extract invoice fields from raw OCR text.\n\n"
+    "Rules:\n"
+    "- Output must be ONLY valid JSON that matches the schema.\n"
+    "- If a field is not found or unclear, use null (do not guess or make up values).\n"
+    "- invoice_number: the invoice/reference number. Use null if not found.\n"
+    "- vendor_name: the supplier/company issuing the invoice. Use null if not found.\n"
+    "- total_amount: the final payable amount. Prefer labels like 'Total', 'Amount Due', 'Balance Due'. Use null if not found.\n"
+    "- currency: a 3-letter ISO code (e.g., USD, EUR, GBP, CHF). If multiple appear, pick the one tied to total. Use null if not found.\n"
+    "- invoice_date: convert to YYYY-MM-DD if the date is present. If unclear or not found, use null.\n"
+    "- tax_amount: only if explicitly shown (VAT, Tax, GST). Otherwise null.\n"
+    "- line_items: include only if line items are clearly present; otherwise null.\n"
+    "- Ignore duplicates, headers/footers, and OCR noise.\n"
+    "- It is better to return null for missing fields than to guess incorrect values.\n"
+)
+
+
+def _empty_extraction() -> Dict[str, Any]:
+    empty = {
+        "invoice_number": None,
+        "vendor_name": None,
+        "total_amount": None,
+        "currency": None,
+        "invoice_date": None,
+        "tax_amount": None,
+        "line_items": None,
+    }
+    return {
+        "fields": empty,
+        "confidence": {k: 0.0 for k in empty},
+    }
+
+
+# Hard cap on prompt tokens, whatever the caller passes; above the default compaction
+# budget, so compacted text is sent as is.
+MAX_PROMPT_TOKENS = 2 * DEFAULT_PROMPT_TOKEN_BUDGET
+
+
+def _completion_request(text: str) -> Dict[str, Any]:
+    text = cap_tokens(text, MAX_PROMPT_TOKENS)
+    return {
+        "model": settings.openai_model,
+        "messages": [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": text},
+        ],
+        "response_format": {
+            "type": "json_schema",
+            "json_schema": {
+                "name": "InvoiceFields",
+                "schema": InvoiceFields.model_json_schema(),
+            },
+        },
+        "temperature": 0,
+    }
+
+
+def _parse_completion(content: str, text: str) -> Dict[str, Any]:
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError:
+        data = {}
+
+    for key in ["invoice_number", "vendor_name", "currency", "invoice_date"]:
+        if key in data:
+            val = data[key]
+            if (
+                val == ""
+                or val == "UNKNOWN"
+                or (isinstance(val, str) and val.strip() == "")
+            ):
+                data[key] = None
+
+    try:
+        validated = InvoiceFields(**data)
+        fields = validated.model_dump()
+    except (ValidationError, TypeError, ValueError):
+
+        def _safe_value(key: str):
+            v = data.get(key)
+            if v is None or v == "" or v == "UNKNOWN":
+                return None
+            if key == "total_amount" and not isinstance(v, (int, float)):
+                try:
+                    return float(v) if v is not None else None
+                except (TypeError, ValueError):
+                    return None
+            if (
+                key == "tax_amount"
+                and not isinstance(v, (int, float))
+                and v is not None
+            ):
+                try:
+                    return float(v)
+                except (TypeError, ValueError):
+                    return None
+            if key == "line_items" and not isinstance(v, list):
+                return None
+            return v
+
+        fields = {
+            "invoice_number": (
+                _safe_value("invoice_number")
+                if isinstance(data.get("invoice_number"), (str, type(None)))
+                else None
+            ),
+            "vendor_name": (
+                _safe_value("vendor_name")
+                if isinstance(data.get("vendor_name"), (str, type(None)))
+                else None
+            ),
+            "total_amount": _safe_value("total_amount"),
+            "currency": (
+                _safe_value("currency")
+                if isinstance(data.get("currency"), (str, type(None)))
+                else None
+            ),
+            "invoice_date": (
+                _safe_value("invoice_date")
+                if isinstance(data.get("invoice_date"), (str, type(None)))
+                else None
+            ),
+            "tax_amount": _safe_value("tax_amount"),
+            "line_items": (
+                data.get("line_items")
+                if isinstance(data.get("line_items"), list)
+                else None
+            ),
+        }
+
+    try:
+        confidence_scores = compute_all_confidence(fields, text)
+    except Exception:
+        confidence_scores = {k: 0.0 for k in fields}
+
+    return {
+        "fields": fields,
+        "confidence": confidence_scores,
+    }
+
+
 class OpenAIStructuredExtractor:
-    def __init__(self):
-        self.client = (
-            OpenAI(api_key=settings.openai_api_key) if settings.openai_api_key else None
+    def __init__(self, client: OpenAI | None = None):
+        # The sync client is thread-safe; share one per process to reuse its connection pool.
+        self.client = client or (
+            OpenAI(api_key=settings.openai_api_key, base_url=settings.openai_base_url)
+            if settings.openai_api_key
+            else None
         )
 
     def extract(self, text: str) -> Dict[str, Any]:
-        def _empty_extraction() -> Dict[str, Any]:
-            empty = {
-                "invoice_number": None,
-                "vendor_name": None,
-                "total_amount": None,
-                "currency": None,
-                "invoice_date": None,
-                "tax_amount": None,
-                "line_items": None,
-            }
-            return {
-                "fields": empty,
-                "confidence": {k: 0.0 for k in empty},
-            }
-
         if not self.client:
             return _empty_extraction()
         try:
             return self._extract_impl(text)
-        except Exception:
+        except Exception as e:
+            if is_overload_error(e):
+                raise  # retried by the caller; an empty result would go to review
             return _empty_extraction()
 
     def _extract_impl(self, text: str) -> Dict[str, Any]:
         assert self.client is not None
-        schema = InvoiceFields.model_json_schema()
-
-        system_prompt = (
-            "You extract invoice fields from raw OCR text.\n\n"
-            "Rules:\n"
-            "- Output must be ONLY valid JSON that matches the schema.\n"
-            "- If a field is not found or unclear, use null (do not guess or make up values).\n"
-            "- invoice_number: the invoice/reference number. Use null if not found.\n"
-            "- vendor_name: the supplier/company issuing the invoice. Use null if not found.\n"
-            "- total_amount: the final payable amount. Prefer labels like 'Total', 'Amount Due', 'Balance Due'. Use null if not found.\n"
-            "- currency: a 3-letter ISO code (e.g., USD, EUR, GBP, CHF). If multiple appear, pick the one tied to total. Use null if not found.\n"
-            "- invoice_date: convert to YYYY-MM-DD if the date is present. If unclear or not found, use null.\n"
-            "- tax_amount: only if explicitly shown (VAT, Tax, GST). Otherwise null.\n"
-            "- line_items: include only if line items are clearly present; otherwise null.\n"
-            "- Ignore duplicates, headers/footers, and OCR noise.\n"
-            "- It is better to return null for missing fields than to guess incorrect values.\n"
-        )
-
-        resp = self.client.chat.completions.create(
-            model=settings.openai_model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": text[:20000]},
-            ],
-            response_format={
-                "type": "json_schema",
-                "json_schema": {"name": "InvoiceFields", "schema": schema},
-            },
-            temperature=0,
-        )
-
-        content = resp.choices[0].message.content or "{}"
-
-        try:
-            data = json.loads(content)
-        except json.JSONDecodeError:
-            data = {}
-
-        for key in ["invoice_number", "vendor_name", "currency", "invoice_date"]:
-            if key in data:
-                val = data[key]
-                if (
-                    val == ""
-                    or val == "UNKNOWN"
-                    or (isinstance(val, str) and val.strip() == "")
-                ):
-                    data[key] = None
-
-        try:
-            validated = InvoiceFields(**data)
-            fields = validated.model_dump()
-        except (ValidationError, TypeError, ValueError):
-
-            def _safe_value(key: str):
-                v = data.get(key)
-                if v is None or v == "" or v == "UNKNOWN":
-                    return None
-                if key == "total_amount" and not isinstance(v, (int, float)):
-                    try:
-                        return float(v) if v is not None else None
-                    except (TypeError, ValueError):
-                        return None
-                if (
-                    key == "tax_amount"
-                    and not isinstance(v, (int, float))
-                    and v is not None
-                ):
-                    try:
-                        return float(v)
-                    except (TypeError, ValueError):
-                        return None
-                if key == "line_items" and not isinstance(v, list):
-                    return None
-                return v
-
-            fields = {
-                "invoice_number": (
-                    _safe_value("invoice_number")
-                    if isinstance(data.get("invoice_number"), (str, type(None)))
-                    else None
-                ),
-                "vendor_name": (
-                    _safe_value("vendor_name")
-                    if isinstance(data.get("vendor_name"), (str, type(None)))
-                    else None
-                ),
-                "total_amount": _safe_value("total_amount"),
-                "currency": (
-                    _safe_value("currency")
-                    if isinstance(data.get("currency"), (str, type(None)))
-                    else None
+        resp = self.client.chat.completions.create(**_completion_request(text))
+        return _parse_completion(resp.choices[0].message.content or "{}", text)
+
+
+class AsyncOpenAIStructuredExtractor:
+    """
+    Async extractor on one shared AsyncOpenAI client (keep-alive connection pool),
+    so no thread or TLS handshake per document. Identical in-flight prompts are
+    coalesced into a single request.
+    """
+
+    def __init__(self, client: AsyncOpenAI | None = None):
+        if client is None and settings.openai_api_key:
+            client = AsyncOpenAI(
+                api_key=settings.openai_api_key,
+                base_url=settings.openai_base_url,
+                http_client=httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=settings.openai_max_connections,
+                        max_keepalive_connections=settings.openai_max_connections,
+                    ),
+                    timeout=httpx.Timeout(60.0, connect=10.0),
                 ),
-                "invoice_date": (
-                    _safe_value("invoice_date")
-                    if isinstance(data.get("invoice_date"), (str, type(None)))
-                    else None
-                ),
-                "tax_amount": _safe_value("tax_amount"),
-                "line_items": (
-                    data.get("line_items")
-                    if isinstance(data.get("line_items"), list)
-                    else None
-                ),
-            }
+            )
+        self.client = client
+        self._inflight: Dict[str, asyncio.Task] = {}
 
+    async def extract_async(self, text: str, coalesce: bool = True) -> Dict[str, Any]:
+        if not self.client:
+            return _empty_extraction()
+        if not coalesce:
+            return await self._extract_once(text)
+
+        key = sha256_bytes(f"{settings.openai_model}\0{text}".encode("utf-8"))
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._extract_once(text))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t: self._inflight.pop(key, None))
+        else:
+            LLM_REQUESTS_COALESCED.inc()
+
+        # shield: one caller being cancelled must not cancel the shared request.
+        result = await asyncio.shield(task)
+        return copy.deepcopy(result)
+
+    async def _extract_once(self, text: str) -> Dict[str, Any]:
+        assert self.client is not None
         try:
-            confidence_scores = compute_all_confidence(fields, text)
-        except Exception:
-            confidence_scores = {k: 0.0 for k in fields}
-
-        return {
-            "fields": fields,
-            "confidence": confidence_scores,
-        }
+            resp = await self.client.chat.completions.create(**_completion_request(text))
+            return _parse_completion(resp.choices[0].message.content or "{}", text)
+        except Exception as e:
+            if is_overload_error(e):
+                raise
+            return _empty_extraction()
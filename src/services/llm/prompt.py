@@ -0,0 +1,132 @@
+"""
+OCR text -> LLM prompt text.
+
+Cleans the OCR output (whitespace, boilerplate, repeated headers/footers) and, when it
+still exceeds the token budget, keeps the lines most likely to carry the target fields
+instead of cutting the document off at a fixed length.
+"""
+from __future__ import annotations
+
+import math
+import re
+from functools import lru_cache
+from typing import Callable, List
+
+from ...observability.metrics import LLM_PROMPT_TOKENS
+from ...settings import settings
+
+DEFAULT_PROMPT_TOKEN_BUDGET = 6000
+HEADER_LINES = 8  # vendor name / invoice number usually sit at the top
+
+_WS = re.compile(r"\s+")
+_BOILERPLATE = [
+    re.compile(p, re.IGNORECASE)
+    for p in (
+        r"^page\s*\d+(\s*(of|/)\s*\d+)?$",
+        r"^\d+\s*/\s*\d+$",
+        r"^(continued|cont'?d\.?)(\s+on next page)?\.?$",
+        r"^thank you( for your (business|order|purchase))?[.!]?$",
+        r"^[\W_]+$",  # rules, dashes, stray punctuation
+    )
+]
+_TOTAL_HINTS = re.compile(r"\b(total|amount due|balance due|amount payable|grand total)\b", re.IGNORECASE)
+_FIELD_HINTS = re.compile(
+    r"\b(invoice|inv|number|date|due|subtotal|tax|vat|gst|currency|bill(ed)? to|supplier|vendor)\b",
+    re.IGNORECASE,
+)
+_AMOUNT = re.compile(r"\d[\d,.' ]*[.,]\d{2}\b")
+_CURRENCY = re.compile(r"[$€£¥]|\b(USD|EUR|GBP|CHF|JPY|CAD|AUD)\b")
+
+
+@lru_cache(maxsize=1)
+def _token_counter() -> Callable[[str], int]:
+    try:
+        import tiktoken
+
+        try:
+            enc = tiktoken.encoding_for_model(settings.openai_model)
+        except KeyError:
+            enc = tiktoken.get_encoding("o200k_base")
+        return lambda s: len(enc.encode(s, disallowed_special=()))
+    except Exception:
+        # ~4 characters per token for English/Latin OCR text
+        return lambda s: math.ceil(len(s) / 4)
+
+
+def count_tokens(text: str) -> int:
+    return _token_counter()(text) if text else 0
+
+
+def clean_lines(text: str) -> List[str]:
+    """Normalized non-empty lines without boilerplate or repeated non-amount lines."""
+    out: List[str] = []
+    seen: set[str] = set()
+    for raw in text.splitlines():
+        line = _WS.sub(" ", raw).strip()
+        if not line or any(p.match(line) for p in _BOILERPLATE):
+            continue
+        key = line.lower()
+        # Page headers/footers repeat verbatim; identical line items (with amounts) are kept.
+        if key in seen and not _AMOUNT.search(line):
+            continue
+        seen.add(key)
+        out.append(line)
+    return out
+
+
+def _line_scores(lines: List[str]) -> List[int]:
+    n = len(lines)
+    scores = [0] * n
+    for i, line in enumerate(lines):
+        s = 0
+        if _TOTAL_HINTS.search(line):
+            s = 6
+        elif _FIELD_HINTS.search(line):
+            s = 4
+        if _AMOUNT.search(line) or _CURRENCY.search(line):
+            s = max(s, 2)
+        if i < HEADER_LINES:
+            s = max(s, 3)
+        elif i >= n - HEADER_LINES:
+            s = max(s, 1)
+        scores[i] = max(scores[i], s)
+        # Labels and values are often split across neighbouring lines.
+        if s >= 4:
+            for j in (i - 1, i + 1):
+                if 0 <= j < n:
+                    scores[j] = max(scores[j], s - 1)
+    return scores
+
+
+def select_lines(lines: List[str], token_budget: int) -> List[str]:
+    costs = [count_tokens(line) + 1 for line in lines]
+    if sum(costs) <= token_budget:
+        return lines
+
+    scores = _line_scores(lines)
+    keep: set[int] = set()
+    remaining = token_budget
+    for i in sorted(range(len(lines)), key=lambda i: (-scores[i], i)):
+        if costs[i] <= remaining:
+            keep.add(i)
+            remaining -= costs[i]
+    return [line for i, line in enumerate(lines) if i in keep]
+
+
+def cap_tokens(text: str, max_tokens: int) -> str:
+    """
+    Hard cap for text that may not have been compacted: drops the lowest-scored lines,
+    and only cuts characters when no whole line fits.
+    """
+    if len(text) <= max_tokens:  # a token is at least one character
+        return text
+    kept = select_lines(text.splitlines(), max_tokens)
+    if kept:
+        return "\n".join(kept)
+    return text[: max_tokens * 4]
+
+
+def prepare_prompt_text(text: str, token_budget: int = DEFAULT_PROMPT_TOKEN_BUDGET) -> str:
+    out = "\n".join(select_lines(clean_lines(text or ""), token_budget))
+    LLM_PROMPT_TOKENS.observe(count_tokens(out))
+    return out
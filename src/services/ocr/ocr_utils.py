@@ -1,9 +1,40 @@
 from __future__ import annotations
+import io
+import threading
 from typing import Iterable
 
+import pypdfium2 as pdfium  # ships with pdfplumber
+
+# pdfium is not thread-safe and splits run in worker threads.
+_PDFIUM_LOCK = threading.Lock()
+
 def textract_blocks_to_text(blocks: list[dict]) -> str:
     lines = []
     for b in blocks:
         if b.get("BlockType") == "LINE" and b.get("Text"):
             lines.append(b["Text"])
     return "\n".join(lines).strip()
+
+
+def split_pdf_pages(pdf_bytes: bytes) -> list[bytes]:
+    """One single-page PDF per page, in page order (no rasterising, so text quality is kept)."""
+    with _PDFIUM_LOCK:
+        return _split_pdf_pages(pdf_bytes)
+
+
+def _split_pdf_pages(pdf_bytes: bytes) -> list[bytes]:
+    src = pdfium.PdfDocument(pdf_bytes)
+    try:
+        pages = []
+        for i in range(len(src)):
+            dst = pdfium.PdfDocument.new()
+            try:
+                dst.import_pages(src, [i])
+                buf = io.BytesIO()
+                dst.save(buf)
+                pages.append(buf.getvalue())
+            finally:
+                dst.close()
+        return pages
+    finally:
+        src.close()
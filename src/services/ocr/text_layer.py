@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import io
+import re
+
+import pdfplumber
+
+# pdfminer emits "(cid:NN)" for glyphs it can't map to text (broken/missing ToUnicode).
+_CID = re.compile(r"\(cid:\d+\)")
+_WORDLIKE = re.compile(r"[\w$€£%][\w.,:;/#()\-$€£%']*")
+
+
+def extract_page_texts(pdf_bytes: bytes) -> list[str]:
+    """Embedded text layer per page ("" for pages without one). Empty list if unreadable."""
+    try:
+        with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+            return [(page.extract_text() or "") for page in pdf.pages]
+    except Exception:
+        return []
+
+
+def score_page_text(text: str, min_chars: int = 40) -> float:
+    """
+    0..1 estimate of whether a page's text layer is usable instead of OCR.
+    Scanned pages have no/very little text; broken encodings yield cid codes or symbol soup.
+    """
+    stripped = (text or "").strip()
+    if len(stripped) < min_chars:
+        return 0.0
+
+    cid_count = len(_CID.findall(stripped))
+    clean = _CID.sub(" ", stripped)
+    chars = [c for c in clean if not c.isspace()]
+    tokens = clean.split()
+    if not chars or not tokens:
+        return 0.0
+
+    printable = sum(c.isprintable() for c in chars) / len(chars)
+    alnum = sum(c.isalnum() for c in chars) / len(chars)
+    wordlike = sum(1 for t in tokens if _WORDLIKE.fullmatch(t)) / len(tokens)
+    cid_penalty = cid_count / (cid_count + len(tokens))
+
+    return printable * min(1.0, alnum / 0.5) * wordlike * (1.0 - cid_penalty)
@@ -23,7 +23,6 @@ def build_textract_deps() -> TextractDeps:
     cfg = Config(retries={"max_attempts": 10, "mode": "standard"})
     textract = boto3.client("textract", region_name=settings.aws_region, config=cfg)
     s3 = boto3.client("s3", region_name=settings.aws_region, config=cfg)
-    print(settings.aws_textract_s3_bucket, "uk,bkbhjvkuvkvukjgvjgvjgh")
     return TextractDeps(
         textract=textract, s3=s3, bucket=settings.aws_textract_s3_bucket
     )
@@ -1,109 +1,303 @@
 from __future__ import annotations
 
+import asyncio
 import io
 import time
 import uuid
+from dataclasses import dataclass
 
 import pdfplumber
 
-from .textract_client import build_textract_deps
-from .ocr_utils import textract_blocks_to_text
+from .textract_client import TextractDeps, build_textract_deps
+from .ocr_utils import split_pdf_pages, textract_blocks_to_text
+from .text_layer import extract_page_texts, score_page_text
+from ...observability.metrics import OCR_DOCUMENTS, OCR_PAGES
+from ...workflow.adaptive import is_overload_error
 import logging
 
 logger = logging.getLogger("docproc")
 
+RESULT_PAGE_SIZE = 1000  # GetDocumentTextDetection max
+SYNC_MAX_BYTES = 10 * 1024 * 1024  # DetectDocumentText document size limit
+
+# OCR modes for multi-page PDFs
+MODE_ASYNC_JOB = "async_job"  # S3 upload + StartDocumentTextDetection
+MODE_PAGE_PARALLEL = "page_parallel"  # local split + concurrent DetectDocumentText
+
+PDF_TYPES = ("application/pdf", "application/octet-stream")
+IMAGE_TYPES = ("image/png", "image/jpeg", "image/jpg")
+
+
+@dataclass(frozen=True)
+class OcrOptions:
+    mode: str = MODE_ASYNC_JOB
+    page_concurrency: int = 4
+    max_parallel_pages: int = 10
+    # Use the PDF's own text layer where it is good enough; OCR only the weak pages.
+    text_layer: bool = False
+    text_layer_min_chars: int = 40
+    text_layer_min_score: float = 0.6
+
+    @classmethod
+    def from_cfg(cls, cfg: dict) -> "OcrOptions":
+        d = cls()
+        return cls(
+            mode=cfg.get("mode") or d.mode,
+            page_concurrency=int(cfg.get("page_concurrency") or d.page_concurrency),
+            max_parallel_pages=int(cfg.get("max_parallel_pages") or d.max_parallel_pages),
+            text_layer=bool(cfg.get("text_layer", d.text_layer)),
+            text_layer_min_chars=int(cfg.get("text_layer_min_chars", d.text_layer_min_chars)),
+            text_layer_min_score=float(cfg.get("text_layer_min_score", d.text_layer_min_score)),
+        )
+
+
+def _join_pages(texts: list[str]) -> str:
+    return "\n".join(t.strip() for t in texts if t and t.strip()).strip()
+
 
 class TextractTextExtractor:
+    def __init__(
+        self,
+        deps: TextractDeps | None = None,
+        poll_initial_seconds: float = 1.0,
+        poll_max_seconds: float = 5.0,
+        poll_backoff: float = 1.5,
+        job_timeout_seconds: float = 600.0,
+    ):
+        # boto3 clients are thread-safe; build them once and reuse across documents.
+        self._deps = deps
+        self.poll_initial_seconds = poll_initial_seconds
+        self.poll_max_seconds = poll_max_seconds
+        self.poll_backoff = poll_backoff
+        self.job_timeout_seconds = job_timeout_seconds
+
+    def _get_deps(self) -> TextractDeps:
+        if self._deps is None:
+            self._deps = build_textract_deps()
+        return self._deps
+
     def extract_text(self, file_bytes: bytes, content_type: str) -> str:
+        # Sync entry point (TextExtractor protocol); runs the async path on a private loop.
+        return asyncio.run(self.extract_text_async(file_bytes, content_type))
+
+    async def extract_text_async(
+        self, file_bytes: bytes, content_type: str, options: OcrOptions | None = None
+    ) -> str:
+        opts = options or OcrOptions()
+        is_pdf = content_type in PDF_TYPES
+
+        page_texts: list[str] = []
+        weak: list[int] = []
+        if is_pdf and opts.text_layer:
+            page_texts = await asyncio.to_thread(extract_page_texts, file_bytes)
+            weak = [
+                i
+                for i, t in enumerate(page_texts)
+                if score_page_text(t, opts.text_layer_min_chars) < opts.text_layer_min_score
+            ]
+            if page_texts and not weak:
+                OCR_PAGES.labels(strategy="text_layer").inc(len(page_texts))
+                OCR_DOCUMENTS.labels(strategy="text_layer").inc()
+                return _join_pages(page_texts)
+
         try:
-            deps = build_textract_deps()
+            deps = self._get_deps()
         except RuntimeError as e:
             logger.warning("Textract deps unavailable (%s); returning empty text.", e)
             return ""
 
-        if content_type in ("image/png", "image/jpeg", "image/jpg"):
-            try:
-                resp = deps.textract.detect_document_text(
-                    Document={"Bytes": file_bytes}
-                )
-                return textract_blocks_to_text(resp.get("Blocks", []))
-            except Exception as e:
-                logger.warning(
-                    "Textract sync image failed: %s; returning empty text.", e
-                )
-                return ""
+        if content_type in IMAGE_TYPES:
+            OCR_DOCUMENTS.labels(strategy="textract").inc()
+            return await self._detect_sync(deps, file_bytes, "image")
+
+        if is_pdf:
+            if page_texts and len(weak) < len(page_texts):
+                text = await self._ocr_weak_pages(deps, file_bytes, page_texts, weak, opts)
+                if text is not None:
+                    OCR_DOCUMENTS.labels(strategy="mixed").inc()
+                    return text
 
-        if content_type in ("application/pdf", "application/octet-stream"):
-            pages = self._count_pdf_pages(file_bytes)
+            OCR_DOCUMENTS.labels(strategy="textract").inc()
+            pages = len(page_texts) or await asyncio.to_thread(
+                self._count_pdf_pages, file_bytes
+            )
             if pages <= 1:
-                try:
-                    resp = deps.textract.detect_document_text(
-                        Document={"Bytes": file_bytes}
-                    )
-                    return textract_blocks_to_text(resp.get("Blocks", []))
-                except Exception as e:
-                    logger.warning(
-                        "Textract sync PDF failed: %s; returning empty text.", e
-                    )
-                    return ""
-
-            key = f"textract-temp/{uuid.uuid4()}.pdf"
-            try:
-                deps.s3.put_object(
-                    Bucket=deps.bucket,
-                    Key=key,
-                    Body=file_bytes,
-                    ContentType="application/pdf",
-                )
-                start = deps.textract.start_document_text_detection(
-                    DocumentLocation={"S3Object": {"Bucket": deps.bucket, "Name": key}}
-                )
-                job_id = start["JobId"]
-
-                blocks: list[dict] = []
-                next_token: str | None = None
-
-                while True:
-                    args = {"JobId": job_id}
-                    if next_token:
-                        args["NextToken"] = next_token
-
-                    res = deps.textract.get_document_text_detection(**args)
-                    status = res.get("JobStatus")
-
-                    if status == "FAILED":
-                        logger.warning(
-                            "Textract job %s failed; returning empty text (job will go to review)",
-                            job_id,
-                        )
-                        return ""
-
-                    if status == "SUCCEEDED":
-                        blocks.extend(res.get("Blocks", []))
-                        next_token = res.get("NextToken")
-                        if not next_token:
-                            break
-                    else:
-                        time.sleep(1.0)
-
-                return textract_blocks_to_text(blocks)
-            except Exception as e:
-                logger.warning(
-                    "Textract S3/async failed (e.g. InvalidS3ObjectException): %s; returning empty text.",
-                    e,
-                )
-                return ""
-            finally:
-                try:
-                    deps.s3.delete_object(Bucket=deps.bucket, Key=key)
-                except Exception:
-                    pass
+                return await self._detect_sync(deps, file_bytes, "PDF")
+            if opts.mode == MODE_PAGE_PARALLEL and pages <= opts.max_parallel_pages:
+                text = await self._run_page_parallel(deps, file_bytes, opts.page_concurrency)
+                if text is not None:
+                    return text
+            return await self._run_async_job(deps, file_bytes, pages)
 
         logger.warning(
             "Unsupported content_type %s; returning empty text.", content_type
         )
         return ""
 
+    async def _ocr_weak_pages(
+        self,
+        deps: TextractDeps,
+        file_bytes: bytes,
+        page_texts: list[str],
+        weak: list[int],
+        opts: OcrOptions,
+    ) -> str | None:
+        """Keep good text-layer pages, OCR the rest. None falls back to whole-document OCR."""
+        pages = await self._split(file_bytes)
+        if pages is None or len(pages) != len(page_texts):
+            return None
+        ocr_texts = await self._ocr_pages(deps, [pages[i] for i in weak], opts.page_concurrency)
+        if ocr_texts is None:
+            return None
+
+        merged = list(page_texts)
+        for i, text in zip(weak, ocr_texts):
+            merged[i] = text
+        OCR_PAGES.labels(strategy="text_layer").inc(len(page_texts) - len(weak))
+        return _join_pages(merged)
+
+    async def _detect_sync(self, deps: TextractDeps, file_bytes: bytes, label: str) -> str:
+        try:
+            resp = await asyncio.to_thread(
+                deps.textract.detect_document_text, Document={"Bytes": file_bytes}
+            )
+            OCR_PAGES.labels(strategy="textract_sync").inc()
+            return textract_blocks_to_text(resp.get("Blocks", []))
+        except Exception as e:
+            if is_overload_error(e):
+                raise  # throttled: retry the step rather than send empty text to review
+            logger.warning(
+                "Textract sync %s failed: %s; returning empty text.", label, e
+            )
+            return ""
+
+    async def _run_page_parallel(
+        self, deps: TextractDeps, file_bytes: bytes, page_concurrency: int
+    ) -> str | None:
+        """
+        Split locally and OCR pages concurrently via the sync API, so wall-clock is
+        roughly the slowest page. Returns None to fall back to the async job.
+        """
+        pages = await self._split(file_bytes)
+        if pages is None:
+            return None
+        texts = await self._ocr_pages(deps, pages, page_concurrency)
+        return None if texts is None else _join_pages(texts)
+
+    async def _split(self, file_bytes: bytes) -> list[bytes] | None:
+        try:
+            pages = await asyncio.to_thread(split_pdf_pages, file_bytes)
+        except Exception as e:
+            logger.warning("PDF split failed (%s); falling back to whole-document OCR.", e)
+            return None
+        if any(len(p) > SYNC_MAX_BYTES for p in pages):
+            return None
+        return pages
+
+    async def _ocr_pages(
+        self, deps: TextractDeps, pages: list[bytes], page_concurrency: int
+    ) -> list[str] | None:
+        sem = asyncio.Semaphore(max(1, int(page_concurrency)))
+
+        async def one(page: bytes) -> str:
+            async with sem:
+                resp = await asyncio.to_thread(
+                    deps.textract.detect_document_text, Document={"Bytes": page}
+                )
+            return textract_blocks_to_text(resp.get("Blocks", []))
+
+        try:
+            texts = await asyncio.gather(*[one(p) for p in pages])
+        except Exception as e:
+            if is_overload_error(e):
+                raise  # whole-document OCR would only add load
+            logger.warning("Textract page OCR failed (%s); falling back to whole-document OCR.", e)
+            return None
+        OCR_PAGES.labels(strategy="textract_sync").inc(len(pages))
+        return list(texts)
+
+    async def _run_async_job(self, deps: TextractDeps, file_bytes: bytes, pages: int) -> str:
+        key = f"textract-temp/{uuid.uuid4()}.pdf"
+        try:
+            await asyncio.to_thread(
+                deps.s3.put_object,
+                Bucket=deps.bucket,
+                Key=key,
+                Body=file_bytes,
+                ContentType="application/pdf",
+            )
+            start = await asyncio.to_thread(
+                deps.textract.start_document_text_detection,
+                DocumentLocation={"S3Object": {"Bucket": deps.bucket, "Name": key}},
+            )
+            job_id = start["JobId"]
+
+            res = await self._wait_for_job(deps, job_id)
+            if res is None:
+                return ""
+
+            # Result pages are chained by NextToken, so they can't be fetched in
+            # parallel; ask for the largest page size to keep the chain short.
+            blocks: list[dict] = list(res.get("Blocks", []))
+            next_token = res.get("NextToken")
+            while next_token:
+                res = await asyncio.to_thread(
+                    deps.textract.get_document_text_detection,
+                    JobId=job_id,
+                    MaxResults=RESULT_PAGE_SIZE,
+                    NextToken=next_token,
+                )
+                blocks.extend(res.get("Blocks", []))
+                next_token = res.get("NextToken")
+
+            OCR_PAGES.labels(strategy="textract_async").inc(pages)
+            return textract_blocks_to_text(blocks)
+        except Exception as e:
+            if is_overload_error(e):
+                raise
+            logger.warning(
+                "Textract S3/async failed (e.g. InvalidS3ObjectException): %s; returning empty text.",
+                e,
+            )
+            return ""
+        finally:
+            try:
+                await asyncio.to_thread(deps.s3.delete_object, Bucket=deps.bucket, Key=key)
+            except Exception:
+                pass
+
+    async def _wait_for_job(self, deps: TextractDeps, job_id: str) -> dict | None:
+        """Poll with growing delays; the loop is free between polls (no thread held)."""
+        delay = self.poll_initial_seconds
+        deadline = time.monotonic() + self.job_timeout_seconds
+
+        while True:
+            await asyncio.sleep(delay)
+            res = await asyncio.to_thread(
+                deps.textract.get_document_text_detection,
+                JobId=job_id,
+                MaxResults=RESULT_PAGE_SIZE,
+            )
+            status = res.get("JobStatus")
+
+            if status == "SUCCEEDED":
+                return res
+            if status == "FAILED":
+                logger.warning(
+                    "Textract job %s failed; returning empty text (job will go to review)",
+                    job_id,
+                )
+                return None
+            if time.monotonic() + delay > deadline:
+                logger.warning(
+                    "Textract job %s still %s after %.0fs; returning empty text.",
+                    job_id,
+                    status,
+                    self.job_timeout_seconds,
+                )
+                return None
+            delay = min(self.poll_max_seconds, delay * self.poll_backoff)
+
     def _count_pdf_pages(self, pdf_bytes: bytes) -> int:
         try:
             with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Protocol
+
+import redis
+
+from ..settings import settings
+from ..workflow.context import WorkflowContext
+
+logger = logging.getLogger("docproc")
+
+
+class ResultCache(Protocol):
+    async def get(self, content_hash: str) -> Optional[Dict[str, Any]]: ...
+
+    async def put(self, content_hash: str, entry: Dict[str, Any]) -> None: ...
+
+
+class InMemoryResultCache:
+    """Per-process LRU cache with a TTL. Handy for tests and single-worker setups."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024):
+        self.ttl_seconds = float(ttl_seconds)
+        self.max_entries = int(max_entries)
+        self._items: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+
+    async def get(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        item = self._items.get(content_hash)
+        if item is None:
+            return None
+        expires_at, data = item
+        if expires_at <= time.monotonic():
+            del self._items[content_hash]
+            return None
+        self._items.move_to_end(content_hash)
+        return json.loads(data)
+
+    async def put(self, content_hash: str, entry: Dict[str, Any]) -> None:
+        # Stored serialized so callers can't mutate cached entries in place.
+        data = json.dumps(entry, default=str)
+        self._items[content_hash] = (time.monotonic() + self.ttl_seconds, data)
+        self._items.move_to_end(content_hash)
+        while len(self._items) > self.max_entries:
+            self._items.popitem(last=False)
+
+
+class RedisResultCache:
+    """Shared cache across workers. Eviction is TTL + the server's maxmemory policy."""
+
+    def __init__(self, url: str, ttl_seconds: int, prefix: str = "docproc:result:"):
+        self.client = redis.Redis.from_url(url)
+        self.ttl_seconds = int(ttl_seconds)
+        self.prefix = prefix
+
+    async def get(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        raw = await asyncio.to_thread(self.client.get, self.prefix + content_hash)
+        return json.loads(raw) if raw else None
+
+    async def put(self, content_hash: str, entry: Dict[str, Any]) -> None:
+        data = json.dumps(entry, default=str)
+        await asyncio.to_thread(
+            self.client.set, self.prefix + content_hash, data, ex=self.ttl_seconds
+        )
+
+
+def build_result_cache() -> ResultCache | None:
+    backend = (settings.result_cache_backend or "off").lower()
+    if backend == "redis":
+        return RedisResultCache(settings.redis_url, settings.result_cache_ttl_seconds)
+    if backend == "memory":
+        return InMemoryResultCache(
+            settings.result_cache_ttl_seconds, settings.result_cache_max_entries
+        )
+    return None
+
+
+def entry_from_context(ctx: WorkflowContext) -> Dict[str, Any] | None:
+    """What we cache: OCR text + the raw model output (never the locked overlay)."""
+    if not ctx.text:
+        return None
+    fields = (ctx.llm_result or {}).get("fields") or {}
+    if not any(v not in (None, "", []) for v in fields.values()):
+        # Empty extraction usually means the LLM was unavailable; don't pin that.
+        return None
+    return {"text": ctx.text, "llm_result": ctx.llm_result}
+
+
+def restore_into_context(ctx: WorkflowContext, entry: Dict[str, Any]) -> None:
+    ctx.text = entry.get("text") or ""
+    ctx.apply_llm_result(entry.get("llm_result") or {})
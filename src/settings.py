@@ -15,10 +15,61 @@ class Settings(BaseSettings):
     # OpenAI
     openai_api_key: str | None = None
     openai_model: str = "gpt-4.1-mini"
+    openai_base_url: str | None = None  # e.g. a local mock server
+    openai_max_connections: int = 64  # keep-alive pool of the shared async client
 
     # AWS
     aws_region: str = "eu-west-2"
     aws_textract_s3_bucket: str = "textract-demo-bucket-wamiri"
 
+    # Upload blob store: local/s3 (s3 also covers MinIO/LocalStack via endpoint_url)
+    blob_store_backend: str = "local"
+    blob_store_root: str = "data/blobs"
+    blob_store_s3_bucket: str | None = None  # defaults to aws_textract_s3_bucket
+    blob_store_s3_endpoint_url: str | None = None
+
+    # POST /v1/process/batch: documents per request (zip members included)
+    batch_max_documents: int = 5000
+    # Uncompressed zip content, per member and per request (zip bomb guard)
+    batch_max_zip_member_bytes: int = 100 * 1024 * 1024
+    batch_max_zip_total_bytes: int = 2 * 1024 * 1024 * 1024
+
+    # Job status events for GET /v1/jobs/events: redis = pushed via pub/sub, off = periodic resync only
+    job_events_backend: str = "redis"
+    job_events_resync_seconds: float = 15.0  # also the SSE keep-alive interval
+    job_status_max_ids: int = 500  # per GET /v1/jobs request
+
+    # Review claims: leased, and returned to the queue by a periodic task once the lease runs out
+    review_claim_lease_seconds: int = 15 * 60
+    review_claim_max_batch: int = 20
+
+    # Asyncio worker (src/async_worker.py): documents in flight per process.
+    # Keep below the DB pool size (pool_size + max_overflow) since each holds a session.
+    async_worker_concurrency: int = 16
+
+    # Content-hash result cache: redis/memory/off
+    result_cache_backend: str = "redis"
+    result_cache_ttl_seconds: int = 7 * 24 * 3600
+    result_cache_max_entries: int = 10_000  # memory backend only
+
+    # Step rate limits (workflow.yaml rate_limit_rps/burst): redis = shared by all workers, local = per process
+    rate_limit_backend: str = "redis"
+
+    # Workflow spans: off/file/otlp
+    tracing_exporter: str = "off"
+    tracing_file_path: str = "data/traces.jsonl"
+    tracing_otlp_endpoint: str = "http://localhost:4318/v1/traces"
+
+    # Per-job step checkpoints so task retries resume: redis/memory/off
+    checkpoint_backend: str = "redis"
+    checkpoint_ttl_seconds: int = 2 * 24 * 3600
+
+    # Worker audit events: buffered = spooled locally and bulk-inserted after commit, direct = in the transaction
+    audit_sink: str = "buffered"
+    audit_spool_dir: str = "data/audit_spool"
+    audit_flush_max_events: int = 500
+    audit_flush_seconds: float = 1.0
+    audit_spool_fsync: bool = False  # process crashes are covered either way; set for host crashes
+
 
 settings = Settings()
@@ -1,125 +1,216 @@
 from __future__ import annotations
 
-import asyncio
-import base64
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown
 
 from .settings import settings
-from .db.engine import SessionLocal, engine
-from .db.base import Base
+from .db.engine import SessionLocal
 from .repositories.documents import DocumentRepo
 from .repositories.jobs import JobRepo
-from .repositories.audit import AuditRepo
+from .repositories.audit import AuditRepo, BufferedAuditRepo, audit_event
 from .repositories.review_queue import ReviewQueueRepo
+from .services.job_events import job_events
 from .workflow.context import WorkflowContext
-from .workflow.runner import WorkflowRunner
+from .worker_runtime import get_runtime, init_runtime
 from .observability.metrics import DOCS_PROCESSED, DOC_PROCESS_LATENCY, ERRORS
 from .monitoring import maybe_start_sla_scheduler
 
 
+MAX_RETRIES = 5
+
 celery_app = Celery("docproc", broker=settings.redis_url, backend=settings.redis_url)
 celery_app.conf.task_acks_late = True
 celery_app.conf.worker_prefetch_multiplier = 1
 
 
-async def _ensure_tables():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+@worker_process_init.connect
+def _init_worker_process(**kwargs):
+    # One runtime (loop, runner, clients, configs) per prefork child.
+    init_runtime(after_fork=True)
+
+
+@worker_process_shutdown.connect
+def _shutdown_worker_process(**kwargs):
+    runtime = get_runtime()
+    runtime.run(runtime.flush_audit())
 
 
 @celery_app.on_after_configure.connect
 def _setup_periodic_tasks(sender, **kwargs):
     # Optional: run SLA evaluation every minute (works when running celery beat).
     maybe_start_sla_scheduler(sender)
+    sender.add_periodic_task(60.0, release_expired_review_claims.s())
 
 
 @celery_app.task(
+    bind=True,
     name="src.worker.process_document",
     autoretry_for=(Exception,),
     retry_backoff=True,
     retry_jitter=True,
-    retry_kwargs={"max_retries": 5},
+    retry_kwargs={"max_retries": MAX_RETRIES},
 )
 def process_document(
-    job_id: str, document_id: str, content_type: str, file_b64: str
+    self,
+    job_id: str,
+    document_id: str,
+    content_type: str,
+    blob_key: str,
+    bypass_cache: bool = False,
 ) -> dict:
-    return asyncio.run(_process_async(job_id, document_id, content_type, file_b64))
+    runtime = get_runtime()
+    try:
+        return runtime.run(
+            _process_async(
+                job_id, document_id, content_type, blob_key, bypass_cache,
+                final_attempt=self.request.retries >= MAX_RETRIES,
+            )
+        )
+    finally:
+        # The loop only runs during tasks, so check the sink's thresholds here; anything
+        # still buffered rides along with the next task or the shutdown flush.
+        runtime.run(runtime.flush_audit(force=False))
 
 
 async def _process_async(
-    job_id: str, document_id: str, content_type: str, file_b64: str
+    job_id: str,
+    document_id: str,
+    content_type: str,
+    blob_key: str,
+    bypass_cache: bool = False,
+    final_attempt: bool = True,
 ) -> dict:
-    await _ensure_tables()
-    file_bytes = base64.b64decode(file_b64)
+    runtime = get_runtime()
+    await runtime.ensure_ready()
 
     async with SessionLocal() as session:
-        docs = DocumentRepo(session)
-        jobs = JobRepo(session)
-        audit = AuditRepo(session)
-        review = ReviewQueueRepo(session)
-
-        await jobs.mark_started(job_id)
-        await docs.set_status(document_id, "processing")
-        await audit.append(
-            document_id,
-            "system",
-            "processing_started",
-            {"content_type": content_type},
-            job_id=job_id,
-        )
-        await session.commit()
+        repos = _repos(session, runtime.audit_sink)
+        await _mark_processing(repos, job_id, document_id, content_type)
 
         try:
-            doc = await docs.get(document_id)
-            locked = (doc.locked_fields if doc else {}) or {}
-
-            ctx = WorkflowContext(
-                job_id=job_id,
-                document_id=document_id,
-                content_type=content_type,
-                file_bytes=file_bytes,
-                locked_fields=locked,
+            ctx = await _load_context(
+                repos, runtime, job_id, document_id, content_type, blob_key, bypass_cache
             )
 
-            runner = WorkflowRunner()
-
             with DOC_PROCESS_LATENCY.time():
-                await runner.run(
-                    ctx,
-                    injected_cfg={
-                        "session": session,
-                        "docs": docs,
-                        "jobs": jobs,
-                        "audit": audit,
-                        "review": review,
-                    },
+                await runtime.runner.run(
+                    ctx, injected_cfg={**runtime.services(), **repos}
                 )
 
-            status = "review_pending" if ctx.needs_review else "completed"
-            await jobs.mark_completed(job_id, status)
-            DOCS_PROCESSED.labels(status=status).inc()
-
-            await session.commit()
-
-            job = await jobs.get(job_id)
-            return {
-                "job_id": job_id,
-                "document_id": document_id,
-                "status": status,
-                "review_item_id": job.review_item_id if job else None,
-                "outputs": job.outputs if job else {},
-            }
+            result = await _complete(repos, ctx)
 
         except Exception as e:
-            ERRORS.inc()
-            await jobs.set_status(job_id, "failed", error=type(e).__name__)
-            await docs.set_status(document_id, "failed")
-            await audit.append(
-                document_id,
+            await _fail(repos, job_id, document_id, e, final=final_attempt)
+            raise
+
+    await runtime.runner.discard_checkpoints(job_id)
+    return result
+
+
+def _repos(session, audit_sink=None) -> dict:
+    return {
+        "session": session,
+        "docs": DocumentRepo(session),
+        "jobs": JobRepo(session),
+        "audit": BufferedAuditRepo(session, audit_sink) if audit_sink else AuditRepo(session),
+        "review": ReviewQueueRepo(session),
+    }
+
+
+async def _mark_processing(
+    repos: dict, job_id: str, document_id: str, content_type: str
+) -> None:
+    await repos["jobs"].mark_started(job_id)
+    await repos["docs"].set_status(document_id, "processing")
+    await repos["audit"].append(
+        document_id,
+        "system",
+        "processing_started",
+        {"content_type": content_type},
+        job_id=job_id,
+    )
+    await repos["session"].commit()
+    await job_events.publish(job_id, document_id, "processing")
+
+
+async def _load_context(
+    repos: dict,
+    runtime,
+    job_id: str,
+    document_id: str,
+    content_type: str,
+    blob_key: str,
+    bypass_cache: bool = False,
+) -> WorkflowContext:
+    doc = await repos["docs"].get(document_id)
+    locked = (doc.locked_fields if doc else {}) or {}
+    content_hash = doc.content_hash if doc else None
+
+    return WorkflowContext(
+        job_id=job_id,
+        document_id=document_id,
+        content_type=content_type,
+        # Read from the blob store on first use by a step
+        file_loader=lambda: runtime.blob_store.read(blob_key),
+        content_hash=content_hash if content_hash != "pending" else None,
+        bypass_cache=bypass_cache,
+        locked_fields=locked,
+    )
+
+
+async def _complete(repos: dict, ctx: WorkflowContext) -> dict:
+    # persist already wrote the final job row; nothing left to UPDATE.
+    status = "review_pending" if ctx.needs_review else "completed"
+    DOCS_PROCESSED.labels(status=status).inc()
+
+    await repos["session"].commit()
+    await job_events.publish(ctx.job_id, ctx.document_id, status, review_item_id=ctx.review_item_id)
+
+    return {
+        "job_id": ctx.job_id,
+        "document_id": ctx.document_id,
+        "status": status,
+        "cache_hit": ctx.cache_hit,
+        "review_item_id": ctx.review_item_id,
+        "outputs": ctx.outputs,
+    }
+
+
+async def _fail(repos: dict, job_id: str, document_id: str, e: Exception, final: bool = True) -> None:
+    # Only the last attempt is "failed"; before that the task will be retried, and
+    # status watchers (SSE, pollers) must not treat the job as finished.
+    status = "failed" if final else "retrying"
+    ERRORS.inc()
+    await repos["jobs"].set_status(job_id, status, error=type(e).__name__)
+    await repos["docs"].set_status(document_id, status)
+    await repos["audit"].append(
+        document_id,
+        "system",
+        "processing_failed",
+        {"error": type(e).__name__, "final": final},
+        job_id=job_id,
+    )
+    await repos["session"].commit()
+    await job_events.publish(job_id, document_id, status, error=type(e).__name__)
+
+
+@celery_app.task(name="src.worker.release_expired_review_claims")
+def release_expired_review_claims() -> int:
+    return get_runtime().run(_release_expired_claims())
+
+
+async def _release_expired_claims() -> int:
+    async with SessionLocal() as session:
+        released = await ReviewQueueRepo(session).release_expired(settings.review_claim_lease_seconds)
+        await AuditRepo(session).append_many(
+            audit_event(
+                r.document_id,
                 "system",
-                "processing_failed",
-                {"error": type(e).__name__},
-                job_id=job_id,
+                "review_claim_expired",
+                {"review_item_id": r.id, "assigned_to": r.assigned_to},
+                job_id=r.job_id,
             )
-            await session.commit()
-            raise
+            for r in released
+        )
+        await session.commit()
+    return len(released)
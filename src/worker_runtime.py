@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, TypeVar
+
+from .db.base import Base
+from .db.engine import engine
+from .services.audit_sink import build_audit_sink
+from .services.blob_store import build_blob_store
+from .services.checkpoint_store import build_checkpoint_store
+from .services.llm.openai_extractor import AsyncOpenAIStructuredExtractor
+from .services.ocr.textract_extractor import TextractTextExtractor
+from .services.result_cache import build_result_cache
+from .services.validation import InvoiceValidator
+from .workflow.runner import WorkflowRunner
+
+T = TypeVar("T")
+
+
+class WorkerRuntime:
+    """
+    Per-process worker state, built once and reused by every task:
+    one event loop, one WorkflowRunner (parsed workflow + limiters),
+    pooled SDK clients and parsed configs.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop | None = None):
+        self.loop = loop or asyncio.new_event_loop()
+        self.result_cache = build_result_cache()
+        self.checkpoints = build_checkpoint_store()
+        self.blob_store = build_blob_store()
+        self.audit_sink = build_audit_sink()
+        self.runner = WorkflowRunner(
+            result_cache=self.result_cache, checkpoints=self.checkpoints
+        )
+
+        # Shared clients; steps pick these up from their cfg.
+        self.ocr_extractor = TextractTextExtractor()
+        self.llm_extractor = AsyncOpenAIStructuredExtractor()
+        self.validator = InvoiceValidator()
+
+        self._tables_ready = False
+
+    def services(self) -> dict[str, Any]:
+        return {
+            "ocr_extractor": self.ocr_extractor,
+            "llm_extractor": self.llm_extractor,
+            "validator": self.validator,
+        }
+
+    def run(self, coro: Awaitable[T]) -> T:
+        return self.loop.run_until_complete(coro)
+
+    async def ensure_ready(self) -> None:
+        """Create tables and replay audit events spooled by dead workers, once per process."""
+        if self._tables_ready:
+            return
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        if self.audit_sink is not None:
+            await self.audit_sink.recover()
+        self._tables_ready = True
+
+    async def flush_audit(self, force: bool = True) -> None:
+        if self.audit_sink is None:
+            return
+        if force:
+            await self.audit_sink.flush()
+        else:
+            await self.audit_sink.flush_if_due()
+
+
+_runtime: WorkerRuntime | None = None
+
+
+def init_runtime(
+    after_fork: bool = False, loop: asyncio.AbstractEventLoop | None = None
+) -> WorkerRuntime:
+    global _runtime
+    if after_fork:
+        # Pooled DB connections inherited from the parent can't be shared with it.
+        engine.sync_engine.dispose(close=False)
+    _runtime = WorkerRuntime(loop=loop)
+    return _runtime
+
+
+def get_runtime() -> WorkerRuntime:
+    # Lazily created for pools that don't fire worker_process_init (e.g. --pool=solo).
+    return _runtime or init_runtime()
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Mapping
+
+from ..observability.metrics import ADAPTIVE_CONCURRENCY_IN_FLIGHT, ADAPTIVE_CONCURRENCY_LIMIT
+
+OVERLOAD_STATUS = (429, 503)
+OVERLOAD_CODES = (
+    "ThrottlingException",
+    "ProvisionedThroughputExceededException",
+    "LimitExceededException",
+    "ServiceUnavailable",
+)
+OVERLOAD_NAMES = ("RateLimit", "Throttl", "Timeout", "Connection")
+
+
+def is_overload_error(exc: BaseException) -> bool:
+    """Upstream is shedding load or unreachable (HTTP 429/503, AWS throttling, timeouts), not a bad document."""
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    if status in OVERLOAD_STATUS:
+        return True
+    response = getattr(exc, "response", None)
+    if isinstance(response, dict) and response.get("Error", {}).get("Code") in OVERLOAD_CODES:
+        return True
+    return any(s in type(exc).__name__ for s in OVERLOAD_NAMES)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD in-flight limit for one step, per process. Each completed call is a sample:
+    - overload error, or latency above `latency_tolerance` x baseline: limit *= backoff
+      (at most once per round trip, so one slow burst doesn't collapse it);
+    - otherwise, while the limit is actually in use: limit += 1/limit (~ +1 per window).
+    The baseline follows the fastest recent latencies and drifts up slowly, so a
+    permanently slower upstream becomes the new normal.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        latency_tolerance: float = 2.0,
+        backoff: float = 0.75,
+    ):
+        self.name = name
+        self.min_limit = int(min_limit)
+        self.max_limit = int(max_limit)
+        self.limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self.latency_tolerance = float(latency_tolerance)
+        self.backoff = float(backoff)
+        self.in_flight = 0
+        self.baseline: float | None = None
+        self._last_decrease = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+        ADAPTIVE_CONCURRENCY_LIMIT.labels(step=name).set(self.limit)
+
+    @classmethod
+    def from_cfg(cls, name: str, cfg: Mapping[str, Any]) -> "AdaptiveConcurrencyLimiter":
+        return cls(
+            name,
+            initial=int(cfg.get("initial", 8)),
+            min_limit=int(cfg.get("min", 1)),
+            max_limit=int(cfg.get("max", 64)),
+            latency_tolerance=float(cfg.get("latency_tolerance", 2.0)),
+            backoff=float(cfg.get("backoff", 0.75)),
+        )
+
+    @contextlib.asynccontextmanager
+    async def slot(self, before: Callable[[], Awaitable[Any]] | None = None) -> AsyncIterator[None]:
+        """`before` runs once the slot is held but outside the latency sample (e.g. a rate-limit wait)."""
+        await self._acquire()
+        try:
+            if before is not None:
+                await before()
+        except BaseException:
+            self._release(None, overloaded=False)
+            raise
+        start = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            self._release(time.monotonic() - start, overloaded=is_overload_error(e))
+            raise
+        except BaseException:
+            # Cancelled: free the slot without a sample.
+            self._release(None, overloaded=False)
+            raise
+        else:
+            self._release(time.monotonic() - start, overloaded=False)
+
+    async def _acquire(self) -> None:
+        if not self._waiters and self.in_flight < int(self.limit):
+            self._set_in_flight(self.in_flight + 1)
+            return
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self._release(None, overloaded=False)  # slot was handed over already
+            else:
+                with contextlib.suppress(ValueError):
+                    self._waiters.remove(fut)
+            raise
+
+    def _release(self, latency: float | None, overloaded: bool) -> None:
+        busy = self.in_flight >= self.limit / 2
+        self._set_in_flight(self.in_flight - 1)
+        if latency is not None:
+            self._update(latency, overloaded, busy)
+        while self._waiters and self.in_flight < int(self.limit):
+            fut = self._waiters.popleft()
+            if not fut.done():
+                self._set_in_flight(self.in_flight + 1)
+                fut.set_result(None)
+
+    def _update(self, latency: float, overloaded: bool, busy: bool) -> None:
+        if self.baseline is None:
+            self.baseline = latency
+        congested = overloaded or latency > self.latency_tolerance * self.baseline
+
+        now = time.monotonic()
+        if congested:
+            if now - self._last_decrease >= latency:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._last_decrease = now
+        elif busy:
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+
+        alpha = 0.5 if latency < self.baseline else 0.02
+        self.baseline += alpha * (latency - self.baseline)
+        ADAPTIVE_CONCURRENCY_LIMIT.labels(step=self.name).set(self.limit)
+
+    def _set_in_flight(self, n: int) -> None:
+        self.in_flight = n
+        ADAPTIVE_CONCURRENCY_IN_FLIGHT.labels(step=self.name).set(n)
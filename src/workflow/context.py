@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import copy
 from dataclasses import dataclass, field
-from typing import Any, Dict, Optional
+from typing import Any, Awaitable, Callable, Dict, Optional
 
 
 @dataclass
@@ -10,10 +11,19 @@ class WorkflowContext:
     job_id: str
     document_id: str
     content_type: str
-    file_bytes: bytes
+    file_bytes: Optional[bytes] = None
+    # Lazily fetches the upload (e.g. from the blob store) on first read_file()
+    file_loader: Optional[Callable[[], Awaitable[bytes]]] = None
+
+    # sha256 of file_bytes; keys the content-addressed result cache
+    content_hash: Optional[str] = None
+    bypass_cache: bool = False
 
     # Produced state
     text: Optional[str] = None
+    llm_result: Dict[str, Any] = field(
+        default_factory=dict
+    )  # Raw extractor output, before locked fields are overlaid
     fields: Dict[str, Any] = field(default_factory=dict)
     field_confidence: Dict[str, float] = field(
         default_factory=dict
@@ -22,8 +32,66 @@ class WorkflowContext:
     outputs: Dict[str, Any] = field(default_factory=dict)
     needs_review: bool = False
 
+    # Steps satisfied before/without running (e.g. restored from the result cache)
+    completed_steps: set[str] = field(default_factory=set)
+    cache_hit: bool = False
+    # Set on the forked context of a hedged attempt, which must not share the slow request
+    is_hedge: bool = False
+
     # Persisted state
     locked_fields: Dict[str, Any] = field(default_factory=dict)
 
     # Final extraction payload (written to DB and to disk)
     extraction_payload: Dict[str, Any] = field(default_factory=dict)
+    # Set by review_gate when the document was queued for review
+    review_item_id: Optional[str] = None
+
+    # Produced state captured by step checkpoints
+    SNAPSHOT_FIELDS = (
+        "text",
+        "llm_result",
+        "fields",
+        "field_confidence",
+        "validation_errors",
+        "outputs",
+        "needs_review",
+        "cache_hit",
+        "extraction_payload",
+    )
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.SNAPSHOT_FIELDS}
+
+    def restore(self, snapshot: Dict[str, Any]) -> None:
+        for name in self.SNAPSHOT_FIELDS:
+            if name in snapshot:
+                setattr(self, name, snapshot[name])
+
+    def fork(self) -> "WorkflowContext":
+        """Independent copy of the produced state (inputs shared), e.g. for a hedged attempt."""
+        clone = copy.copy(self)
+        clone.restore(copy.deepcopy(self.snapshot()))
+        clone.completed_steps = set(self.completed_steps)
+        return clone
+
+    async def read_file(self) -> bytes:
+        if self.file_bytes is None:
+            self.file_bytes = await self.file_loader() if self.file_loader else b""
+        return self.file_bytes
+
+    def apply_llm_result(self, result: Dict[str, Any]) -> None:
+        if isinstance(result, dict) and "fields" in result:
+            extracted_fields = result["fields"]
+            confidence = dict(result.get("confidence", {}))
+        else:
+            extracted_fields = result
+            confidence = {}
+
+        self.llm_result = {"fields": extracted_fields, "confidence": dict(confidence)}
+
+        locked = self.locked_fields or {}
+        self.fields = {**extracted_fields, **locked}
+        self.field_confidence = confidence
+
+        for field_name in locked:
+            self.field_confidence[field_name] = 0.99
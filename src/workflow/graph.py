@@ -43,24 +43,43 @@ class WorkflowGraph:
         for n in self.steps:
             dfs(n)
 
+    def ancestors(self, name: str) -> Set[str]:
+        out: Set[str] = set()
+        stack = list(self.steps[name].depends_on)
+        while stack:
+            n = stack.pop()
+            if n not in out:
+                out.add(n)
+                stack.extend(self.steps[n].depends_on)
+        return out
+
+    def dependents(self) -> Dict[str, List[str]]:
+        out: Dict[str, List[str]] = {n: [] for n in self.steps}
+        for name, spec in self.steps.items():
+            for dep in dict.fromkeys(spec.depends_on):
+                out[dep].append(name)
+        return out
+
     def topological_layers(self) -> List[List[str]]:
-        # Kahn's algorithm but grouped into layers for parallel execution
-        remaining_deps = {n: set(s.depends_on) for n, s in self.steps.items()}
-        ready = sorted([n for n, deps in remaining_deps.items() if not deps])
+        # Kahn's algorithm grouped into layers, O(V + E)
+        children = self.dependents()
+        indegree = {n: len(set(s.depends_on)) for n, s in self.steps.items()}
+        ready = sorted(n for n, d in indegree.items() if d == 0)
         layers: List[List[str]] = []
 
         while ready:
-            layer = ready
-            layers.append(layer)
-            ready = []
-            for n in layer:
-                for m, deps in remaining_deps.items():
-                    deps.discard(n)
-            for n, deps in remaining_deps.items():
-                if n not in sum(layers, []) and not deps:
-                    ready.append(n)
-            ready = sorted(list(set(ready)))
+            layers.append(ready)
+            nxt = []
+            for n in ready:
+                for m in children[n]:
+                    indegree[m] -= 1
+                    if indegree[m] == 0:
+                        nxt.append(m)
+            ready = sorted(nxt)
 
         if sum(len(x) for x in layers) != len(self.steps):
             raise ValueError("cycle_or_missing_nodes")
         return layers
+
+    def topological_order(self) -> List[str]:
+        return [n for layer in self.topological_layers() for n in layer]
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import asyncio
+import copy
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Mapping, Optional
+
+from .context import WorkflowContext
+from ..observability.metrics import WORKFLOW_HEDGES
+
+
+def _has_content(value: Any) -> bool:
+    if isinstance(value, dict):
+        return any(_has_content(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_has_content(v) for v in value)
+    return bool(value)
+
+
+def _produced_output(before: dict, after: dict) -> bool:
+    """Whether an attempt wrote anything non-empty (all-null fields, zero confidences and "" don't count)."""
+    return any(after[k] != before.get(k) and _has_content(after[k]) for k in after)
+
+
+class Hedger:
+    """
+    Hedged step attempts. When an attempt runs longer than the `percentile` of the
+    step's recent latencies, a second attempt starts on a forked context. A hedge
+    that finishes with output wins and the primary is cancelled; a hedge that fails
+    or produces nothing (e.g. an empty extraction) loses and the primary carries on.
+
+    Hedges are paid for from a budget: each attempt earns `max_extra_ratio` credits
+    (capped at `max_credits`) and a hedge costs one, so hedges stay under that share
+    of calls even when the upstream is slow across the board.
+    """
+
+    def __init__(
+        self,
+        step: str,
+        percentile: float = 0.95,
+        max_extra_ratio: float = 0.05,
+        min_samples: int = 20,
+        window: int = 200,
+        max_credits: float = 10.0,
+    ):
+        self.step = step
+        self.percentile = float(percentile)
+        self.max_extra_ratio = float(max_extra_ratio)
+        self.min_samples = int(min_samples)
+        self.max_credits = float(max_credits)
+        self.latencies: Deque[float] = deque(maxlen=int(window))
+        self.credits = 0.0
+
+    @classmethod
+    def from_cfg(cls, step: str, cfg: Mapping[str, Any]) -> "Hedger":
+        return cls(
+            step,
+            percentile=float(cfg.get("percentile", 0.95)),
+            max_extra_ratio=float(cfg.get("max_extra_ratio", 0.05)),
+            min_samples=int(cfg.get("min_samples", 20)),
+            window=int(cfg.get("window", 200)),
+        )
+
+    def threshold(self) -> Optional[float]:
+        if len(self.latencies) < self.min_samples:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(self.percentile * len(ordered)))]
+
+    async def run(
+        self,
+        ctx: WorkflowContext,
+        attempt: Callable[[WorkflowContext], Awaitable[None]],
+        hedge_attempt: Callable[[WorkflowContext], Awaitable[None]] | None = None,
+    ) -> None:
+        """`hedge_attempt` runs the hedge, e.g. `attempt` wrapped in its own concurrency slot."""
+        self.credits = min(self.max_credits, self.credits + self.max_extra_ratio)
+        threshold = self.threshold()
+        start = time.monotonic()
+        primary = asyncio.ensure_future(attempt(ctx))
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=threshold)
+            if primary in done or self.credits < 1.0:
+                if primary not in done:
+                    WORKFLOW_HEDGES.labels(step=self.step, result="over_budget").inc()
+                await primary
+                return
+
+            self.credits -= 1.0
+            WORKFLOW_HEDGES.labels(step=self.step, result="launched").inc()
+            await self._race(ctx, primary, hedge_attempt or attempt)
+        finally:
+            self.latencies.append(time.monotonic() - start)
+            if not primary.done():
+                primary.cancel()
+                await asyncio.gather(primary, return_exceptions=True)
+
+    async def _race(self, ctx, primary: asyncio.Future, attempt) -> None:
+        # The primary keeps running on ctx; the hedge gets its own copy.
+        hedge_ctx = ctx.fork()
+        hedge_ctx.is_hedge = True
+        before = copy.deepcopy(hedge_ctx.snapshot())
+        hedge = asyncio.ensure_future(attempt(hedge_ctx))
+        pending = {primary, hedge}
+        error: BaseException | None = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                        continue
+                    if task is hedge:
+                        if not _produced_output(before, hedge_ctx.snapshot()):
+                            WORKFLOW_HEDGES.labels(step=self.step, result="empty").inc()
+                            continue
+                        primary.cancel()
+                        await asyncio.gather(primary, return_exceptions=True)
+                        ctx.restore(hedge_ctx.snapshot())
+                        WORKFLOW_HEDGES.labels(step=self.step, result="won").inc()
+                    return
+            raise error
+        finally:
+            if not hedge.done():
+                hedge.cancel()
+                await asyncio.gather(hedge, return_exceptions=True)
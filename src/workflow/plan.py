@@ -0,0 +1,216 @@
+"""
+Compiled workflow plans.
+
+configs/workflow.yaml is parsed, validated and resolved once into a WorkflowPlan
+(step functions, frozen step config, dependency counts, limiters, retry policy).
+PlanLoader caches the plan per file and recompiles it when the file changes, so
+workers pick up workflow edits without a restart.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Tuple
+
+import yaml
+
+from .adaptive import AdaptiveConcurrencyLimiter
+from .graph import StepSpec, WorkflowGraph
+from .hedging import Hedger
+from .rate_limit import RateLimiter, build_rate_limiter
+from .steps.registry import StepFn, get as get_step
+
+logger = logging.getLogger("docproc")
+
+RELOAD_CHECK_SECONDS = 1.0
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    attempts: int
+    base_delay: float = 0.5
+    max_delay: float = 6.0
+
+    def delay(self, attempt: int) -> float:
+        return min(self.max_delay, self.base_delay * (2 ** attempt))
+
+
+@dataclass(frozen=True)
+class CompiledStep:
+    name: str
+    spec: StepSpec
+    fn: StepFn
+    config: Mapping[str, Any]  # read-only view of the step's yaml block
+    dependents: Tuple[str, ...]
+    retry: RetryPolicy
+    limiter: RateLimiter | None
+    rate_limit_key: str  # template, e.g. "openai:{model}"; defaults to the step name
+    semaphore: asyncio.Semaphore | None
+    adaptive: AdaptiveConcurrencyLimiter | None
+    hedge: Hedger | None
+
+
+@dataclass(frozen=True)
+class WorkflowPlan:
+    graph: WorkflowGraph
+    steps: Mapping[str, CompiledStep]
+    order: Tuple[str, ...]
+    cached_steps: frozenset
+    checkpoint_steps: frozenset
+    source_hash: str
+
+
+def _limiter_key(spec: StepSpec):
+    return (spec.rate_limit_rps, spec.rate_limit_burst)
+
+
+def compile_plan(
+    raw: dict, source_hash: str = "", previous: WorkflowPlan | None = None
+) -> WorkflowPlan:
+    """
+    Build a plan from parsed workflow yaml. Limiters and concurrency semaphores are
+    carried over from `previous` for steps whose limits didn't change, so a reload
+    doesn't reset their state.
+    """
+    steps_cfg = raw["workflow"]["steps"]
+    specs = {
+        name: StepSpec(
+            name=name,
+            kind=s["kind"],
+            depends_on=list(s.get("depends_on", [])),
+            retries=int(s.get("retries", 0)),
+            rate_limit_rps=s.get("rate_limit_rps"),
+            rate_limit_burst=s.get("rate_limit_burst"),
+            max_concurrency=s.get("max_concurrency"),
+        )
+        for name, s in steps_cfg.items()
+    }
+    graph = WorkflowGraph(specs)
+    graph.validate()
+    dependents = graph.dependents()
+    old = previous.steps if previous else {}
+
+    steps: Dict[str, CompiledStep] = {}
+    for name, spec in specs.items():
+        prev = old.get(name)
+
+        limiter = None
+        if spec.rate_limit_rps and spec.rate_limit_burst:
+            if prev and prev.limiter and _limiter_key(prev.spec) == _limiter_key(spec):
+                limiter = prev.limiter
+            else:
+                limiter = build_rate_limiter(spec.rate_limit_rps, spec.rate_limit_burst)
+
+        semaphore = None
+        if spec.max_concurrency:
+            if prev and prev.semaphore and prev.spec.max_concurrency == spec.max_concurrency:
+                semaphore = prev.semaphore
+            else:
+                semaphore = asyncio.Semaphore(int(spec.max_concurrency))
+
+        adaptive = None
+        adaptive_cfg = steps_cfg[name].get("adaptive_concurrency")
+        if adaptive_cfg:
+            if prev and prev.adaptive and prev.config.get("adaptive_concurrency") == adaptive_cfg:
+                adaptive = prev.adaptive
+            else:
+                adaptive = AdaptiveConcurrencyLimiter.from_cfg(name, adaptive_cfg)
+
+        hedge = None
+        hedge_cfg = steps_cfg[name].get("hedge")
+        if hedge_cfg:
+            if prev and prev.hedge and prev.config.get("hedge") == hedge_cfg:
+                hedge = prev.hedge  # keeps its latency window and budget
+            else:
+                hedge = Hedger.from_cfg(name, hedge_cfg)
+
+        steps[name] = CompiledStep(
+            name=name,
+            spec=spec,
+            fn=get_step(spec.kind),
+            config=MappingProxyType(dict(steps_cfg[name])),
+            dependents=tuple(dependents[name]),
+            retry=RetryPolicy(attempts=max(1, spec.retries + 1)),
+            limiter=limiter,
+            rate_limit_key=str(steps_cfg[name].get("rate_limit_key") or name),
+            semaphore=semaphore,
+            adaptive=adaptive,
+            hedge=hedge,
+        )
+
+    cache_cfg = raw["workflow"].get("result_cache") or {}
+    checkpoint_cfg = raw["workflow"].get("checkpoints") or {}
+    return WorkflowPlan(
+        graph=graph,
+        steps=MappingProxyType(steps),
+        order=tuple(graph.topological_order()),
+        cached_steps=frozenset(cache_cfg.get("steps", [])),
+        checkpoint_steps=frozenset(checkpoint_cfg.get("steps", [])),
+        source_hash=source_hash,
+    )
+
+
+class PlanLoader:
+    """
+    Compiled plan for one workflow file. get() stats the file at most every
+    `check_interval` seconds and recompiles only when its content hash changes.
+    A broken edit is logged and the previous plan stays in use.
+    """
+
+    def __init__(self, path: str, check_interval: float = RELOAD_CHECK_SECONDS):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._plan: WorkflowPlan | None = None
+        self._stat_key: tuple | None = None
+        self._next_check = 0.0
+        self.get()  # fail fast on an invalid initial config
+
+    def get(self) -> WorkflowPlan:
+        now = time.monotonic()
+        if self._plan is not None and now < self._next_check:
+            return self._plan
+        with self._lock:
+            self._next_check = now + self.check_interval
+            try:
+                self._refresh()
+            except Exception:
+                if self._plan is None:
+                    raise
+                logger.exception("Workflow reload failed for %s; keeping the current plan", self.path)
+            return self._plan
+
+    def _refresh(self) -> None:
+        st = os.stat(self.path)
+        stat_key = (st.st_mtime_ns, st.st_size)
+        if self._plan is not None and stat_key == self._stat_key:
+            return
+        data = open(self.path, "rb").read()
+        digest = hashlib.sha256(data).hexdigest()
+        self._stat_key = stat_key
+        if self._plan is not None and digest == self._plan.source_hash:
+            return
+        plan = compile_plan(yaml.safe_load(data), source_hash=digest, previous=self._plan)
+        if self._plan is not None:
+            logger.info("Reloaded workflow %s (%s)", self.path, digest[:12])
+        self._plan = plan
+
+
+_loaders: Dict[str, PlanLoader] = {}
+_loaders_lock = threading.Lock()
+
+
+def plan_loader(path: str) -> PlanLoader:
+    """Process-wide loader per workflow file, shared by every runner using it."""
+    key = os.path.abspath(path)
+    with _loaders_lock:
+        loader = _loaders.get(key)
+        if loader is None:
+            loader = _loaders[key] = PlanLoader(path)
+        return loader
@@ -1,25 +1,168 @@
 from __future__ import annotations
 
 import asyncio
+import logging
 import time
+import weakref
+from typing import Dict, Protocol
+
+import redis.asyncio as aioredis
+
+from ..settings import settings
+
+logger = logging.getLogger("docproc")
+
+REDIS_RETRY_SECONDS = 5.0  # how long to stay on the local fallback after a Redis error
 
 
 class AsyncTokenBucket:
+    """
+    Per-process token bucket. take() reserves its tokens up front (the balance may go
+    negative) and sleeps exactly until they are covered, so waiters are served in order
+    without polling. A waiter cancelled before its turn gives its tokens back.
+    """
+
     def __init__(self, rps: float, burst: int):
         self.rps = float(rps)
         self.capacity = int(burst)
         self.tokens = float(burst)
-        self.last = time.time()
+        self.last = time.monotonic()
         self._lock = asyncio.Lock()
 
-    async def take(self, amount: float = 1.0) -> None:
-        while True:
-            async with self._lock:
-                now = time.time()
-                elapsed = now - self.last
-                self.tokens = min(self.capacity, self.tokens + elapsed * self.rps)
-                self.last = now
-                if self.tokens >= amount:
-                    self.tokens -= amount
-                    return
-            await asyncio.sleep(0.05)
+    async def take(self, amount: float = 1.0) -> float:
+        """Returns the seconds spent waiting."""
+        async with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rps)
+            self.last = now
+            self.tokens -= amount
+            wait = -self.tokens / self.rps if self.tokens < 0 else 0.0
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self.tokens += amount
+                raise
+        return wait
+
+
+class RateLimiter(Protocol):
+    async def take(self, key: str, amount: float = 1.0) -> float: ...
+
+
+class LocalRateLimiter:
+    """One AsyncTokenBucket per key, within this process."""
+
+    def __init__(self, rps: float, burst: int):
+        self.rps = float(rps)
+        self.burst = int(burst)
+        self._buckets: Dict[str, AsyncTokenBucket] = {}
+
+    async def take(self, key: str, amount: float = 1.0) -> float:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = AsyncTokenBucket(self.rps, self.burst)
+        return await bucket.take(amount)
+
+
+# Same reservation model as AsyncTokenBucket, on the Redis server clock so every
+# worker process shares one bucket per key. Returns the wait in seconds as a string
+# (Lua numbers would be truncated to integers in the reply).
+TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local amount = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate) - amount
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate) + 1)
+if tokens < 0 then
+  return tostring(-tokens / rate)
+end
+return '0'
+"""
+
+# Gives back the tokens of a take whose caller was cancelled while waiting. A bucket
+# that already expired is left alone (it starts full anyway).
+REFUND_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+  redis.call('HINCRBYFLOAT', KEYS[1], 'tokens', ARGV[1])
+end
+return 0
+"""
+
+
+class RedisRateLimiter:
+    """
+    Fleet-wide token bucket per key (one atomic script call per take). If Redis is
+    unreachable the limiter degrades to a per-process bucket rather than failing steps.
+    """
+
+    def __init__(
+        self,
+        rps: float,
+        burst: int,
+        url: str | None = None,
+        client: aioredis.Redis | None = None,
+        prefix: str = "docproc:ratelimit:",
+    ):
+        self.rps = float(rps)
+        self.burst = int(burst)
+        self.url = url or settings.redis_url
+        self.prefix = prefix
+        self._client = client
+        # redis.asyncio connections belong to the loop that opened them.
+        self._scripts: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, object]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._fallback = LocalRateLimiter(rps, burst)
+        self._retry_at = 0.0
+
+    def _script(self, refund: bool = False):
+        loop = asyncio.get_running_loop()
+        scripts = self._scripts.get(loop)
+        if scripts is None:
+            client = self._client or aioredis.Redis.from_url(
+                self.url, socket_connect_timeout=1, socket_timeout=1
+            )
+            scripts = self._scripts[loop] = (
+                client.register_script(TOKEN_BUCKET_LUA),
+                client.register_script(REFUND_LUA),
+            )
+        return scripts[1] if refund else scripts[0]
+
+    async def _refund(self, key: str, amount: float) -> None:
+        try:
+            await self._script(refund=True)(keys=[self.prefix + key], args=[amount])
+        except Exception as e:
+            logger.warning("Rate limit refund failed for %s: %s", key, e)
+
+    async def take(self, key: str, amount: float = 1.0) -> float:
+        if time.monotonic() < self._retry_at:
+            return await self._fallback.take(key, amount)
+        try:
+            reply = await self._script()(
+                keys=[self.prefix + key], args=[self.rps, self.burst, amount]
+            )
+            wait = float(reply)
+        except Exception as e:
+            logger.warning("Redis rate limiter unavailable (%s); using local bucket", e)
+            self._retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+            return await self._fallback.take(key, amount)
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                await self._refund(key, amount)
+                raise
+        return wait
+
+
+def build_rate_limiter(rps: float, burst: int) -> RateLimiter:
+    if (settings.rate_limit_backend or "local").lower() == "redis":
+        return RedisRateLimiter(rps, burst)
+    return LocalRateLimiter(rps, burst)
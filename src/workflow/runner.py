@@ -1,14 +1,27 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
+import copy
+import logging
 import random
 import time
-import yaml
+from collections import ChainMap
+from typing import Any, Collection, Mapping
 
-from .graph import StepSpec, WorkflowGraph
+from .graph import WorkflowGraph
 from .context import WorkflowContext
-from .rate_limit import AsyncTokenBucket
-from .steps.registry import get as get_step
+from .plan import CompiledStep, WorkflowPlan, plan_loader
+from ..observability.metrics import (
+    RESULT_CACHE_LOOKUPS,
+    STEP_RETRIES,
+    STEP_SECONDS,
+    STEP_WAIT_SECONDS,
+)
+from ..observability.tracing import tracer
+from ..settings import settings
+from ..services.checkpoint_store import CheckpointStore
+from ..services.result_cache import ResultCache, entry_from_context, restore_into_context
 
 # Import steps so they register
 from .steps import ocr as _ocr  # noqa: F401
@@ -20,60 +33,280 @@ from .steps import persist as _persist  # noqa: F401
 from .steps import review_gate as _review  # noqa: F401
 
 
+logger = logging.getLogger("docproc")
+
+_MISSING = object()
+
+
 def _jitter(seconds: float) -> float:
     return seconds * (0.5 + random.random())
 
 
+def _rate_limit_key(step: CompiledStep, injected_cfg: dict) -> str:
+    """
+    Expand the step's rate_limit_key. Available fields: {step}, {kind}, {model} and any
+    string the caller injects (e.g. {tenant}), so buckets can be per model or tenant.
+    """
+    template = step.rate_limit_key
+    if "{" not in template:
+        return template
+    values = {k: v for k, v in injected_cfg.items() if isinstance(v, str)}
+    values.update(step=step.name, kind=step.spec.kind, model=settings.openai_model)
+    try:
+        return template.format(**values)
+    except (KeyError, IndexError, ValueError):
+        logger.warning("Unresolved rate_limit_key %r for step %s", template, step.name)
+        return step.name
+
+
 class WorkflowRunner:
-    def __init__(self, cfg_path: str = "configs/workflow.yaml"):
-        raw = yaml.safe_load(open(cfg_path, "r", encoding="utf-8"))
-        steps_cfg = raw["workflow"]["steps"]
-
-        self.step_cfg = steps_cfg
-        steps = {}
-        for name, s in steps_cfg.items():
-            steps[name] = StepSpec(
-                name=name,
-                kind=s["kind"],
-                depends_on=s.get("depends_on", []),
-                retries=int(s.get("retries", 0)),
-                rate_limit_rps=s.get("rate_limit_rps"),
-                rate_limit_burst=s.get("rate_limit_burst"),
-                max_concurrency=s.get("max_concurrency"),
+    def __init__(
+        self,
+        cfg_path: str = "configs/workflow.yaml",
+        result_cache: ResultCache | None = None,
+        checkpoints: CheckpointStore | None = None,
+    ):
+        # Compiled once per config file and shared across runners; reloaded when the yaml changes.
+        self.plans = plan_loader(cfg_path)
+        self.result_cache = result_cache
+        self.checkpoints = checkpoints
+
+    @property
+    def plan(self) -> WorkflowPlan:
+        return self.plans.get()
+
+    @property
+    def graph(self) -> WorkflowGraph:
+        return self.plan.graph
+
+    @property
+    def step_cfg(self) -> Mapping[str, Mapping[str, Any]]:
+        return {name: step.config for name, step in self.plan.steps.items()}
+
+    @property
+    def cached_steps(self) -> frozenset:
+        # Steps whose results come from the content-hash cache on a hit
+        return self.plan.cached_steps
+
+    async def run(
+        self,
+        ctx: WorkflowContext,
+        injected_cfg: dict,
+        only: Collection[str] | None = None,
+    ) -> None:
+        """
+        Run the workflow; `only` restricts the run to a subset (e.g. one phase of a backfill).
+        Each step starts as soon as its own dependencies finish. Dependencies that are
+        already completed or outside `only` count as satisfied.
+        """
+        plan = self.plan  # one plan for the whole document, even if the yaml reloads mid-run
+        with tracer.span(
+            "workflow.run", job_id=ctx.job_id, document_id=ctx.document_id, workflow=plan.source_hash[:12]
+        ) as span:
+            await self._run(ctx, injected_cfg, only, plan)
+            span.set(cache_hit=ctx.cache_hit, completed_steps=len(ctx.completed_steps))
+
+    async def _run(
+        self,
+        ctx: WorkflowContext,
+        injected_cfg: dict,
+        only: Collection[str] | None,
+        plan: WorkflowPlan,
+    ) -> None:
+        await self._resume(ctx, plan)
+        # Checkpoints store what changed since this state (cache-restored results included).
+        checkpointed = copy.deepcopy(ctx.snapshot()) if plan.checkpoint_steps else {}
+        await self._restore_cached(ctx, plan)
+        store_pending = self._cache_enabled(ctx, plan) and not ctx.cache_hit
+
+        todo = [
+            n
+            for n in plan.order
+            if n not in ctx.completed_steps and (only is None or n in only)
+        ]
+        waiting_on = {
+            n: len({d for d in plan.steps[n].spec.depends_on if d in todo}) for n in todo
+        }
+        running: dict[asyncio.Task, str] = {}
+
+        def launch(names) -> None:
+            for n in names:
+                running[asyncio.create_task(self._run_step(plan.steps[n], ctx, injected_cfg))] = n
+
+        launch([n for n in todo if waiting_on[n] == 0])
+        try:
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                ready, finished = [], []
+                for task in done:
+                    name = running.pop(task)
+                    task.result()
+                    ctx.completed_steps.add(name)
+                    finished.append(name)
+                    for child in plan.steps[name].dependents:
+                        if child in waiting_on:
+                            waiting_on[child] -= 1
+                            if waiting_on[child] == 0:
+                                ready.append(child)
+
+                if store_pending and plan.cached_steps <= ctx.completed_steps:
+                    store_pending = False
+                    await self._store_cached(ctx)
+                checkpointed = await self._checkpoint(
+                    ctx, plan.checkpoint_steps.intersection(finished), checkpointed
+                )
+                launch(ready)
+        finally:
+            # A failed (or cancelled) run stops the steps still in flight.
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+    async def discard_checkpoints(self, job_id: str) -> None:
+        """Called once the job's results are committed; retries after that start over."""
+        if not self.checkpoints:
+            return
+        try:
+            await self.checkpoints.clear(job_id)
+        except Exception as e:
+            logger.warning("Checkpoint cleanup failed: %s", e)
+
+    async def _resume(self, ctx: WorkflowContext, plan: WorkflowPlan) -> None:
+        # Only a fresh context (a retried task) resumes; a context with progress is newer.
+        if not self.checkpoints or not plan.checkpoint_steps or ctx.completed_steps:
+            return
+        try:
+            saved = await self.checkpoints.load(ctx.job_id)
+        except Exception as e:
+            # Checkpoints are an optimisation; a failed load means a full run.
+            logger.warning("Checkpoint load failed: %s", e)
+            return
+        steps = plan.checkpoint_steps.intersection(saved)
+        if not steps:
+            return
+        # Each checkpoint holds only what changed since the previous one; replay them in order.
+        for entry in sorted((saved[s] for s in steps), key=lambda e: e.get("seq", 0)):
+            ctx.restore(entry.get("delta", entry.get("state", {})))  # "state": pre-delta format
+        ctx.completed_steps.update(steps)
+        logger.info("Job %s resumed after %s", ctx.job_id, sorted(steps))
+
+    async def _checkpoint(self, ctx: WorkflowContext, steps: set, previous: dict) -> dict:
+        """Save the fields that changed since `previous`; returns the new baseline."""
+        if not self.checkpoints or not steps:
+            return previous
+        state = ctx.snapshot()
+        delta = {k: v for k, v in state.items() if previous.get(k, _MISSING) != v}
+        try:
+            await self.checkpoints.save(
+                ctx.job_id, steps, {"seq": len(ctx.completed_steps), "delta": delta}
             )
+        except Exception as e:
+            logger.warning("Checkpoint save failed: %s", e)
+            return previous  # the next checkpoint carries these changes too
+        return {**previous, **copy.deepcopy(delta)}
+
+    def _cache_enabled(self, ctx: WorkflowContext, plan: WorkflowPlan) -> bool:
+        return bool(self.result_cache and plan.cached_steps and ctx.content_hash)
+
+    async def _restore_cached(self, ctx: WorkflowContext, plan: WorkflowPlan) -> None:
+        if not self._cache_enabled(ctx, plan) or plan.cached_steps <= ctx.completed_steps:
+            return
+        if ctx.bypass_cache:
+            RESULT_CACHE_LOOKUPS.labels(result="bypass").inc()
+            return
+        try:
+            entry = await self.result_cache.get(ctx.content_hash)
+        except Exception as e:
+            # The cache is an optimisation; never fail a document because of it.
+            logger.warning("Result cache lookup failed: %s", e)
+            RESULT_CACHE_LOOKUPS.labels(result="error").inc()
+            return
+        if entry is None:
+            RESULT_CACHE_LOOKUPS.labels(result="miss").inc()
+            return
 
-        self.graph = WorkflowGraph(steps)
-        self.graph.validate()
+        RESULT_CACHE_LOOKUPS.labels(result="hit").inc()
+        restore_into_context(ctx, entry)
+        ctx.cache_hit = True
+        ctx.completed_steps.update(plan.cached_steps)
 
-        # Rate limiters per step name (simple + explicit)
-        self.limiters: dict[str, AsyncTokenBucket] = {}
-        for name, spec in steps.items():
-            if spec.rate_limit_rps and spec.rate_limit_burst:
-                self.limiters[name] = AsyncTokenBucket(spec.rate_limit_rps, spec.rate_limit_burst)
+    async def _store_cached(self, ctx: WorkflowContext) -> None:
+        entry = entry_from_context(ctx)
+        if entry is None:
+            return
+        try:
+            await self.result_cache.put(ctx.content_hash, entry)
+        except Exception as e:
+            logger.warning("Result cache store failed: %s", e)
 
-    async def run(self, ctx: WorkflowContext, injected_cfg: dict) -> None:
-        layers = self.graph.topological_layers()
+    async def _run_step(self, step: CompiledStep, ctx: WorkflowContext, injected_cfg: dict) -> None:
+        # Injected services/repos shadow the static step config; nothing is copied.
+        cfg = ChainMap(injected_cfg, step.config)
+        retry = step.retry
+        name = step.name
+        waits = {"rate_limit": 0.0, "concurrency": 0.0}
 
-        for layer in layers:
-            await asyncio.gather(*[self._run_step(step_name, ctx, injected_cfg) for step_name in layer])
+        async def attempt(c: WorkflowContext) -> None:
+            await step.fn(c, cfg)
 
-    async def _run_step(self, step_name: str, ctx: WorkflowContext, injected_cfg: dict) -> None:
-        spec = self.graph.steps[step_name]
-        fn = get_step(spec.kind)
-        cfg = dict(self.step_cfg[step_name])
-        cfg.update(injected_cfg)  # inject repos/session
+        async def take_token() -> None:
+            if step.limiter:
+                waited = await step.limiter.take(_rate_limit_key(step, injected_cfg), 1.0)
+                waits["rate_limit"] += waited
+                STEP_WAIT_SECONDS.labels(step=name, limiter="rate_limit").observe(waited)
 
-        limiter = self.limiters.get(step_name)
-        attempts = max(1, spec.retries + 1)
+        @contextlib.asynccontextmanager
+        async def slot():
+            # The rate-limit token is taken once a concurrency slot is held, so it isn't
+            # spent while queueing for one (and the adaptive limiter doesn't time the wait).
+            queued = time.monotonic()
+            token_wait = waits["rate_limit"]
+            async with step.semaphore or contextlib.nullcontext():
+                if step.adaptive:
+                    adaptive = step.adaptive.slot(before=take_token)
+                else:
+                    await take_token()
+                    adaptive = contextlib.nullcontext()
+                async with adaptive:
+                    waited = time.monotonic() - queued - (waits["rate_limit"] - token_wait)
+                    waits["concurrency"] += waited
+                    if step.semaphore or step.adaptive:
+                        STEP_WAIT_SECONDS.labels(step=name, limiter="concurrency").observe(waited)
+                    yield
 
-        for i in range(attempts):
-            if limiter:
-                await limiter.take(1.0)
+        async def hedge_attempt(c: WorkflowContext) -> None:
+            # A hedge is one more upstream call: it needs its own slot and token.
+            async with slot():
+                await attempt(c)
 
+        start = time.monotonic()
+        outcome, retries = "failure", 0
+        with tracer.span(f"step.{name}", step=name, kind=step.spec.kind) as span:
             try:
-                await fn(ctx, cfg)
-                return
-            except Exception:
-                if i == attempts - 1:
-                    raise
-                await asyncio.sleep(_jitter(min(6.0, 0.5 * (2 ** i))))
+                for i in range(retry.attempts):
+                    retries = i
+                    try:
+                        async with slot():
+                            if step.hedge:
+                                await step.hedge.run(ctx, attempt, hedge_attempt=hedge_attempt)
+                            else:
+                                await attempt(ctx)
+                        outcome = "success"
+                        return
+                    except Exception:
+                        if i == retry.attempts - 1:
+                            raise
+                        await asyncio.sleep(_jitter(retry.delay(i)))
+            except asyncio.CancelledError:
+                outcome = "cancelled"
+                raise
+            finally:
+                STEP_SECONDS.labels(step=name, outcome=outcome).observe(time.monotonic() - start)
+                STEP_RETRIES.labels(step=name, outcome=outcome).observe(retries)
+                span.set(
+                    outcome=outcome,
+                    retries=retries,
+                    rate_limit_wait_seconds=round(waits["rate_limit"], 4),
+                    concurrency_wait_seconds=round(waits["concurrency"], 4),
+                )
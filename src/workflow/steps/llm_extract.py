@@ -3,23 +3,18 @@ from __future__ import annotations
 import asyncio
 from .registry import register
 from ..context import WorkflowContext
-from ...services.llm.openai_extractor import OpenAIStructuredExtractor
+from ...services.llm import openai_extractor
+from ...services.llm.prompt import DEFAULT_PROMPT_TOKEN_BUDGET, prepare_prompt_text
 
 
 @register("llm_extract")
 async def run(ctx: WorkflowContext, cfg: dict) -> None:
-    extractor = OpenAIStructuredExtractor()
-    result = await asyncio.to_thread(extractor.extract, ctx.text or "")
-
-    if isinstance(result, dict) and "fields" in result:
-        extracted_fields = result["fields"]
-        ctx.field_confidence = result.get("confidence", {})
+    extractor = cfg.get("llm_extractor") or openai_extractor.OpenAIStructuredExtractor()
+    text = prepare_prompt_text(
+        ctx.text or "", int(cfg.get("prompt_token_budget", DEFAULT_PROMPT_TOKEN_BUDGET))
+    )
+    if hasattr(extractor, "extract_async"):
+        result = await extractor.extract_async(text, coalesce=not ctx.is_hedge)
     else:
-        extracted_fields = result
-        ctx.field_confidence = {}
-
-    locked = ctx.locked_fields or {}
-    ctx.fields = {**extracted_fields, **locked}
-
-    for field_name in locked:
-        ctx.field_confidence[field_name] = 0.99
+        result = await asyncio.to_thread(extractor.extract, text)
+    ctx.apply_llm_result(result)
@@ -21,8 +21,8 @@ async def run(ctx: WorkflowContext, cfg: dict) -> None:
     if not isinstance(items, list) or not items:
         return
 
-    max_c = int(cfg.get("max_concurrency") or 10)
-    sem = asyncio.Semaphore(max_c)
+    # Per-document fan-out; the step's own max_concurrency caps runs across documents.
+    sem = asyncio.Semaphore(int(cfg.get("fanout_concurrency") or 10))
 
     async def worker(it):
         async with sem:
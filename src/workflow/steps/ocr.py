@@ -1,12 +1,14 @@
 from __future__ import annotations
 
-import asyncio
 from .registry import register
 from ..context import WorkflowContext
-from ...services.ocr.textract_extractor import TextractTextExtractor
+from ...services.ocr.textract_extractor import OcrOptions, TextractTextExtractor
 
 
 @register("ocr")
 async def run(ctx: WorkflowContext, cfg: dict) -> None:
-    extractor = TextractTextExtractor()
-    ctx.text = await asyncio.to_thread(extractor.extract_text, ctx.file_bytes, ctx.content_type)
+    extractor = cfg.get("ocr_extractor") or TextractTextExtractor()
+    file_bytes = await ctx.read_file()
+    ctx.text = await extractor.extract_text_async(
+        file_bytes, ctx.content_type, OcrOptions.from_cfg(cfg)
+    )
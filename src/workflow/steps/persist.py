@@ -15,11 +15,11 @@ async def run(ctx: WorkflowContext, cfg: dict) -> None:
 
     status = "review_pending" if ctx.needs_review else "completed"
 
-    await docs.set_extraction(ctx.document_id, ctx.extraction_payload)
-    await docs.set_status(ctx.document_id, status)
-
-    await jobs.set_status(ctx.job_id, status)
-    await jobs.set_outputs(ctx.job_id, ctx.outputs)
+    # One UPDATE per row; the job is final here, the worker only commits
+    await docs.transition(ctx.document_id, status, extraction=ctx.extraction_payload)
+    await jobs.transition(
+        ctx.job_id, status, completed=True, outputs=ctx.outputs, error=None  # clear a retried failure
+    )
 
     await audit.append(
         ctx.document_id,
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from .registry import register
 from ..context import WorkflowContext
-from ...repositories.review_queue import ReviewQueueRepo
+from ...repositories.review_queue import ReviewQueueRepo, urgency_boost_minutes
 from ...repositories.jobs import JobRepo
 from ...repositories.audit import AuditRepo
 
@@ -40,8 +40,11 @@ async def run(ctx: WorkflowContext, cfg: dict) -> None:
         reason=reason,
         extraction_json=ctx.extraction_payload,
         locked_fields=ctx.locked_fields,
+        sla_minutes=int(cfg.get("sla_minutes", 240)),
+        boost_minutes=urgency_boost_minutes(reason, ctx.fields.get("total_amount"), cfg.get("urgency")),
     )
     await jobs.set_review_item(ctx.job_id, item.id)
+    ctx.review_item_id = item.id
     await audit.append(
         ctx.document_id,
         "system",
@@ -8,7 +8,7 @@ from ...services.validation import InvoiceValidator
 
 @register("validate")
 async def run(ctx: WorkflowContext, cfg: dict) -> None:
-    validator = InvoiceValidator()
+    validator = cfg.get("validator") or InvoiceValidator()
     ctx.validation_errors = await asyncio.to_thread(
         validator.validate, ctx.fields, ctx.field_confidence
     )
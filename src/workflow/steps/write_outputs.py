@@ -10,13 +10,13 @@ from ...common.crypto import sha256_bytes
 @register("write_outputs")
 async def run(ctx: WorkflowContext, cfg: dict) -> None:
     writer = FileOutputWriter(root="outputs")
+    # The upload's sha256 is recorded at ingest; only legacy documents need the bytes.
+    file_hash = ctx.content_hash or sha256_bytes(await ctx.read_file())
 
     payload = {
         "schema_version": "1.0.0",
         "document_id": ctx.document_id,
-        "content_hash": sha256_bytes(
-            b"|".join([ctx.document_id.encode("utf-8"), ctx.file_bytes])
-        ),
+        "content_hash": sha256_bytes(f"{ctx.document_id}|{file_hash}".encode("utf-8")),
         "fields": ctx.fields,
         "confidence": ctx.field_confidence,  # Include confidence scores
         "validation_errors": ctx.validation_errors,
@@ -0,0 +1,105 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+import yaml
+
+from src.services.llm.openai_extractor import AsyncOpenAIStructuredExtractor
+from src.workflow import runner as runner_mod
+from src.workflow.adaptive import AdaptiveConcurrencyLimiter, is_overload_error
+from src.workflow.context import WorkflowContext
+from src.workflow.runner import WorkflowRunner
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+@pytest.mark.asyncio
+async def test_limit_grows_under_healthy_load_and_caps_in_flight():
+    limiter = AdaptiveConcurrencyLimiter("t", initial=2, min_limit=1, max_limit=8)
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        async with limiter.slot():
+            peak = max(peak, limiter.in_flight)
+            assert limiter.in_flight <= int(limiter.limit)
+            await asyncio.sleep(0.002)
+
+    await asyncio.gather(*[call() for _ in range(200)])
+    assert limiter.limit > 4
+    assert peak <= 8
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_throttling_shrinks_the_limit():
+    limiter = AdaptiveConcurrencyLimiter("t", initial=10, min_limit=2, max_limit=20, backoff=0.5)
+
+    async with limiter.slot():
+        pass
+    with pytest.raises(RateLimitError):
+        async with limiter.slot():
+            raise RateLimitError()
+
+    assert limiter.limit == 5
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_latency_spike_counts_as_congestion():
+    limiter = AdaptiveConcurrencyLimiter("t", initial=10, latency_tolerance=2.0, backoff=0.5)
+    async with limiter.slot():
+        await asyncio.sleep(0.01)
+    async with limiter.slot():
+        await asyncio.sleep(0.08)
+    assert limiter.limit == 5
+
+
+@pytest.mark.asyncio
+async def test_wait_before_the_call_is_not_a_latency_sample():
+    limiter = AdaptiveConcurrencyLimiter("t", initial=10, latency_tolerance=2.0, backoff=0.5)
+    async with limiter.slot():
+        await asyncio.sleep(0.01)
+    async with limiter.slot(before=lambda: asyncio.sleep(0.08)):  # e.g. a rate-limit wait
+        await asyncio.sleep(0.01)
+    assert limiter.limit == 10
+
+
+def test_overload_classification():
+    assert is_overload_error(RateLimitError())
+    assert is_overload_error(type("ThrottlingException", (Exception,), {})())
+    assert not is_overload_error(ValueError("bad pdf"))
+
+
+@pytest.mark.asyncio
+async def test_throttled_llm_step_backs_off_the_limit(tmp_path, monkeypatch):
+    class _ThrottledCompletions:
+        def __init__(self, failures):
+            self.failures = failures
+
+        async def create(self, **request):
+            if self.failures:
+                self.failures -= 1
+                raise RateLimitError()
+            content = json.dumps({"invoice_number": "INV-1"})
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    path = tmp_path / "workflow.yaml"
+    path.write_text(yaml.safe_dump({"workflow": {"steps": {"llm_extract": {
+        "kind": "llm_extract",
+        "retries": 2,
+        "adaptive_concurrency": {"initial": 16, "min": 1, "backoff": 0.5},
+    }}}}))
+    monkeypatch.setattr(runner_mod, "_jitter", lambda s: 0)
+    runner = WorkflowRunner(cfg_path=str(path))
+    client = SimpleNamespace(chat=SimpleNamespace(completions=_ThrottledCompletions(failures=2)))
+    extractor = AsyncOpenAIStructuredExtractor(client=client)
+
+    ctx = WorkflowContext(job_id="j", document_id="d", content_type="x", text="INVOICE INV-1")
+    await runner.run(ctx, injected_cfg={"llm_extractor": extractor})
+
+    assert ctx.fields["invoice_number"] == "INV-1"  # retried, not sent to review empty
+    assert runner.plan.steps["llm_extract"].adaptive.limit < 16
@@ -0,0 +1,62 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from src.services.llm.openai_extractor import AsyncOpenAIStructuredExtractor
+
+
+class _FakeCompletions:
+    def __init__(self):
+        self.calls = 0
+
+    async def create(self, **request):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        content = json.dumps({"invoice_number": "INV-1", "vendor_name": "ACME", "currency": "USD"})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def _client():
+    return SimpleNamespace(chat=SimpleNamespace(completions=_FakeCompletions()))
+
+
+@pytest.mark.asyncio
+async def test_identical_inflight_prompts_share_one_request():
+    client = _client()
+    extractor = AsyncOpenAIStructuredExtractor(client=client)
+
+    results = await asyncio.gather(*[extractor.extract_async("INVOICE INV-1 ACME") for _ in range(5)])
+    assert client.chat.completions.calls == 1
+    assert all(r["fields"]["invoice_number"] == "INV-1" for r in results)
+
+    # Callers get independent copies.
+    results[0]["fields"]["invoice_number"] = "changed"
+    assert results[1]["fields"]["invoice_number"] == "INV-1"
+
+    # Different text, or the same text once the first request finished, is a new call.
+    await extractor.extract_async("INVOICE INV-1 ACME")
+    await extractor.extract_async("another invoice")
+    assert client.chat.completions.calls == 3
+
+    # A hedge opts out and gets its own request.
+    await asyncio.gather(
+        extractor.extract_async("hedged"), extractor.extract_async("hedged", coalesce=False)
+    )
+    assert client.chat.completions.calls == 5
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_request():
+    client = _client()
+    extractor = AsyncOpenAIStructuredExtractor(client=client)
+
+    first = asyncio.create_task(extractor.extract_async("same"))
+    second = asyncio.create_task(extractor.extract_async("same"))
+    await asyncio.sleep(0.01)
+    first.cancel()
+
+    result = await second
+    assert result["fields"]["vendor_name"] == "ACME"
+    assert client.chat.completions.calls == 1
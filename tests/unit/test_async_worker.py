@@ -0,0 +1,160 @@
+import asyncio
+import base64
+import json
+
+import pytest
+
+from src.async_worker import (
+    CONSUMERS_KEY,
+    MAX_RETRIES,
+    PROCESS_DOCUMENT,
+    AsyncQueueWorker,
+    decode_message,
+    _handlers,
+    encode_retry,
+)
+
+
+def _kombu_message(task: str, args: list, kwargs: dict, retries: int = 0) -> str:
+    body = json.dumps([args, kwargs, {"callbacks": None, "errbacks": None, "chain": None, "chord": None}])
+    return json.dumps(
+        {
+            "body": base64.b64encode(body.encode()).decode(),
+            "content-encoding": "utf-8",
+            "content-type": "application/json",
+            "headers": {"lang": "py", "task": task, "id": "t1", "retries": retries, "eta": None},
+            "properties": {"body_encoding": "base64", "delivery_info": {"exchange": "", "routing_key": "celery"}},
+        }
+    )
+
+
+class _FakeRedis:
+    """Just the list commands the worker uses."""
+
+    def __init__(self):
+        self.lists = {}
+        self.keys = {}
+        self.sets = {}
+
+    async def set(self, key, value, ex=None):
+        self.keys[key] = value
+
+    async def exists(self, key):
+        return int(key in self.keys)
+
+    async def delete(self, key):
+        self.keys.pop(key, None)
+
+    async def sadd(self, key, member):
+        self.sets.setdefault(key, set()).add(member)
+
+    async def srem(self, key, member):
+        self.sets.get(key, set()).discard(member)
+
+    async def smembers(self, key):
+        return set(self.sets.get(key, set()))
+
+    async def lmove(self, src, dst, wherefrom, whereto):
+        return await self.blmove(src, dst, 0, wherefrom, whereto)
+
+    async def blmove(self, src, dst, timeout, wherefrom, whereto):
+        items = self.lists.get(src) or []
+        if not items:
+            await asyncio.sleep(0)
+            return None
+        item = items.pop() if wherefrom == "RIGHT" else items.pop(0)
+        target = self.lists.setdefault(dst, [])
+        target.insert(0, item) if whereto == "LEFT" else target.append(item)
+        return item
+
+    async def lrem(self, key, count, value):
+        self.lists.get(key, []).remove(value)
+
+
+def test_decode_and_retry_roundtrip():
+    raw = _kombu_message("src.worker.process_document", ["j", "d", "application/pdf", "uploads/d"], {"bypass_cache": True})
+    headers, args, kwargs = decode_message(raw)
+    assert headers["task"] == "src.worker.process_document"
+    assert args == ["j", "d", "application/pdf", "uploads/d"]
+    assert kwargs == {"bypass_cache": True}
+
+    headers, args, _ = decode_message(encode_retry(raw, 2))
+    assert headers["retries"] == 2
+    assert args[0] == "j"
+
+
+@pytest.mark.asyncio
+async def test_runs_documents_concurrently_up_to_limit():
+    client = _FakeRedis()
+    client.lists["celery"] = [_kombu_message("test.slow", [i], {}) for i in range(6)]
+    worker = AsyncQueueWorker(client, concurrency=3, consumer_id="t")
+
+    in_flight, peak, done = 0, 0, []
+
+    async def slow(i):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.05)
+        in_flight -= 1
+        done.append(i)
+        if len(done) == 6:
+            worker.stop()
+
+    worker.handlers = {"test.slow": slow}
+    await asyncio.wait_for(worker.run(), timeout=2)
+
+    assert sorted(done) == list(range(6))
+    assert peak == 3
+    assert client.lists[worker.processing] == []
+
+
+@pytest.mark.asyncio
+async def test_process_document_learns_whether_it_is_the_last_attempt():
+    client = _FakeRedis()
+    client.lists["celery"] = [
+        _kombu_message(PROCESS_DOCUMENT, ["j0"], {}, retries=0),
+        _kombu_message(PROCESS_DOCUMENT, ["j5"], {}, retries=MAX_RETRIES),
+    ]
+    worker = AsyncQueueWorker(client, concurrency=1, consumer_id="t")
+    seen = {}
+
+    async def handler(job_id, final_attempt):
+        seen[job_id] = final_attempt
+        if len(seen) == 2:
+            worker.stop()
+
+    worker.handlers = {PROCESS_DOCUMENT: handler}
+    await asyncio.wait_for(worker.run(), timeout=2)
+    assert seen == {"j0": False, "j5": True}
+
+
+@pytest.mark.asyncio
+async def test_recover_takes_only_dead_consumers_lists():
+    client = _FakeRedis()
+    live = AsyncQueueWorker(client, consumer_id="host:1")
+    dead = AsyncQueueWorker(client, consumer_id="host:2")
+    for w in (live, dead):
+        await w._beat()
+        await client.sadd(CONSUMERS_KEY, w.consumer_id)
+    client.lists[live.processing] = ["live-msg"]
+    client.lists[dead.processing] = ["dead-msg"]
+    await client.delete(dead.heartbeat)  # host:2 stopped heartbeating
+
+    newcomer = AsyncQueueWorker(client)
+    assert await newcomer.recover() == 1
+
+    assert client.lists["celery"] == ["dead-msg"]
+    assert client.lists[live.processing] == ["live-msg"]
+    assert client.sets[CONSUMERS_KEY] == {"host:1"}
+
+
+def test_default_consumer_ids_differ_per_worker():
+    client = _FakeRedis()
+    assert AsyncQueueWorker(client).processing != AsyncQueueWorker(client).processing
+
+
+def test_handles_the_periodic_claim_release_task():
+    from src.worker import release_expired_review_claims
+
+    assert release_expired_review_claims.name in _handlers()
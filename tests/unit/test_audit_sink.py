@@ -0,0 +1,130 @@
+import asyncio
+import json
+import os
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.repositories.audit import BufferedAuditRepo
+from src.services.audit_sink import BufferedAuditSink
+
+
+class FakeDB:
+    def __init__(self):
+        self.rows = []
+        self.statements = 0
+        self.down = False
+
+    def session(self):
+        db = self
+
+        class _Session:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            async def execute(self, stmt):
+                if db.down:
+                    raise ConnectionError("db down")
+                db.statements += 1
+                db.rows.extend(stmt.compile(dialect=postgresql.dialect()).params.values())
+
+            async def commit(self):
+                pass
+
+        return _Session()
+
+
+def _sink(tmp_path, db, **kw):
+    return BufferedAuditSink(str(tmp_path), session_factory=db.session, **kw)
+
+
+async def _append(repo, n):
+    for i in range(n):
+        await repo.append("doc-1", "system", f"event_{i}", {"i": i}, job_id="job-1")
+
+
+def _spooled(tmp_path):
+    return [json.loads(l) for p in sorted(tmp_path.glob("audit-*.jsonl")) for l in p.read_text().splitlines()]
+
+
+@pytest.mark.asyncio
+async def test_events_reach_the_sink_only_on_commit(tmp_path):
+    db = FakeDB()
+    sink = _sink(tmp_path, db, flush_seconds=60)
+    session = AsyncSession()
+
+    repo = BufferedAuditRepo(session, sink)
+    session.sync_session.begin()
+    await _append(repo, 2)
+    await session.rollback()
+    await _append(repo, 3)
+    await session.commit()
+
+    assert [e["action"] for e in _spooled(tmp_path)] == ["event_0", "event_1", "event_2"]
+    assert await sink.flush() == 3
+    assert db.statements == 1  # one multi-row INSERT
+    assert "event_2" in db.rows
+    assert _spooled(tmp_path) == []
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_spool_and_retries(tmp_path):
+    db = FakeDB()
+    sink = _sink(tmp_path, db, flush_seconds=60)
+    db.down = True
+    repo = BufferedAuditRepo(AsyncSession(), sink)
+    await _append(repo, 2)
+    repo._on_commit(None)
+
+    assert await sink.flush() == 0
+    assert len(_spooled(tmp_path)) == 2
+
+    db.down = False
+    assert await sink.flush() == 2
+    assert _spooled(tmp_path) == []
+
+
+@pytest.mark.asyncio
+async def test_recover_replays_orphaned_segments_but_not_live_ones(tmp_path):
+    db = FakeDB()
+    live = _sink(tmp_path, db, flush_seconds=60)
+    repo = BufferedAuditRepo(AsyncSession(), live)
+    await _append(repo, 1)
+    repo._on_commit(None)
+
+    orphan = tmp_path / "audit-999999-1.jsonl"
+    orphan.write_text(
+        json.dumps({"document_id": "doc-2", "job_id": None, "at": "2026-01-01T00:00:00+00:00",
+                    "actor": "system", "action": "persisted", "details": {}})
+        + "\n{\"document_id\": \"doc-2\", \"act"  # torn write
+    )
+
+    assert await _sink(tmp_path, db).recover() == 1
+    assert "persisted" in db.rows
+    assert not orphan.exists()
+    assert len(_spooled(tmp_path)) == 1  # still owned by the live sink
+
+
+@pytest.mark.asyncio
+async def test_flush_if_due_waits_for_a_threshold(tmp_path):
+    db = FakeDB()
+    sink = _sink(tmp_path, db, max_events=3, flush_seconds=60)
+    repo = BufferedAuditRepo(AsyncSession(), sink)
+    await _append(repo, 2)
+    repo._on_commit(None)
+
+    assert await sink.flush_if_due() == 0  # carried over to the next task
+    await _append(repo, 1)
+    repo._on_commit(None)
+    await asyncio.sleep(0)  # let the size-triggered flush run
+    assert db.statements == 1 and not sink.due()
+
+    await _append(repo, 1)
+    repo._on_commit(None)
+    assert await sink.flush_if_due() == 0
+    sink._first_at -= 60
+    assert await sink.flush_if_due() == 1
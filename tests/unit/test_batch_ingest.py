@@ -0,0 +1,188 @@
+import contextlib
+import io
+import zipfile
+
+from fastapi.testclient import TestClient
+
+from src.app import app
+from src.routes import v1_process
+from src.services.blob_store import LocalBlobStore
+
+
+class _Session:
+    def __init__(self, log):
+        self.log = log
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    @contextlib.asynccontextmanager
+    async def begin(self):
+        yield
+        self.log.append("commit")
+
+    async def execute(self, stmt, rows=None):
+        self.log.append((stmt.table.name, len(rows)))
+
+
+class _Celery:
+    def __init__(self):
+        self.sent = []
+        self.producers = 0
+
+    @contextlib.contextmanager
+    def producer_or_acquire(self):
+        self.producers += 1
+        yield object()
+
+    def send_task(self, name, args, kwargs, producer):
+        self.sent.append((args, producer))
+
+
+def _zip(**members):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+    return buf.getvalue()
+
+
+def test_batch_expands_zip_and_bulk_inserts(tmp_path, monkeypatch):
+    log, celery = [], _Celery()
+    monkeypatch.setattr(v1_process, "blob_store", LocalBlobStore(str(tmp_path)))
+    monkeypatch.setattr(v1_process, "SessionLocal", lambda: _Session(log))
+    monkeypatch.setattr(v1_process, "celery_client", celery)
+
+    r = TestClient(app).post(
+        "/v1/process/batch",
+        files=[
+            ("files", ("a.pdf", b"%PDF-a", "application/pdf")),
+            ("files", ("export.zip", _zip(**{"b.png": b"png", "c.pdf": b"", "__MACOSX/x": b"x"}), "application/zip")),
+        ],
+    )
+
+    assert r.status_code == 200
+    body = r.json()
+    assert [d["filename"] for d in body["documents"]] == ["a.pdf", "b.png"]
+    assert body["skipped"] == [{"filename": "c.pdf", "reason": "empty"}]
+    assert log == [("documents", 2), ("jobs", 2), ("audit_logs", 2), "commit"]
+    assert celery.producers == 1
+    assert [args[0] for args, _ in celery.sent] == [d["job_id"] for d in body["documents"]]
+    assert celery.sent[1][0][2] == "image/png"
+
+
+def test_batch_rejects_when_nothing_to_process(tmp_path, monkeypatch):
+    monkeypatch.setattr(v1_process, "blob_store", LocalBlobStore(str(tmp_path)))
+    r = TestClient(app).post("/v1/process/batch", files=[("files", ("e.pdf", b"", "application/pdf"))])
+    assert r.status_code == 400
+
+
+def _stored(tmp_path):
+    return [p for p in tmp_path.rglob("*") if p.is_file()]
+
+
+def test_batch_limits_are_enforced_while_expanding(tmp_path, monkeypatch):
+    monkeypatch.setattr(v1_process, "blob_store", LocalBlobStore(str(tmp_path)))
+    settings = v1_process.settings
+    client = TestClient(app)
+
+    def post(**members):
+        return client.post("/v1/process/batch", files=[("files", ("x.zip", _zip(**members), "application/zip"))])
+
+    monkeypatch.setattr(settings, "batch_max_documents", 2)
+    r = post(**{f"{i}.pdf": b"%PDF" for i in range(5)})
+    assert (r.status_code, r.json()["detail"]) == (413, "too_many_documents")
+    assert _stored(tmp_path) == []
+
+    monkeypatch.setattr(settings, "batch_max_documents", 100)
+    monkeypatch.setattr(settings, "batch_max_zip_member_bytes", 1000)
+    r = post(**{"ok.pdf": b"%PDF", "bomb.pdf": b"\0" * 5000})  # compresses to ~30 bytes
+    assert (r.status_code, r.json()["detail"]) == (413, "zip_too_large")
+    assert _stored(tmp_path) == []
+
+    monkeypatch.setattr(settings, "batch_max_zip_total_bytes", 1500)
+    r = post(**{"a.pdf": b"a" * 800, "b.pdf": b"b" * 800})
+    assert (r.status_code, r.json()["detail"]) == (413, "zip_too_large")
+    assert _stored(tmp_path) == []
+
+
+def test_lying_zip_header_is_caught_by_bytes_read(tmp_path, monkeypatch):
+    class _Info:
+        filename = "bomb.pdf"
+        file_size = 10  # claims to be small
+
+        def is_dir(self):
+            return False
+
+    class _Zip:
+        def __init__(self, _f):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def infolist(self):
+            return [_Info()]
+
+        def open(self, info):
+            return io.BytesIO(b"x" * 5000)
+
+    monkeypatch.setattr(v1_process, "blob_store", LocalBlobStore(str(tmp_path)))
+    monkeypatch.setattr(v1_process.zipfile, "ZipFile", _Zip)
+    monkeypatch.setattr(v1_process.settings, "batch_max_zip_member_bytes", 1000)
+    monkeypatch.setattr(v1_process, "CHUNK_SIZE", 256)
+
+    r = TestClient(app).post("/v1/process/batch", files=[("files", ("x.zip", b"PK", "application/zip"))])
+    assert (r.status_code, r.json()["detail"]) == (413, "zip_too_large")
+    assert _stored(tmp_path) == []
+
+
+def test_blobs_are_removed_when_the_insert_fails(tmp_path, monkeypatch):
+    class _FailingSession(_Session):
+        async def execute(self, stmt, rows=None):
+            raise ConnectionError("db down")
+
+    monkeypatch.setattr(v1_process, "blob_store", LocalBlobStore(str(tmp_path)))
+    monkeypatch.setattr(v1_process, "SessionLocal", lambda: _FailingSession([]))
+
+    client = TestClient(app, raise_server_exceptions=False)
+    r = client.post("/v1/process/batch", files=[("files", ("a.pdf", b"%PDF-a", "application/pdf"))])
+    assert r.status_code == 500
+    assert _stored(tmp_path) == []
+
+
+def test_single_upload_blob_is_removed_when_the_insert_fails(tmp_path, monkeypatch):
+    class _FailingDocs:
+        def __init__(self, session):
+            pass
+
+        async def create(self, **kw):
+            raise ConnectionError("db down")
+
+    monkeypatch.setattr(v1_process, "blob_store", LocalBlobStore(str(tmp_path)))
+    monkeypatch.setattr(v1_process, "SessionLocal", lambda: _Session([]))
+    monkeypatch.setattr(v1_process, "DocumentRepo", _FailingDocs)
+
+    client = TestClient(app, raise_server_exceptions=False)
+    r = client.post("/v1/process", files={"file": ("a.pdf", b"%PDF-a", "application/pdf")})
+    assert r.status_code == 500
+    assert _stored(tmp_path) == []
+
+
+def test_batch_accepts_more_parts_than_the_default_form_limit(tmp_path, monkeypatch):
+    log, celery = [], _Celery()
+    monkeypatch.setattr(v1_process, "blob_store", LocalBlobStore(str(tmp_path)))
+    monkeypatch.setattr(v1_process, "SessionLocal", lambda: _Session(log))
+    monkeypatch.setattr(v1_process, "celery_client", celery)
+
+    parts = [("files", (f"{i}.pdf", b"%PDF", "application/pdf")) for i in range(1001)]
+    r = TestClient(app).post("/v1/process/batch", files=parts)
+
+    assert r.status_code == 200
+    assert len(r.json()["documents"]) == 1001
@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.app import app
+from src.common.crypto import sha256_bytes
+from src.routes import v1_documents
+from src.services.blob_store import LocalBlobStore, upload_key
+
+
+async def _chunks(*parts):
+    for p in parts:
+        yield p
+
+
+@pytest.mark.asyncio
+async def test_local_store_streams_and_hashes(tmp_path):
+    store = LocalBlobStore(str(tmp_path))
+    ref = await store.put_stream("uploads/doc1", _chunks(b"%PDF-", b"1.7 body"), "application/pdf")
+
+    assert ref.size == 13
+    assert ref.sha256 == sha256_bytes(b"%PDF-1.7 body")
+    assert await store.read("uploads/doc1") == b"%PDF-1.7 body"
+    assert b"".join([c async for c in store.iter_chunks("uploads/doc1", chunk_size=4)]) == b"%PDF-1.7 body"
+    assert (await store.stat("uploads/doc1")).content_type == "application/pdf"
+
+    await store.delete("uploads/doc1")
+    assert await store.stat("uploads/doc1") is None
+
+    with pytest.raises(ValueError):
+        await store.read("../outside")
+
+
+def test_preview_serves_stored_upload(tmp_path, monkeypatch):
+    store = LocalBlobStore(str(tmp_path))
+    monkeypatch.setattr(v1_documents, "blob_store", store)
+    client = TestClient(app)
+
+    assert client.get("/v1/documents/doc1/preview").status_code == 404
+
+    asyncio.run(store.put_stream(upload_key("doc1"), _chunks(b"png-bytes"), "image/png"))
+    r = client.get("/v1/documents/doc1/preview")
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "image/png"
+    assert r.content == b"png-bytes"
@@ -0,0 +1,107 @@
+import pytest
+import yaml
+
+from src.services.checkpoint_store import InMemoryCheckpointStore
+from src.workflow.context import WorkflowContext
+from src.workflow.runner import WorkflowRunner
+from src.workflow.steps.registry import register
+
+calls = {"ocr": 0, "flaky": 0, "extract": 0, "flaky2": 0}
+
+
+@register("test_ckpt_ocr")
+async def _ocr(ctx, cfg):
+    calls["ocr"] += 1
+    ctx.text = "Invoice INV-1"
+
+
+@register("test_ckpt_flaky")
+async def _flaky(ctx, cfg):
+    calls["flaky"] += 1
+    if calls["flaky"] == 1:
+        raise RuntimeError("db down")
+    ctx.outputs = {"text_len": len(ctx.text)}
+
+
+@register("test_ckpt_extract")
+async def _extract(ctx, cfg):
+    calls["extract"] += 1
+    ctx.fields = {"invoice_number": ctx.text.split()[-1]}
+
+
+@register("test_ckpt_flaky2")
+async def _flaky2(ctx, cfg):
+    calls["flaky2"] += 1
+    if calls["flaky2"] == 1:
+        raise RuntimeError("db down")
+    ctx.outputs = {"fields": dict(ctx.fields), "text_len": len(ctx.text)}
+
+
+def _ctx():
+    return WorkflowContext(job_id="job-1", document_id="d", content_type="application/pdf")
+
+
+@pytest.mark.asyncio
+async def test_retry_resumes_after_last_checkpointed_step(tmp_path):
+    path = tmp_path / "workflow.yaml"
+    path.write_text(
+        yaml.safe_dump(
+            {
+                "workflow": {
+                    "checkpoints": {"steps": ["ocr"]},
+                    "steps": {
+                        "ocr": {"kind": "test_ckpt_ocr", "depends_on": []},
+                        "persist": {"kind": "test_ckpt_flaky", "depends_on": ["ocr"]},
+                    },
+                }
+            }
+        )
+    )
+    store = InMemoryCheckpointStore(ttl_seconds=60)
+    runner = WorkflowRunner(cfg_path=str(path), checkpoints=store)
+
+    with pytest.raises(RuntimeError):
+        await runner.run(_ctx(), injected_cfg={})
+    assert set(await store.load("job-1")) == {"ocr"}
+
+    # The retried task builds a fresh context; OCR is restored, not re-run.
+    ctx = _ctx()
+    await runner.run(ctx, injected_cfg={})
+    assert (calls["ocr"], calls["flaky"]) == (1, 2)
+    assert ctx.outputs == {"text_len": len("Invoice INV-1")}
+
+    await runner.discard_checkpoints("job-1")
+    assert await store.load("job-1") == {}
+
+
+@pytest.mark.asyncio
+async def test_checkpoints_store_deltas_and_resume_merges_them(tmp_path):
+    path = tmp_path / "workflow.yaml"
+    path.write_text(
+        yaml.safe_dump(
+            {
+                "workflow": {
+                    "checkpoints": {"steps": ["ocr", "extract"]},
+                    "steps": {
+                        "ocr": {"kind": "test_ckpt_ocr", "depends_on": []},
+                        "extract": {"kind": "test_ckpt_extract", "depends_on": ["ocr"]},
+                        "persist": {"kind": "test_ckpt_flaky2", "depends_on": ["extract"]},
+                    },
+                }
+            }
+        )
+    )
+    store = InMemoryCheckpointStore(ttl_seconds=60)
+    runner = WorkflowRunner(cfg_path=str(path), checkpoints=store)
+    ctx = WorkflowContext(job_id="job-2", document_id="d", content_type="application/pdf")
+
+    with pytest.raises(RuntimeError):
+        await runner.run(ctx, injected_cfg={})
+    saved = await store.load("job-2")
+    assert saved["ocr"]["delta"] == {"text": "Invoice INV-1"}
+    assert saved["extract"]["delta"] == {"fields": {"invoice_number": "INV-1"}}  # no text again
+
+    ctx = WorkflowContext(job_id="job-2", document_id="d", content_type="application/pdf")
+    await runner.run(ctx, injected_cfg={})
+    assert calls["extract"] == 1
+    assert ctx.outputs == {"fields": {"invoice_number": "INV-1"}, "text_len": len("Invoice INV-1")}
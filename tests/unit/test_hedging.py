@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from src.workflow.context import WorkflowContext
+from src.workflow.hedging import Hedger
+
+
+def _ctx():
+    return WorkflowContext(job_id="j", document_id="d", content_type="application/pdf")
+
+
+def _warm(hedger, seconds=0.01, n=20):
+    hedger.latencies.extend([seconds] * n)
+
+
+@pytest.mark.asyncio
+async def test_slow_attempt_is_hedged_and_the_faster_one_wins():
+    hedger = Hedger("llm_extract", max_extra_ratio=1.0)
+    _warm(hedger)
+    calls, cancelled = [], []
+
+    async def attempt(ctx):
+        n = len(calls)
+        calls.append(n)
+        try:
+            await asyncio.sleep(1.0 if n == 0 else 0.01)  # the first attempt hangs
+        except asyncio.CancelledError:
+            cancelled.append(n)
+            raise
+        ctx.text = f"attempt {n}"
+
+    ctx = _ctx()
+    await asyncio.wait_for(hedger.run(ctx, attempt), timeout=0.5)
+
+    assert ctx.text == "attempt 1"
+    assert cancelled == [0]
+
+
+@pytest.mark.asyncio
+async def test_budget_caps_hedges():
+    hedger = Hedger("ocr", max_extra_ratio=0.0)
+    _warm(hedger)
+    calls = []
+
+    async def attempt(ctx):
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        ctx.text = "done"
+
+    ctx = _ctx()
+    await hedger.run(ctx, attempt)
+    assert ctx.text == "done"
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_no_hedging_until_enough_samples():
+    hedger = Hedger("ocr", max_extra_ratio=1.0, min_samples=5)
+    calls = []
+
+    async def attempt(ctx):
+        calls.append(1)
+        await asyncio.sleep(0.01)
+
+    await hedger.run(_ctx(), attempt)
+    assert hedger.threshold() is None
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_empty_hedge_loses_and_the_primary_carries_on():
+    hedger = Hedger("llm_extract", max_extra_ratio=1.0)
+    _warm(hedger)
+
+    async def attempt(ctx):
+        await asyncio.sleep(0.1)
+        ctx.fields = {"invoice_number": "INV-1"}
+
+    async def throttled_hedge(ctx):
+        # What a swallowed upstream error used to look like: a fast, empty extraction.
+        ctx.fields = {"invoice_number": None}
+        ctx.field_confidence = {"invoice_number": 0.0}
+
+    ctx = _ctx()
+    await hedger.run(ctx, attempt, hedge_attempt=throttled_hedge)
+    assert ctx.fields == {"invoice_number": "INV-1"}
@@ -0,0 +1,114 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.app import app
+from src.db.engine import get_session
+from src.routes import v1_jobs
+from src.services.job_events import JobEventHub
+
+
+class _Row:
+    def __init__(self, **data):
+        self._mapping = data
+        self.__dict__.update(data)
+
+
+def _row(job_id, status, **kw):
+    data = dict(id=job_id, document_id=f"doc-{job_id}", status=status, error=None, outputs={},
+                review_item_id=None, updated_at=datetime(2026, 1, 1, tzinfo=timezone.utc))
+    return _Row(**{**data, **kw})
+
+
+def _client(monkeypatch, rows):
+    calls = []
+
+    async def statuses(self, job_ids, with_extraction=False):
+        calls.append((list(job_ids), with_extraction))
+        return [rows[i] for i in job_ids if i in rows]
+
+    async def _session():
+        yield None
+
+    monkeypatch.setattr(v1_jobs.JobRepo, "statuses", statuses)
+    app.dependency_overrides[get_session] = _session
+    return TestClient(app), calls
+
+
+def test_batch_status_projects_fields_and_honours_etag(monkeypatch):
+    rows = {"a": _row("a", "completed", extraction={"fields": {}}), "b": _row("b", "processing")}
+    client, calls = _client(monkeypatch, rows)
+    try:
+        r = client.get("/v1/jobs", params={"ids": "a,b,zz", "fields": "status"})
+        assert r.status_code == 200
+        assert r.json() == {"jobs": [{"job_id": "a", "status": "completed"}, {"job_id": "b", "status": "processing"}],
+                            "missing": ["zz"]}
+        assert calls == [(["a", "b", "zz"], False)]
+
+        again = client.get("/v1/jobs", params={"ids": "a,b,zz", "fields": "status"},
+                           headers={"If-None-Match": r.headers["etag"]})
+        assert again.status_code == 304
+
+        rows["b"] = _row("b", "failed")
+        assert client.get("/v1/jobs", params={"ids": "a,b,zz", "fields": "status"},
+                          headers={"If-None-Match": r.headers["etag"]}).status_code == 200
+
+        assert client.get("/v1/jobs", params={"ids": "a", "fields": "nope"}).status_code == 400
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_status_stream_sends_snapshot_then_pushed_transitions(monkeypatch):
+    hub = JobEventHub("redis://unused")
+
+    async def listening():
+        hub._ready = asyncio.Event()
+        hub._ready.set()
+
+    async def current(job_ids):
+        return [{"job_id": "a", "status": "completed"}, {"job_id": "b", "status": "processing"}]
+
+    monkeypatch.setattr(hub, "_ensure_listening", listening)
+    monkeypatch.setattr(v1_jobs, "event_hub", hub)
+    monkeypatch.setattr(v1_jobs, "_current", current)
+
+    stream = v1_jobs._status_stream(["a", "b"])
+    first = [await stream.__anext__(), await stream.__anext__()]
+    assert [json.loads(e.split("data: ")[1])["status"] for e in first] == ["completed", "processing"]
+
+    hub._dispatch(json.dumps({"job_id": "b", "status": "processing"}))  # duplicate, skipped
+    hub._dispatch(json.dumps({"job_id": "other", "status": "failed"}))
+    hub._dispatch(json.dumps({"job_id": "b", "status": "review_pending"}))
+    rest = [e async for e in stream]
+
+    assert len(rest) == 2 and '"review_pending"' in rest[0] and rest[1].startswith("event: done")
+    assert hub._watchers == {}
+
+
+@pytest.mark.asyncio
+async def test_status_stream_waits_through_retries_and_skips_unknown_ids(monkeypatch):
+    hub = JobEventHub("redis://unused")
+
+    async def listening():
+        hub._ready = asyncio.Event()
+        hub._ready.set()
+
+    async def current(job_ids):
+        return [{"job_id": "a", "status": "retrying"}]  # "zz" doesn't exist
+
+    monkeypatch.setattr(hub, "_ensure_listening", listening)
+    monkeypatch.setattr(v1_jobs, "event_hub", hub)
+    monkeypatch.setattr(v1_jobs, "_current", current)
+
+    stream = v1_jobs._status_stream(["a", "zz"])
+    assert '"retrying"' in await stream.__anext__()
+
+    hub._dispatch(json.dumps({"job_id": "a", "status": "processing"}))
+    hub._dispatch(json.dumps({"job_id": "a", "status": "failed"}))
+    rest = [e async for e in stream]
+    assert ['"processing"' in rest[0], '"failed"' in rest[1]] == [True, True]
+    assert rest[2].startswith("event: done")
@@ -0,0 +1,62 @@
+import io
+import threading
+import time
+
+import pypdfium2 as pdfium
+import pytest
+
+from src.services.ocr.ocr_utils import split_pdf_pages
+from src.services.ocr.textract_client import TextractDeps
+from src.services.ocr.textract_extractor import OcrOptions, TextractTextExtractor
+
+
+def _pdf(pages: int) -> bytes:
+    # Page i is (100 + i) points wide so the fake can tell pages apart.
+    pdf = pdfium.PdfDocument.new()
+    for i in range(pages):
+        pdf.new_page(100 + i, 200)
+    buf = io.BytesIO()
+    pdf.save(buf)
+    return buf.getvalue()
+
+
+class _FakeTextract:
+    def __init__(self, delay=0.1):
+        self.delay = delay
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def detect_document_text(self, Document):
+        with self._lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(self.delay)
+        with self._lock:  # pdfium isn't thread-safe
+            width = int(pdfium.PdfDocument(Document["Bytes"])[0].get_width())
+            self.in_flight -= 1
+        return {"Blocks": [{"BlockType": "LINE", "Text": f"page {width - 100}"}]}
+
+    def start_document_text_detection(self, **kw):
+        raise AssertionError("async job should not be used")
+
+
+def test_split_keeps_page_order():
+    pages = split_pdf_pages(_pdf(3))
+    widths = [int(pdfium.PdfDocument(p)[0].get_width()) for p in pages]
+    assert widths == [100, 101, 102]
+
+
+@pytest.mark.asyncio
+async def test_pages_ocr_concurrently_and_reassemble_in_order():
+    textract = _FakeTextract(delay=0.1)
+    extractor = TextractTextExtractor(deps=TextractDeps(textract=textract, s3=None, bucket="b"))
+
+    start = time.monotonic()
+    opts = OcrOptions(mode="page_parallel", page_concurrency=3)
+    text = await extractor.extract_text_async(_pdf(6), "application/pdf", opts)
+    elapsed = time.monotonic() - start
+
+    assert text == "\n".join(f"page {i}" for i in range(6))
+    assert textract.peak == 3
+    assert elapsed < 0.5  # two waves of 0.1s, not six
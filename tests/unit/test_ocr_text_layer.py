@@ -0,0 +1,77 @@
+import pytest
+
+from src.services.ocr.text_layer import extract_page_texts, score_page_text
+from src.services.ocr.textract_client import TextractDeps
+from src.services.ocr.textract_extractor import OcrOptions, TextractTextExtractor
+
+INVOICE_PAGE = [
+    "ACME Supplies Ltd  Invoice INV-2024-0042",
+    "Invoice date: 2024-03-01   Due: 2024-03-31",
+    "Widgets x 10 @ 12.50 = 125.00",
+    "Total due: 150.00 USD",
+]
+
+
+def _text_pdf(pages: list[list[str]]) -> bytes:
+    """Minimal born-digital PDF (Helvetica text) with one content stream per page."""
+    objs = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for lines in pages:
+        ops = "".join(f"BT /F1 10 Tf 40 {760 - 14 * i} Td ({line}) Tj ET\n" for i, line in enumerate(lines))
+        objs.append(f"<< /Length {len(ops)} >>\nstream\n{ops}endstream")
+        objs.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {len(objs)} 0 R "
+            "/Resources << /Font << /F1 3 0 R >> >> >>"
+        )
+        kids.append(f"{len(objs)} 0 R")
+    objs[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out, offsets = "%PDF-1.4\n", []
+    for n, body in enumerate(objs, start=1):
+        offsets.append(len(out))
+        out += f"{n} 0 obj\n{body}\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objs) + 1}\n0000000000 65535 f \n" + "".join(f"{o:010d} 00000 n \n" for o in offsets)
+    out += f"trailer\n<< /Size {len(objs) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    return out.encode("latin-1")
+
+
+class _FakeTextract:
+    def __init__(self):
+        self.calls = 0
+
+    def detect_document_text(self, Document):
+        self.calls += 1
+        return {"Blocks": [{"BlockType": "LINE", "Text": "scanned page text"}]}
+
+
+def test_scoring_separates_real_text_from_garbage():
+    assert score_page_text("\n".join(INVOICE_PAGE)) > 0.8
+    assert score_page_text("") == 0.0
+    assert score_page_text("(cid:3)(cid:4)(cid:5) " * 20) < 0.2
+    assert score_page_text("~~ ^^ || ** ## @@ " * 10) < 0.2
+
+
+@pytest.mark.asyncio
+async def test_digital_pdf_skips_textract():
+    textract = _FakeTextract()
+    extractor = TextractTextExtractor(deps=TextractDeps(textract=textract, s3=None, bucket="b"))
+    text = await extractor.extract_text_async(
+        _text_pdf([INVOICE_PAGE, INVOICE_PAGE]), "application/pdf", OcrOptions(text_layer=True)
+    )
+    assert "Total due: 150.00 USD" in text
+    assert textract.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_only_weak_pages_go_to_textract():
+    pdf = _text_pdf([INVOICE_PAGE, [], INVOICE_PAGE])
+    assert len(extract_page_texts(pdf)) == 3
+
+    textract = _FakeTextract()
+    extractor = TextractTextExtractor(deps=TextractDeps(textract=textract, s3=None, bucket="b"))
+    text = await extractor.extract_text_async(pdf, "application/pdf", OcrOptions(text_layer=True))
+
+    assert textract.calls == 1
+    lines = text.splitlines()
+    assert lines.index("scanned page text") == len(INVOICE_PAGE)  # stays in page order
@@ -0,0 +1,81 @@
+import json
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from src.services.llm.openai_batch import OpenAIBatchExtractor, build_batch_file
+
+
+class _FakeBatchClient:
+    """Answers every request with the invoice number found in its prompt; `bad` ids get an error row."""
+
+    def __init__(self, bad=(), polls_until_done=2):
+        self.bad = set(bad)
+        self.polls_until_done = polls_until_done
+        self.uploaded = b""
+        self.files = SimpleNamespace(create=self._create_file, content=self._content)
+        self.batches = SimpleNamespace(create=self._create_batch, retrieve=self._retrieve)
+
+    async def _create_file(self, file, purpose):
+        self.uploaded = file[1]
+        return SimpleNamespace(id="file-in")
+
+    async def _create_batch(self, input_file_id, endpoint, completion_window):
+        return SimpleNamespace(id="batch-1")
+
+    async def _retrieve(self, batch_id):
+        self.polls_until_done -= 1
+        status = "completed" if self.polls_until_done <= 0 else "in_progress"
+        return SimpleNamespace(id=batch_id, status=status, output_file_id="file-out")
+
+    async def _content(self, file_id):
+        rows = []
+        for line in self.uploaded.decode().splitlines():
+            req = json.loads(line)
+            if req["custom_id"] in self.bad:
+                rows.append({"custom_id": req["custom_id"], "response": None, "error": {"code": "x"}})
+                continue
+            number = re.search(r"INV-\d+", req["body"]["messages"][-1]["content"]).group(0)
+            content = json.dumps({"invoice_number": number})
+            rows.append(
+                {
+                    "custom_id": req["custom_id"],
+                    "response": {"status_code": 200, "body": {"choices": [{"message": {"content": content}}]}},
+                }
+            )
+        rows.reverse()  # output order isn't guaranteed
+        return SimpleNamespace(text="\n".join(json.dumps(r) for r in rows))
+
+
+def test_batch_file_has_one_request_per_document():
+    lines = build_batch_file([("j1", "Invoice INV-1"), ("j2", "Invoice INV-2")]).decode().splitlines()
+    reqs = [json.loads(l) for l in lines]
+    assert [r["custom_id"] for r in reqs] == ["j1", "j2"]
+    assert all(r["url"] == "/v1/chat/completions" for r in reqs)
+
+
+@pytest.mark.asyncio
+async def test_results_map_back_by_custom_id():
+    client = _FakeBatchClient(bad={"j2"})
+    extractor = OpenAIBatchExtractor(client=client, poll_seconds=0)
+
+    results = await extractor.extract_many({f"j{i}": f"Invoice INV-{i}" for i in range(4)})
+
+    assert set(results) == {"j0", "j1", "j3"}  # the error row is left for per-document extraction
+    assert results["j3"]["fields"]["invoice_number"] == "INV-3"
+    assert results["j0"]["fields"]["invoice_number"] == "INV-0"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("status", ["failed", "expired", "cancelled"])
+async def test_unfinished_batch_returns_no_results(status):
+    client = _FakeBatchClient()
+
+    async def retrieve(batch_id):
+        return SimpleNamespace(id=batch_id, status=status, output_file_id=None)
+
+    client.batches.retrieve = retrieve
+    extractor = OpenAIBatchExtractor(client=client, poll_seconds=0)
+
+    assert await extractor.extract_many({"j0": "Invoice INV-0"}) == {}
@@ -0,0 +1,70 @@
+from src.services.llm.prompt import clean_lines, count_tokens, prepare_prompt_text
+
+
+def test_clean_drops_boilerplate_and_repeated_headers():
+    text = "\n".join(
+        [
+            "ACME   Corp",
+            "Invoice INV-77",
+            "Page 1 of 2",
+            "Widget  10.00",
+            "-----------",
+            "ACME Corp",
+            "Page 2 of 2",
+            "Widget 10.00",
+            "Total 20.00",
+        ]
+    )
+    assert clean_lines(text) == [
+        "ACME Corp",
+        "Invoice INV-77",
+        "Widget 10.00",
+        "Widget 10.00",
+        "Total 20.00",
+    ]
+
+
+def test_over_budget_keeps_field_lines_including_a_late_total():
+    body = [f"Item description number {i} lorem ipsum dolor sit amet" for i in range(400)]
+    text = "\n".join(["ACME Corp", "Invoice INV-77", "Date 2024-03-01", *body, "Amount due", "USD 1,234.50"])
+
+    out = prepare_prompt_text(text, token_budget=200)
+
+    assert count_tokens(out) <= 200
+    lines = out.splitlines()
+    assert lines[:3] == ["ACME Corp", "Invoice INV-77", "Date 2024-03-01"]
+    assert lines[-2:] == ["Amount due", "USD 1,234.50"]
+
+
+def test_under_budget_is_unchanged_apart_from_cleaning():
+    assert prepare_prompt_text("Invoice INV-1\n\nTotal 5.00\n") == "Invoice INV-1\nTotal 5.00"
+
+
+def test_generic_words_are_not_field_hints():
+    from src.services.llm.prompt import _line_scores
+
+    lines = [f"filler {i}" for i in range(20)] + ["no items shipped from stock"] + [f"filler b{i}" for i in range(20)]
+    assert _line_scores(lines)[20] == 0
+
+
+def test_completion_request_caps_prompt_tokens():
+    from src.services.llm.openai_extractor import MAX_PROMPT_TOKENS, _completion_request
+
+    req = _completion_request("x" * (MAX_PROMPT_TOKENS * 20))  # one line, nothing to select
+    assert 0 < count_tokens(req["messages"][1]["content"]) <= MAX_PROMPT_TOKENS
+
+    lines = [f"Item description number {i} lorem ipsum dolor sit amet" for i in range(4000)]
+    content = _completion_request("\n".join(["Invoice INV-9", *lines, "Grand Total USD 9999.00"]))["messages"][1]["content"]
+    assert count_tokens(content) <= MAX_PROMPT_TOKENS
+    assert content.splitlines()[-1] == "Grand Total USD 9999.00"
+
+
+def test_compacted_prompt_keeps_a_late_total_through_the_request_cap():
+    from src.services.llm.openai_extractor import _completion_request
+
+    lines = [f"{i} x Widget model {i} with a fairly long description 12.50" for i in range(600)]
+    text = prepare_prompt_text("\n".join(["ACME Corp", "Invoice INV-600", *lines, "Grand Total USD 9999.00"]))
+
+    content = _completion_request(text)["messages"][1]["content"]
+    assert content == text  # the default budget is under the hard cap
+    assert "Grand Total USD 9999.00" in content
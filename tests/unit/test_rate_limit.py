@@ -0,0 +1,132 @@
+import asyncio
+import time
+import uuid
+
+import pytest
+import pytest_asyncio
+import redis.asyncio as aioredis
+
+from src.settings import settings
+from src.workflow.rate_limit import REFUND_LUA, AsyncTokenBucket, RedisRateLimiter
+
+
+@pytest.mark.asyncio
+async def test_bucket_computes_exact_waits_in_order():
+    bucket = AsyncTokenBucket(rps=10, burst=2)
+    waits = await asyncio.gather(*[bucket.take() for _ in range(4)])
+    assert waits[:2] == [0.0, 0.0]
+    assert waits[2] == pytest.approx(0.1, abs=0.01)
+    assert waits[3] == pytest.approx(0.2, abs=0.01)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_gives_its_tokens_back():
+    bucket = AsyncTokenBucket(rps=10, burst=1)
+    await bucket.take()
+    waiter = asyncio.ensure_future(bucket.take())
+    await asyncio.sleep(0.01)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    # Without the refund this take would queue behind the abandoned reservation (~0.19s).
+    assert await bucket.take() == pytest.approx(0.09, abs=0.02)
+
+
+class _FakeRedisServer:
+    """Python mirror of TOKEN_BUCKET_LUA: one shared state, like a Redis server."""
+
+    def __init__(self):
+        self.buckets = {}
+        self.keys = []
+
+    def register_script(self, lua):
+        async def refund(keys, args):
+            if keys[0] in self.buckets:
+                tokens, ts = self.buckets[keys[0]]
+                self.buckets[keys[0]] = (tokens + float(args[0]), ts)
+            return 0
+
+        async def run(keys, args):
+            rate, capacity, amount = (float(a) for a in args)
+            now = time.monotonic()
+            tokens, ts = self.buckets.get(keys[0], (capacity, now))
+            tokens = min(capacity, tokens + max(0.0, now - ts) * rate) - amount
+            self.buckets[keys[0]] = (tokens, now)
+            self.keys.append(keys[0])
+            return str(-tokens / rate if tokens < 0 else 0).encode()
+
+        return refund if lua == REFUND_LUA else run
+
+
+@pytest.mark.asyncio
+async def test_limiters_in_different_processes_share_one_bucket_per_key():
+    server = _FakeRedisServer()
+    worker_a = RedisRateLimiter(rps=20, burst=2, client=server)
+    worker_b = RedisRateLimiter(rps=20, burst=2, client=server)
+
+    waits = [await w.take("openai:gpt-4.1-mini") for w in (worker_a, worker_b, worker_a, worker_b)]
+    assert waits[:2] == [0.0, 0.0]
+    assert waits[2] > 0  # the third take in the fleet waits, whichever process makes it
+    assert await worker_a.take("other-model") == 0.0
+    assert set(server.keys) == {"docproc:ratelimit:openai:gpt-4.1-mini", "docproc:ratelimit:other-model"}
+
+
+class _DownRedis:
+    def register_script(self, lua):
+        async def run(keys, args):
+            raise ConnectionError("redis down")
+
+        return run
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_local_bucket_when_redis_is_down():
+    limiter = RedisRateLimiter(rps=10, burst=1, client=_DownRedis())
+    assert await limiter.take("k") == 0.0
+    assert await limiter.take("k") == pytest.approx(0.1, abs=0.02)
+
+
+@pytest.mark.asyncio
+async def test_redis_limiter_refunds_a_cancelled_take():
+    server = _FakeRedisServer()
+    limiter = RedisRateLimiter(rps=10, burst=1, client=server)
+    await limiter.take("k")
+    waiter = asyncio.ensure_future(limiter.take("k"))
+    await asyncio.sleep(0.01)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert await limiter.take("k") == pytest.approx(0.09, abs=0.02)
+
+
+@pytest_asyncio.fixture
+async def redis_client():
+    client = aioredis.Redis.from_url(settings.redis_url, socket_connect_timeout=0.5, socket_timeout=0.5)
+    try:
+        await client.ping()
+    except Exception:
+        await client.aclose()
+        pytest.skip("no Redis server reachable at REDIS_URL")
+    yield client
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_lua_on_a_real_redis(redis_client):
+    prefix = f"test:ratelimit:{uuid.uuid4().hex}:"
+    limiter = RedisRateLimiter(rps=10, burst=2, client=redis_client, prefix=prefix)
+    other = RedisRateLimiter(rps=10, burst=2, client=redis_client, prefix=prefix)
+    try:
+        waits = [await l.take("k") for l in (limiter, other, limiter)]
+        assert waits[:2] == [0.0, 0.0]
+        assert 0.05 < waits[2] <= 0.1  # fractional waits survive the Lua reply
+        assert await redis_client.ttl(prefix + "k") > 0
+
+        waiter = asyncio.ensure_future(limiter.take("k"))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert await other.take("k") < 0.1  # the cancelled reservation was refunded
+    finally:
+        await redis_client.delete(prefix + "k")
@@ -0,0 +1,101 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.repositories.documents import DocumentRepo
+from src.repositories.jobs import JobRepo
+
+
+class _Result:
+    def __init__(self, row):
+        self.row = row
+
+    def one_or_none(self):
+        return self.row
+
+
+class _RecordingSession:
+    def __init__(self, row=("j1", "completed", {"json": "out.json"}, None)):
+        self.statements = []
+        self.row = row
+
+    async def execute(self, stmt):
+        self.statements.append(str(stmt.compile(dialect=postgresql.dialect())))
+        return _Result(self.row)
+
+    async def get(self, *a, **kw):
+        raise AssertionError("transitions must not SELECT first")
+
+
+@pytest.mark.asyncio
+async def test_job_completion_is_one_update_returning():
+    session = _RecordingSession()
+    row = await JobRepo(session).transition("j1", "completed", completed=True, outputs={"json": "out.json"})
+
+    assert row[2] == {"json": "out.json"}
+    [sql] = session.statements
+    assert sql.startswith("UPDATE jobs SET")
+    assert "completed_at" in sql and "outputs" in sql and "started_at" not in sql
+    assert "RETURNING jobs.id, jobs.status, jobs.outputs, jobs.review_item_id" in sql
+
+
+@pytest.mark.asyncio
+async def test_document_status_and_extraction_in_one_statement():
+    session = _RecordingSession(row=("d1",))
+    await DocumentRepo(session).transition("d1", "completed", extraction={"fields": {}})
+
+    [sql] = session.statements
+    assert "status" in sql and "extraction_json" in sql
+
+
+@pytest.mark.asyncio
+async def test_missing_row_raises_key_error():
+    with pytest.raises(KeyError):
+        await JobRepo(_RecordingSession(row=None)).set_status("missing", "failed")
+
+
+@pytest.mark.asyncio
+async def test_persist_clears_error_left_by_a_failed_attempt():
+    from src.workflow.context import WorkflowContext
+    from src.workflow.steps.persist import run as persist
+
+    class _Audit:
+        async def append(self, *a, **kw):
+            pass
+
+    session = _RecordingSession()
+    ctx = WorkflowContext(job_id="j1", document_id="d1", content_type="application/pdf")
+    await persist(ctx, {"docs": DocumentRepo(session), "jobs": JobRepo(session), "audit": _Audit()})
+
+    job_sql = [s for s in session.statements if s.startswith("UPDATE jobs")][0]
+    assert "error=" in job_sql
+
+
+@pytest.mark.asyncio
+async def test_completing_a_job_is_a_single_job_update(monkeypatch):
+    from src import worker
+    from src.workflow.context import WorkflowContext
+    from src.workflow.steps.persist import run as persist
+
+    class _Audit:
+        async def append(self, *a, **kw):
+            pass
+
+    class _Session(_RecordingSession):
+        async def commit(self):
+            pass
+
+    async def publish(*a, **kw):
+        pass
+
+    monkeypatch.setattr(worker.job_events, "publish", publish)
+    session = _Session()
+    repos = {"session": session, "docs": DocumentRepo(session), "jobs": JobRepo(session), "audit": _Audit()}
+    ctx = WorkflowContext(job_id="j1", document_id="d1", content_type="application/pdf")
+    ctx.outputs = {"json": "out.json"}
+
+    await persist(ctx, repos)
+    result = await worker._complete(repos, ctx)
+
+    [job_sql] = [s for s in session.statements if s.startswith("UPDATE jobs")]
+    assert "completed_at" in job_sql
+    assert result["status"] == "completed" and result["outputs"] == {"json": "out.json"}
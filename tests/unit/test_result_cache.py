@@ -0,0 +1,79 @@
+import pytest
+
+from src.services.result_cache import InMemoryResultCache
+from src.workflow.context import WorkflowContext
+from src.workflow.runner import WorkflowRunner
+from src.workflow.steps.registry import register
+
+CALLS = []
+
+
+@register("test_cache_ocr")
+async def _ocr(ctx, cfg):
+    CALLS.append("ocr")
+    ctx.text = "INVOICE INV-1 total 10 USD"
+
+
+@register("test_cache_llm")
+async def _llm(ctx, cfg):
+    CALLS.append("llm")
+    ctx.apply_llm_result({"fields": {"invoice_number": "INV-1"}, "confidence": {"invoice_number": 0.9}})
+
+
+@register("test_cache_tail")
+async def _tail(ctx, cfg):
+    CALLS.append("tail")
+
+
+WORKFLOW = """
+workflow:
+  result_cache:
+    steps: ["ocr", "llm"]
+  steps:
+    ocr: {kind: test_cache_ocr, depends_on: []}
+    llm: {kind: test_cache_llm, depends_on: [ocr]}
+    tail: {kind: test_cache_tail, depends_on: [llm]}
+"""
+
+
+def _ctx(**kw):
+    return WorkflowContext(
+        job_id="j", document_id="d", content_type="application/pdf", file_bytes=b"x", content_hash="h", **kw
+    )
+
+
+@pytest.mark.asyncio
+async def test_memory_cache_ttl_and_lru():
+    cache = InMemoryResultCache(ttl_seconds=60, max_entries=2)
+    await cache.put("a", {"v": 1})
+    await cache.put("b", {"v": 2})
+    assert await cache.get("a") == {"v": 1}
+    await cache.put("c", {"v": 3})  # evicts "b", the least recently used
+    assert await cache.get("b") is None
+    assert await cache.get("a") == {"v": 1}
+
+    expired = InMemoryResultCache(ttl_seconds=0)
+    await expired.put("a", {"v": 1})
+    assert await expired.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_skips_cached_steps(tmp_path):
+    cfg = tmp_path / "workflow.yaml"
+    cfg.write_text(WORKFLOW)
+    runner = WorkflowRunner(cfg_path=str(cfg), result_cache=InMemoryResultCache(ttl_seconds=60))
+
+    CALLS.clear()
+    await runner.run(_ctx(), injected_cfg={})
+    assert CALLS == ["ocr", "llm", "tail"]
+
+    CALLS.clear()
+    ctx = _ctx(locked_fields={"vendor_name": "ACME"})
+    await runner.run(ctx, injected_cfg={})
+    assert CALLS == ["tail"]
+    assert ctx.cache_hit
+    assert ctx.fields == {"invoice_number": "INV-1", "vendor_name": "ACME"}
+
+    CALLS.clear()
+    await runner.run(_ctx(bypass_cache=True), injected_cfg={})
+    assert CALLS == ["ocr", "llm", "tail"]
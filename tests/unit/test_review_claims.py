@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.common.time import utcnow
+
+from src.db.models import ReviewItem
+from src.repositories.review_queue import ReviewQueueRepo
+
+T0 = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+class _Result:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class _RecordingSession:
+    def __init__(self, rows=()):
+        self.calls = []
+        self.rows = list(rows)
+
+    async def execute(self, stmt, params=None):
+        self.calls.append((str(stmt), params))
+        return _Result(self.rows)
+
+    async def get(self, *a, **kw):
+        raise AssertionError("claims must not re-read the row")
+
+
+def _item(rid, minutes):
+    return ReviewItem(id=rid, urgency_key=T0 + timedelta(minutes=minutes), status="claimed")
+
+
+@pytest.mark.asyncio
+async def test_claim_batch_is_one_leased_update_returning_rows():
+    session = _RecordingSession([_item("b", 30), _item("a", 5), _item("c", 30)])
+    items = await ReviewQueueRepo(session).claim_batch("alice", 3, lease_seconds=600)
+
+    assert [i.id for i in items] == ["a", "b", "c"]  # queue order, whatever RETURNING gave
+    [(sql, params)] = session.calls
+    assert "FOR UPDATE SKIP LOCKED" in sql and "LIMIT :n" in sql
+    assert "lease_expires_at=NOW() + make_interval(secs => :lease_seconds)" in sql
+    assert "RETURNING *" in sql
+    assert params == {"user": "alice", "n": 3, "lease_seconds": 600.0}
+
+
+@pytest.mark.asyncio
+async def test_claim_next_returns_none_when_queue_is_empty():
+    assert await ReviewQueueRepo(_RecordingSession()).claim_next("alice", lease_seconds=60) is None
+
+
+@pytest.mark.asyncio
+async def test_release_expired_returns_claims_to_pending():
+    session = _RecordingSession([("r1", "d1", "j1", "alice")])
+    released = await ReviewQueueRepo(session).release_expired(lease_seconds=900)
+
+    assert released == [("r1", "d1", "j1", "alice")]
+    sql, params = session.calls[0]
+    # A claim with no lease (made before leases existed) expires from claimed_at.
+    assert "COALESCE(lease_expires_at, claimed_at + make_interval(secs => :lease_seconds)) < NOW()" in sql
+    assert params == {"lease_seconds": 900.0}
+    assert "SET status='pending', assigned_to=NULL" in sql
+
+
+class _ItemSession:
+    def __init__(self, item):
+        self.item = item
+
+    async def get(self, model, rid, with_for_update=False):
+        assert with_for_update  # the check and the update see the same row
+        return self.item if self.item and self.item.id == rid else None
+
+
+async def _submit(item, user="alice"):
+    repo = ReviewQueueRepo(_ItemSession(item))
+    return await repo.submit("r1", "approve", user, {}, None, lease_seconds=900)
+
+
+@pytest.mark.asyncio
+async def test_submit_requires_a_live_claim_by_the_submitter():
+    now = utcnow()
+    live = dict(id="r1", status="claimed", assigned_to="alice", claimed_at=now)
+
+    item = await _submit(ReviewItem(**live, lease_expires_at=now + timedelta(minutes=5)))
+    assert item.status == "completed" and item.lease_expires_at is None
+
+    stale = [
+        ReviewItem(**live, lease_expires_at=now - timedelta(seconds=1)),
+        # no lease recorded: falls back to claimed_at + lease_seconds
+        ReviewItem(**{**live, "claimed_at": now - timedelta(hours=1)}, lease_expires_at=None),
+        ReviewItem(**{**live, "assigned_to": "bob"}, lease_expires_at=now + timedelta(minutes=5)),
+        ReviewItem(id="r1", status="pending", assigned_to=None),
+    ]
+    for item in stale:
+        with pytest.raises(ValueError, match="claim_not_held"):
+            await _submit(item)
+    with pytest.raises(KeyError):
+        await _submit(None)
@@ -0,0 +1,82 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.repositories.review_queue import (
+    ReviewQueueRepo,
+    decode_cursor,
+    encode_cursor,
+    priority_at,
+    urgency_boost_minutes,
+)
+
+
+class _Result:
+    def all(self):
+        return []
+
+
+class _RecordingSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, stmt):
+        self.statements.append(stmt.compile(dialect=postgresql.dialect()))
+        return _Result()
+
+
+class _Row:
+    urgency_key = datetime(2026, 3, 1, 12, 30, tzinfo=timezone.utc)
+    id = "r-9"
+
+
+def test_cursor_round_trip_and_rejects_garbage():
+    assert decode_cursor(encode_cursor(_Row())) == (_Row.urgency_key, "r-9")
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+@pytest.mark.asyncio
+async def test_summary_page_is_keyset_without_json_columns():
+    session = _RecordingSession()
+    await ReviewQueueRepo(session).list_pending(limit=50, after=decode_cursor(encode_cursor(_Row())))
+
+    [stmt] = session.statements
+    sql = str(stmt)
+    assert "OFFSET" not in sql
+    assert "extraction_json" not in sql and "locked_fields" not in sql
+    assert "(review_items.urgency_key, review_items.id) >" in sql
+    assert "ORDER BY review_items.urgency_key, review_items.id" in sql
+    assert "r-9" in stmt.params.values()
+
+
+@pytest.mark.asyncio
+async def test_full_view_includes_detail_columns():
+    session = _RecordingSession()
+    await ReviewQueueRepo(session).list_pending(limit=10, user="alice", detail=True)
+
+    sql = str(session.statements[0])
+    assert "extraction_json" in sql and "assigned_to" in sql and ">" not in sql.split("WHERE")[1]
+
+
+URGENCY = {
+    "reason_boost_minutes": {"validation_failed": 60, "low_confidence": 0},
+    "value_boost_minutes_per_10x": 30,
+    "value_floor": 100,
+    "max_value_boost_minutes": 120,
+}
+
+
+def test_urgency_boost_combines_severity_and_value():
+    assert urgency_boost_minutes("low_confidence", None, URGENCY) == 0
+    assert urgency_boost_minutes("validation_failed", "50", URGENCY) == 60
+    assert urgency_boost_minutes("low_confidence", 10_000, URGENCY) == pytest.approx(60)
+    assert urgency_boost_minutes("validation_failed", 10**12, URGENCY) == 180  # value boost capped
+    assert urgency_boost_minutes("anything", 10**6, None) == 0
+
+
+def test_priority_rises_as_the_effective_deadline_approaches():
+    key = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+    at = lambda h, m: priority_at(key, datetime(2026, 3, 1, h, m, tzinfo=timezone.utc))
+    assert [at(8, 0), at(10, 30), at(11, 15), at(11, 45), at(13, 0)] == [40, 60, 80, 100, 100]
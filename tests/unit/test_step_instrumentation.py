@@ -0,0 +1,73 @@
+import time
+
+import pytest
+import yaml
+from prometheus_client import REGISTRY
+
+from src.observability.tracing import Tracer
+from src.workflow import runner as runner_mod
+from src.workflow.context import WorkflowContext
+from src.workflow.runner import WorkflowRunner
+from src.workflow.steps.registry import register
+
+attempts = {"n": 0}
+
+
+@register("test_instr_flaky")
+async def _flaky(ctx, cfg):
+    attempts["n"] += 1
+    if attempts["n"] == 1:
+        raise RuntimeError("transient")
+
+
+class _ListExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, spans):
+        self.spans.extend(spans)
+
+
+@pytest.mark.asyncio
+async def test_step_metrics_and_spans(tmp_path, monkeypatch):
+    exporter = _ListExporter()
+    monkeypatch.setattr(runner_mod, "tracer", Tracer(exporter, flush_seconds=0.01))
+    monkeypatch.setattr(runner_mod, "_jitter", lambda s: 0)
+
+    path = tmp_path / "workflow.yaml"
+    path.write_text(
+        yaml.safe_dump(
+            {
+                "workflow": {
+                    "steps": {
+                        "flaky_step": {
+                            "kind": "test_instr_flaky",
+                            "depends_on": [],
+                            "retries": 2,
+                            "rate_limit_rps": 100,
+                            "rate_limit_burst": 5,
+                        }
+                    }
+                }
+            }
+        )
+    )
+    monkeypatch.setattr("src.settings.settings.rate_limit_backend", "local")
+    runner = WorkflowRunner(cfg_path=str(path))
+    await runner.run(WorkflowContext(job_id="j", document_id="d", content_type="x"), injected_cfg={})
+
+    labels = {"step": "flaky_step", "outcome": "success"}
+    assert REGISTRY.get_sample_value("workflow_step_seconds_count", labels) == 1
+    assert REGISTRY.get_sample_value("workflow_step_retries_sum", labels) == 1
+    assert REGISTRY.get_sample_value(
+        "workflow_step_wait_seconds_count", {"step": "flaky_step", "limiter": "rate_limit"}
+    ) == 2
+
+    deadline = time.monotonic() + 2
+    while len(exporter.spans) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    by_name = {s.name: s for s in exporter.spans}
+    root, step = by_name["workflow.run"], by_name["step.flaky_step"]
+    assert step.parent_id == root.span_id and step.trace_id == root.trace_id
+    assert step.attributes["retries"] == 1
+    assert step.attributes["outcome"] == "success"
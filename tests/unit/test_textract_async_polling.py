@@ -0,0 +1,94 @@
+import asyncio
+import io
+
+import pypdfium2 as pdfium
+import pytest
+
+from src.services.ocr.textract_client import TextractDeps
+from src.services.ocr.textract_extractor import TextractTextExtractor
+
+
+def _pdf(pages: int) -> bytes:
+    pdf = pdfium.PdfDocument.new()
+    for _ in range(pages):
+        pdf.new_page(200, 200)
+    buf = io.BytesIO()
+    pdf.save(buf)
+    return buf.getvalue()
+
+
+def _line(text):
+    return {"BlockType": "LINE", "Text": text}
+
+
+class _FakeTextract:
+    """In-progress for a few polls, then two result pages chained by NextToken."""
+
+    def __init__(self, polls_until_done=3):
+        self.polls_until_done = polls_until_done
+        self.calls = []
+
+    def start_document_text_detection(self, DocumentLocation):
+        return {"JobId": "job-1"}
+
+    def get_document_text_detection(self, JobId, MaxResults=None, NextToken=None):
+        self.calls.append(NextToken)
+        if NextToken == "p2":
+            return {"JobStatus": "SUCCEEDED", "Blocks": [_line("Total 10.00")]}
+        self.polls_until_done -= 1
+        if self.polls_until_done > 0:
+            return {"JobStatus": "IN_PROGRESS"}
+        return {"JobStatus": "SUCCEEDED", "Blocks": [_line("Invoice INV-1")], "NextToken": "p2"}
+
+
+class _FakeS3:
+    def __init__(self):
+        self.objects = {}
+
+    def put_object(self, Bucket, Key, Body, ContentType):
+        self.objects[Key] = Body
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop(Key, None)
+
+
+@pytest.mark.asyncio
+async def test_async_job_polls_with_backoff_and_cleans_up():
+    textract, s3 = _FakeTextract(), _FakeS3()
+    extractor = TextractTextExtractor(
+        deps=TextractDeps(textract=textract, s3=s3, bucket="b"),
+        poll_initial_seconds=0.01,
+        poll_max_seconds=0.02,
+    )
+
+    text = await extractor.extract_text_async(_pdf(3), "application/pdf")
+
+    assert text == "Invoice INV-1\nTotal 10.00"
+    assert textract.calls == [None, None, None, "p2"]
+    assert s3.objects == {}
+
+
+@pytest.mark.asyncio
+async def test_many_jobs_wait_without_holding_threads():
+    deps = [TextractDeps(textract=_FakeTextract(polls_until_done=5), s3=_FakeS3(), bucket="b") for _ in range(64)]
+    pdf = _pdf(2)
+
+    async def one(d):
+        ex = TextractTextExtractor(deps=d, poll_initial_seconds=0.01, poll_max_seconds=0.01)
+        return await ex.extract_text_async(pdf, "application/pdf")
+
+    # 64 concurrent jobs finish in roughly the time of one, well beyond the default thread pool size.
+    results = await asyncio.wait_for(asyncio.gather(*[one(d) for d in deps]), timeout=5)
+    assert all(r.startswith("Invoice INV-1") for r in results)
+
+
+@pytest.mark.asyncio
+async def test_job_timeout_returns_empty_text():
+    textract = _FakeTextract(polls_until_done=10_000)
+    extractor = TextractTextExtractor(
+        deps=TextractDeps(textract=textract, s3=_FakeS3(), bucket="b"),
+        poll_initial_seconds=0.01,
+        poll_max_seconds=0.01,
+        job_timeout_seconds=0.05,
+    )
+    assert await extractor.extract_text_async(_pdf(2), "application/pdf") == ""
@@ -0,0 +1,50 @@
+import asyncio
+
+from src import worker_runtime
+from src.worker_runtime import WorkerRuntime, get_runtime, init_runtime
+
+
+def test_runtime_reuses_loop_across_tasks():
+    rt = WorkerRuntime()
+    try:
+        loops = [rt.run(_current_loop()) for _ in range(3)]
+        assert all(loop is rt.loop for loop in loops)
+    finally:
+        rt.loop.close()
+
+
+def test_get_runtime_returns_one_runtime_per_process(monkeypatch):
+    monkeypatch.setattr(worker_runtime, "_runtime", None)
+    first = get_runtime()
+    try:
+        second = get_runtime()
+        assert second is first
+        assert second.runner is first.runner
+        assert second.services()["llm_extractor"] is first.services()["llm_extractor"]
+        assert second.services()["ocr_extractor"] is first.services()["ocr_extractor"]
+    finally:
+        first.loop.close()
+
+
+def test_after_fork_rebuilds_runtime_and_drops_inherited_connections(monkeypatch):
+    disposed = []
+    monkeypatch.setattr(worker_runtime, "_runtime", None)
+    monkeypatch.setattr(
+        worker_runtime.engine.sync_engine, "dispose", lambda close=True: disposed.append(close)
+    )
+    parent = get_runtime()
+    try:
+        child = init_runtime(after_fork=True)
+        try:
+            assert disposed == [False]
+            assert child is not parent and get_runtime() is child
+            assert child.loop is not parent.loop
+            assert child.llm_extractor is not parent.llm_extractor
+        finally:
+            child.loop.close()
+    finally:
+        parent.loop.close()
+
+
+async def _current_loop():
+    return asyncio.get_running_loop()
@@ -0,0 +1,56 @@
+import os
+
+import yaml
+
+from src.workflow import runner as _runner  # noqa: F401  (registers the built-in steps)
+from src.workflow.plan import PlanLoader
+
+
+def _write(path, llm_rps, mtime):
+    path.write_text(
+        yaml.safe_dump(
+            {
+                "workflow": {
+                    "steps": {
+                        "ocr": {"kind": "ocr", "depends_on": [], "rate_limit_rps": 5, "rate_limit_burst": 5},
+                        "llm_extract": {
+                            "kind": "llm_extract",
+                            "depends_on": ["ocr"],
+                            "rate_limit_rps": llm_rps,
+                            "rate_limit_burst": 6,
+                        },
+                    }
+                }
+            }
+        )
+    )
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_plan_is_reused_until_the_file_changes(tmp_path):
+    path = tmp_path / "workflow.yaml"
+    _write(path, llm_rps=3, mtime=1_000_000_000)
+    loader = PlanLoader(str(path), check_interval=0)
+
+    first = loader.get()
+    assert loader.get() is first
+    assert first.order == ("ocr", "llm_extract")
+    assert first.steps["llm_extract"].dependents == ()
+
+    _write(path, llm_rps=10, mtime=2_000_000_000)
+    second = loader.get()
+    assert second is not first
+    assert second.steps["llm_extract"].limiter.rps == 10
+    # Unchanged limits keep their limiter (and its token state) across the reload.
+    assert second.steps["ocr"].limiter is first.steps["ocr"].limiter
+
+
+def test_broken_edit_keeps_the_current_plan(tmp_path):
+    path = tmp_path / "workflow.yaml"
+    _write(path, llm_rps=3, mtime=1_000_000_000)
+    loader = PlanLoader(str(path), check_interval=0)
+    plan = loader.get()
+
+    path.write_text("workflow: {steps: {a: {kind: a, depends_on: [missing]}}}")
+    os.utime(path, ns=(3_000_000_000, 3_000_000_000))
+    assert loader.get() is plan
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+import yaml
+
+from src.workflow import plan as plan_mod
+from src.workflow.context import WorkflowContext
+from src.workflow.runner import WorkflowRunner
+from src.workflow.steps.registry import register
+
+finished: list[str] = []
+in_flight = {"now": 0, "peak": 0}
+
+
+@register("test_sleep")
+async def _sleep(ctx, cfg):
+    await asyncio.sleep(cfg["seconds"])
+    finished.append(cfg["label"])
+
+
+@register("test_capped")
+async def _capped(ctx, cfg):
+    in_flight["now"] += 1
+    in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+    await asyncio.sleep(0.02)
+    in_flight["now"] -= 1
+
+
+def _runner(tmp_path, steps):
+    path = tmp_path / "workflow.yaml"
+    path.write_text(yaml.safe_dump({"workflow": {"steps": steps}}))
+    return WorkflowRunner(cfg_path=str(path))
+
+
+def _ctx(i=0):
+    return WorkflowContext(job_id=f"j{i}", document_id=f"d{i}", content_type="application/pdf")
+
+
+def _step(label, seconds, deps):
+    return {"kind": "test_sleep", "depends_on": deps, "seconds": seconds, "label": label}
+
+
+@pytest.mark.asyncio
+async def test_step_starts_when_its_own_dependencies_finish(tmp_path):
+    finished.clear()
+    runner = _runner(
+        tmp_path,
+        {
+            "a": _step("a", 0, []),
+            "slow": _step("slow", 0.2, ["a"]),
+            "fast": _step("fast", 0, ["a"]),
+            "after_fast": _step("after_fast", 0, ["fast"]),
+            "join": _step("join", 0, ["slow", "after_fast"]),
+        },
+    )
+    ctx = _ctx()
+    await runner.run(ctx, injected_cfg={})
+
+    # after_fast doesn't wait for the unrelated slow step in the previous "layer".
+    assert finished.index("after_fast") < finished.index("slow")
+    assert finished[-1] == "join"
+    assert ctx.completed_steps == {"a", "slow", "fast", "after_fast", "join"}
+
+
+@pytest.mark.asyncio
+async def test_max_concurrency_caps_a_step_across_documents(tmp_path):
+    in_flight.update(now=0, peak=0)
+    runner = _runner(tmp_path, {"capped": {"kind": "test_capped", "depends_on": [], "max_concurrency": 2}})
+
+    await asyncio.gather(*[runner.run(_ctx(i), injected_cfg={}) for i in range(6)])
+    assert in_flight["peak"] == 2
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_token_is_taken_after_the_concurrency_slot(tmp_path, monkeypatch):
+    held_at_take = []
+
+    class _Limiter:
+        async def take(self, key, amount=1.0):
+            held_at_take.append(runner.plan.steps["capped"].semaphore.locked())
+            return 0.0
+
+    monkeypatch.setattr(plan_mod, "build_rate_limiter", lambda rps, burst: _Limiter())
+    in_flight.update(now=0, peak=0)
+    runner = _runner(tmp_path, {"capped": {
+        "kind": "test_capped", "depends_on": [], "max_concurrency": 1,
+        "rate_limit_rps": 5, "rate_limit_burst": 5,
+    }})
+
+    await asyncio.gather(*[runner.run(_ctx(i), injected_cfg={}) for i in range(3)])
+    assert held_at_take == [True, True, True]  # no token spent while queued for the slot
@@ -18,7 +18,7 @@ export async function fetchJob(jobId: string) {
 export async function fetchQueue(user?: string) {
   const url = new URL(`${API_BASE}/v1/queue`);
   url.searchParams.set("limit", "50");
-  url.searchParams.set("offset", "0");
+  url.searchParams.set("view", "summary");
   if (user) {
     url.searchParams.set("user", user);
   }
@@ -30,18 +30,33 @@ export async function fetchQueue(user?: string) {
   return res.json();
 }
 
+export async function fetchQueueItem(id: string) {
+  const res = await fetch(`${API_BASE}/v1/queue/${encodeURIComponent(id)}`);
+  if (!res.ok) throw new Error("failed_to_fetch_queue_item");
+  return res.json();
+}
+
 export async function claimNext(user: string) {
   const res = await fetch(`${API_BASE}/v1/queue/claim?user=${encodeURIComponent(user)}`, { method: "POST" });
   if (!res.ok) throw new Error("failed_to_claim");
   return res.json();
 }
 
+// Lease heartbeat: extends all of the user's claims.
+export async function renewClaims(user: string) {
+  const res = await fetch(`${API_BASE}/v1/queue/claims/renew?user=${encodeURIComponent(user)}`, { method: "POST" });
+  if (!res.ok) throw new Error("failed_to_renew_claims");
+  return res.json();
+}
+
 export async function submitItem(id: string, payload: any) {
   const res = await fetch(`${API_BASE}/v1/queue/${id}/submit`, {
     method: "POST",
     headers: { "Content-Type": "application/json" },
     body: JSON.stringify(payload),
   });
+  // 409: we no longer hold the claim (the lease expired) and the item may be someone else's now.
+  if (res.status === 409) throw new Error("claim_not_held");
   if (!res.ok) throw new Error("failed_to_submit");
   return res.json();
 }
@@ -4,19 +4,27 @@ type ReviewActionsProps = {
   onApprove: () => void;
   onReject: () => void;
   onToggleCorrect: () => void;
+  // When set, the buttons are disabled and this explains why.
+  disabledReason?: string | null;
 };
 
-export function ReviewActions({ onApprove, onReject, onToggleCorrect }: ReviewActionsProps) {
+export function ReviewActions({ onApprove, onReject, onToggleCorrect, disabledReason }: ReviewActionsProps) {
+  const disabled = Boolean(disabledReason);
   return (
     <section aria-label="Review actions">
+      {disabled && (
+        <p role="note" style={{ margin: "0 0 8px 0", fontSize: 13, color: "#a60" }}>
+          {disabledReason}
+        </p>
+      )}
       <div style={{ display: "flex", gap: 8, flexWrap: "wrap" }}>
-        <button type="button" onClick={onApprove} aria-label="Approve (shortcut a)">
+        <button type="button" onClick={onApprove} disabled={disabled} aria-label="Approve (shortcut a)">
           Approve
         </button>
-        <button type="button" onClick={onToggleCorrect} aria-label="Toggle correct mode (shortcut c)">
+        <button type="button" onClick={onToggleCorrect} disabled={disabled} aria-label="Toggle correct mode (shortcut c)">
           Correct
         </button>
-        <button type="button" onClick={onReject} aria-label="Reject (shortcut r)">
+        <button type="button" onClick={onReject} disabled={disabled} aria-label="Reject (shortcut r)">
           Reject
         </button>
       </div>
@@ -1,11 +1,15 @@
 import { useCallback, useEffect, useState } from "react";
-import { claimNext, fetchJob, fetchQueue, submitItem, uploadDocument } from "../api";
+import { claimNext, fetchJob, fetchQueue, fetchQueueItem, renewClaims, submitItem, uploadDocument } from "../api";
 import type { ReviewItem } from "../types";
 
 const DEFAULT_USER = "reviewer_1";
+// Well inside the server's claim lease (15 min by default).
+const CLAIM_HEARTBEAT_MS = 60_000;
 
 export function useReviewQueue(user: string = DEFAULT_USER) {
   const [items, setItems] = useState<ReviewItem[]>([]);
+  // The list is a summary; extraction + locked fields are loaded per selected item.
+  const [details, setDetails] = useState<Record<string, ReviewItem>>({});
   const [selected, setSelected] = useState(0);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
@@ -20,6 +24,7 @@ export function useReviewQueue(user: string = DEFAULT_USER) {
       const data = await fetchQueue(user);
       console.log("Queue data received:", { itemCount: data.items?.length ?? 0, items: data.items });
       setItems(data.items ?? []);
+      setDetails({});
       if (data.items && data.items.length > 0) {
         setSelected(0);
       }
@@ -37,7 +42,35 @@ export function useReviewQueue(user: string = DEFAULT_USER) {
     reloadQueue();
   }, [reloadQueue]);
 
-  const current = items[selected] ?? null;
+  const holdsClaims = items.some((i) => i.status === "claimed" && i.assigned_to === user);
+
+  useEffect(() => {
+    if (!holdsClaims) return;
+    const timer = setInterval(() => {
+      renewClaims(user).catch(() => {
+        /* retried on the next tick */
+      });
+    }, CLAIM_HEARTBEAT_MS);
+    return () => clearInterval(timer);
+  }, [user, holdsClaims]);
+
+  const summary = items[selected] ?? null;
+  const current = summary ? details[summary.id] ?? summary : null;
+
+  useEffect(() => {
+    if (!summary || details[summary.id]) return;
+    let alive = true;
+    fetchQueueItem(summary.id)
+      .then((item: ReviewItem) => {
+        if (alive) setDetails((d) => ({ ...d, [item.id]: item }));
+      })
+      .catch(() => {
+        /* keep showing the summary */
+      });
+    return () => {
+      alive = false;
+    };
+  }, [summary, details]);
 
   useEffect(() => {
     if (!lastJobId) return;
@@ -92,7 +125,17 @@ export function useReviewQueue(user: string = DEFAULT_USER) {
       itemId: string,
       payload: { decision: string; corrections?: Record<string, unknown>; reject_reason?: string; user: string }
     ) => {
-      await submitItem(itemId, payload);
+      try {
+        await submitItem(itemId, payload);
+      } catch (e: unknown) {
+        const msg = (e as Error)?.message ?? "submit_error";
+        if (msg !== "claim_not_held") throw e;
+        // The dashboard only submits items we claimed, so this is a lost lease: show the queue
+        // as it is now; the error is set after the reload clears it.
+        await reloadQueue();
+        setError("Your claim on this item expired and it went back to the queue.");
+        return;
+      }
       await reloadQueue();
     },
     [reloadQueue]
@@ -30,6 +30,13 @@ export function ReviewDashboard() {
 
   const { current, items, selected, setSelected } = queue;
   const currentItem = current;
+  // Submitting needs a claim held by this user; the server answers 409 otherwise.
+  const claimedByMe = currentItem?.status === "claimed" && currentItem?.assigned_to === USER;
+  const notClaimedReason = !currentItem || claimedByMe
+    ? null
+    : currentItem.status === "claimed"
+      ? `Claimed by ${currentItem.assigned_to}.`
+      : 'This item is not claimed. Use "Claim Next" to claim the next item before reviewing.';
 
   const refetchStats = useCallback(async () => {
     try {
@@ -58,28 +65,32 @@ export function ReviewDashboard() {
   );
 
   const onApprove = useCallback(() => {
-    if (currentItem) setConfirmAction("approve");
-  }, [currentItem]);
+    if (claimedByMe) setConfirmAction("approve");
+  }, [claimedByMe]);
 
   const onReject = useCallback(() => {
-    if (currentItem) setConfirmAction("reject");
-  }, [currentItem]);
+    if (claimedByMe) setConfirmAction("reject");
+  }, [claimedByMe]);
+
+  const onToggleCorrect = useCallback(() => {
+    if (claimedByMe) setMode((m) => (m === "view" ? "correct" : "view"));
+  }, [claimedByMe]);
 
   useEffect(() => {
     function onKey(e: KeyboardEvent) {
       if (e.target instanceof HTMLInputElement || e.target instanceof HTMLTextAreaElement) return;
       if (e.key === "j") setSelected((s: number) => Math.min(items.length - 1, s + 1));
       if (e.key === "k") setSelected((s: number) => Math.max(0, s - 1));
-      if (e.key === "c") setMode((m) => (m === "view" ? "correct" : "view"));
+      if (e.key === "c") onToggleCorrect();
       if (e.key === "a") onApprove();
       if (e.key === "r") onReject();
     }
     window.addEventListener("keydown", onKey);
     return () => window.removeEventListener("keydown", onKey);
-  }, [items.length, setSelected, onApprove, onReject]);
+  }, [items.length, setSelected, onApprove, onReject, onToggleCorrect]);
 
   const confirmApprove = useCallback(async () => {
-    if (!currentItem) return;
+    if (!currentItem || !claimedByMe) return;
     await queue.submit(currentItem.id, {
       decision: "approve",
       corrections: {},
@@ -87,10 +98,10 @@ export function ReviewDashboard() {
     });
     setConfirmAction(null);
     refetchStats();
-  }, [currentItem, queue, refetchStats]);
+  }, [currentItem, claimedByMe, queue, refetchStats]);
 
   const confirmReject = useCallback(async () => {
-    if (!currentItem) return;
+    if (!currentItem || !claimedByMe) return;
     await queue.submit(currentItem.id, {
       decision: "reject",
       reject_reason: "Not a valid invoice",
@@ -98,10 +109,10 @@ export function ReviewDashboard() {
     });
     setConfirmAction(null);
     refetchStats();
-  }, [currentItem, queue, refetchStats]);
+  }, [currentItem, claimedByMe, queue, refetchStats]);
 
   const onSubmitCorrections = useCallback(async () => {
-    if (!currentItem) return;
+    if (!currentItem || !claimedByMe) return;
     await queue.submit(currentItem.id, {
       decision: "correct",
       corrections,
@@ -110,7 +121,7 @@ export function ReviewDashboard() {
     setCorrections({});
     setMode("view");
     refetchStats();
-  }, [currentItem, corrections, queue, refetchStats]);
+  }, [currentItem, claimedByMe, corrections, queue, refetchStats]);
 
   if (queue.loading) {
     return (
@@ -171,7 +182,7 @@ export function ReviewDashboard() {
                   </h2>
                   <ExtractedFields
                     item={currentItem as ReviewItem}
-                    mode={mode}
+                    mode={claimedByMe ? mode : "view"}
                     corrections={corrections}
                     setCorrections={setCorrections}
                     onSubmitCorrections={onSubmitCorrections}
@@ -181,7 +192,8 @@ export function ReviewDashboard() {
                 <ReviewActions
                   onApprove={onApprove}
                   onReject={onReject}
-                  onToggleCorrect={() => setMode((m) => (m === "view" ? "correct" : "view"))}
+                  onToggleCorrect={onToggleCorrect}
+                  disabledReason={notClaimedReason}
                 />
               </>
             )}